@@ -0,0 +1,100 @@
+import tkinter as tk
+
+# Keys that move through the list rather than change the text
+NAVIGATION_KEYS = ("Up", "Down", "Return", "KP_Enter", "Escape", "Tab")
+
+
+class Autocomplete:
+    """Drop-down list of completions under an Entry.
+
+    `complete(text)` returns the suggestions for the current text. The list
+    follows the text as the user types; Up/Down pick a suggestion, Return
+    or a click accepts it and Escape closes the list.
+    """
+
+    def __init__(self, entry, complete, theme_manager, rows=8):
+        self.entry = entry
+        self.complete = complete
+        self.theme_manager = theme_manager
+        self.rows = rows
+        self.popup = None
+        self.listbox = None
+
+        entry.bind("<KeyRelease>", self.on_key_release, add="+")
+        entry.bind("<Down>", lambda event: self.move(1), add="+")
+        entry.bind("<Up>", lambda event: self.move(-1), add="+")
+        entry.bind("<Return>", self.on_return, add="+")
+        entry.bind("<Escape>", lambda event: self.hide(), add="+")
+        # Delayed so that a click on the list lands before it is hidden
+        entry.bind("<FocusOut>", lambda event: entry.after(150, self.hide), add="+")
+
+    def build_popup(self):
+        self.popup = tk.Toplevel(self.entry)
+        self.popup.withdraw()
+        self.popup.overrideredirect(True)
+        self.listbox = tk.Listbox(
+            self.popup, height=self.rows, font=self.entry.cget("font"),
+            relief="solid", bd=1, activestyle="none", exportselection=False)
+        self.listbox.pack(fill=tk.BOTH, expand=True)
+        self.listbox.bind("<ButtonRelease-1>", lambda event: self.accept())
+        self.theme_manager.register(self.listbox, "listbox")
+
+    def visible(self):
+        return self.popup is not None and self.popup.winfo_ismapped()
+
+    def on_key_release(self, event):
+        if event.keysym in NAVIGATION_KEYS:
+            return
+        text = self.entry.get()
+        suggestions = self.complete(text) if text.strip() else []
+        if not suggestions or suggestions == [text]:
+            self.hide()
+        else:
+            self.show(suggestions)
+
+    def show(self, suggestions):
+        if self.popup is None:
+            self.build_popup()
+        self.listbox.delete(0, tk.END)
+        self.listbox.insert(tk.END, *suggestions)
+        self.listbox.config(height=min(len(suggestions), self.rows))
+        x = self.entry.winfo_rootx()
+        y = self.entry.winfo_rooty() + self.entry.winfo_height()
+        self.popup.geometry(f"{self.entry.winfo_width()}x"
+                            f"{self.listbox.winfo_reqheight()}+{x}+{y}")
+        self.popup.deiconify()
+        self.popup.lift()
+
+    def hide(self):
+        if self.visible():
+            self.popup.withdraw()
+
+    def move(self, step):
+        if not self.visible():
+            return None
+        selection = self.listbox.curselection()
+        last = self.listbox.size() - 1
+        if selection:
+            index = min(max(selection[0] + step, 0), last)
+        else:
+            index = 0 if step > 0 else last
+        self.listbox.selection_clear(0, tk.END)
+        self.listbox.selection_set(index)
+        self.listbox.see(index)
+        return "break"
+
+    def on_return(self, event):
+        if self.visible() and self.listbox.curselection():
+            self.accept()
+            return "break"
+        self.hide()
+        return None
+
+    def accept(self):
+        selection = self.listbox.curselection()
+        if selection:
+            self.entry.delete(0, tk.END)
+            self.entry.insert(0, self.listbox.get(selection[0]))
+            self.entry.icursor(tk.END)
+        self.hide()
+        self.entry.focus_set()
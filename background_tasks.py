@@ -0,0 +1,85 @@
+import queue
+import threading
+
+
+class TaskCancelled(Exception):
+    """Raised inside a task when the user cancelled it."""
+
+
+class BackgroundTask:
+    """Run a function on a worker thread and report back on the Tk thread.
+
+    The function is called as target(report, cancel_event, *args). It calls
+    report(done, total) to publish progress and should check cancel_event
+    (or let report raise TaskCancelled) to stop early; only TaskCancelled
+    counts as cancelled. Messages travel through a thread-safe queue that
+    the UI polls with after(), so the callbacks always run on the Tk main
+    thread.
+    """
+
+    def __init__(self, widget, target, args=(), on_progress=None, on_done=None,
+                 on_error=None, on_cancelled=None, poll_ms=100):
+        self.widget = widget
+        self.target = target
+        self.args = args
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_cancelled = on_cancelled
+        self.poll_ms = poll_ms
+        self.messages = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        self.widget.after(self.poll_ms, self._poll)
+        return self
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def report(self, done, total):
+        if self.cancel_event.is_set():
+            raise TaskCancelled()
+        self.messages.put(("progress", (done, total)))
+
+    def _run(self):
+        try:
+            result = self.target(self.report, self.cancel_event, *self.args)
+            # A target that returns has finished its work (an export has
+            # replaced its file), even if a cancel arrived meanwhile
+            self.messages.put(("done", result))
+        except TaskCancelled:
+            self.messages.put(("cancelled", None))
+        except Exception as e:
+            self.messages.put(("error", e))
+
+    def _poll(self):
+        progress = None
+        while True:
+            try:
+                kind, value = self.messages.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                # Only the latest progress update is worth showing
+                progress = value
+                continue
+            if progress and self.on_progress:
+                self.on_progress(*progress)
+            if kind == "done" and self.on_done:
+                self.on_done(value)
+            elif kind == "error" and self.on_error:
+                self.on_error(value)
+            elif kind == "cancelled" and self.on_cancelled:
+                self.on_cancelled()
+            return
+
+        if progress and self.on_progress:
+            self.on_progress(*progress)
+        self.widget.after(self.poll_ms, self._poll)
@@ -1,106 +1,225 @@
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import math
 import tkinter as tk
+import perf_stats
+import startup_timing
+
+EXPENSE_LABELS = ["Gear", "Travel", "Hotel", "Payroll", "Other"]
+BAR_COLORS = ["#E57373", "#81C784"]  # Red and green for bars
+
+# ChartManager never holds more figures than this
+MAX_LIVE_FIGURES = 2
 
 
 class ChartManager:
-    def __init__(self, app):
+    """Draws the expense and profit charts.
+
+    Figures and canvases are built once and their artists are updated in
+    place on every calculation; only a theme change rebuilds them.
+
+    Figures are plain matplotlib Figures owned by this class, not pyplot
+    figures, so nothing outside ChartManager keeps them alive. With
+    headless=True the charts are rendered on Agg canvases without Tk.
+
+    matplotlib is only imported when the first chart is built.
+    """
+
+    def __init__(self, app, headless=False):
         self.app = app
+        self.headless = headless
+        self.built = False
+        self.built_for_dark_mode = None
+        self.last_data = None
+        self.figures = []
 
+    @perf_stats.timed_function("charts.update")
     def update_charts(self, gear_cost, travel_cost, hotel_cost, payroll_cost, other_cost, gross, net):
-        # Clear previous charts
-        for widget in self.app.chart_frame.winfo_children():
-            widget.destroy()
+        self.last_data = (gear_cost, travel_cost, hotel_cost,
+                          payroll_cost, other_cost, gross, net)
+
+        if not self.built or self.built_for_dark_mode != self.app.dark_mode:
+            self.build_charts()
+
+        expenses = [gear_cost, travel_cost, hotel_cost, payroll_cost, other_cost]
+        self.update_pie(expenses)
+        self.update_bars(gross, net)
+
+    def build_charts(self):
+        """Create the figures, artists and canvases for the current theme."""
+        with startup_timing.phase("import matplotlib"):
+            import matplotlib.style
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+        self.destroy_charts()
 
         # Determine chart colors based on theme
         if self.app.dark_mode:
-            plt.style.use("dark_background")
+            style = "dark_background"
             chart_bg_color = "#121212"  # Dark background
-            text_color = "white"  # White text for dark mode
-            bar_colors = ["#E57373", "#81C784"]  # Red and green for bars
+            self.text_color = "white"  # White text for dark mode
         else:
-            plt.style.use("default")
+            style = "default"
             chart_bg_color = "#ffffff"  # Light background
-            text_color = "black"  # Black text for light mode
-            bar_colors = ["#E57373", "#81C784"]  # Red and green for bars
-
-        # Create frame for charts
-        charts_row = tk.Frame(self.app.chart_frame)
-        charts_row.pack(fill=tk.BOTH, expand=True)
-
-        # Expenses breakdown chart
-        expenses = [gear_cost, travel_cost,
-                    hotel_cost, payroll_cost, other_cost]
-        expense_labels = ["Gear", "Travel", "Hotel", "Payroll", "Other"]
-
-        # Filter out zero values for cleaner pie chart
-        filtered_expenses = []
-        filtered_labels = []
-        for amount, label in zip(expenses, expense_labels):
-            if amount > 0:
-                filtered_expenses.append(amount)
-                filtered_labels.append(label)
-
-        if sum(filtered_expenses) > 0:  # Only create pie chart if there are expenses
-            # Set figure background
-            fig1, ax1 = plt.subplots(figsize=(5, 4), facecolor=chart_bg_color)
-            wedges, texts, autotexts = ax1.pie(
-                filtered_expenses,
-                labels=filtered_labels,
+            self.text_color = "black"  # Black text for light mode
+
+        with matplotlib.style.context(style):
+            # Expenses breakdown chart, one wedge per category
+            self.pie_fig = self.new_figure(chart_bg_color)
+            ax1 = self.pie_fig.add_subplot()
+            self.pie_wedges, self.pie_texts, self.pie_autotexts = ax1.pie(
+                [1] * len(EXPENSE_LABELS),
+                labels=EXPENSE_LABELS,
                 autopct="%1.1f%%",
                 startangle=90,
                 shadow=False,
-                textprops={"color": text_color},  # Set text color
+                textprops={"color": self.text_color},  # Set text color
             )
-
-            # Enhance pie chart appearance
             ax1.set_title("Expense Breakdown", fontsize=12,
-                          pad=20, color=text_color)
-            plt.setp(autotexts, size=9, weight="bold", color=text_color)
+                          pad=20, color=self.text_color)
+            for autotext in self.pie_autotexts:
+                autotext.set(size=9, weight="bold", color=self.text_color)
             ax1.axis("equal")
-
-            # Set axes background color
             ax1.set_facecolor(chart_bg_color)
 
-            # Create canvas
-            canvas1 = FigureCanvasTkAgg(fig1, master=charts_row)
-            canvas1.draw()
-            canvas1.get_tk_widget().pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-
-        # Revenue vs Expenses bar chart
-        # Set figure background
-        fig2, ax2 = plt.subplots(figsize=(5, 4), facecolor=chart_bg_color)
-        categories = ["Gross Expenses", "Net Profit"]
+            # Revenue vs Expenses bar chart
+            self.bar_fig = self.new_figure(chart_bg_color)
+            self.bar_ax = self.bar_fig.add_subplot()
+            self.bars = self.bar_ax.bar(
+                ["Gross Expenses", "Net Profit"], [0, 0], color=BAR_COLORS)
+            self.bar_ax.set_title("Profit Analysis", fontsize=12,
+                                  pad=20, color=self.text_color)
+            self.bar_ax.set_ylabel("Amount ($)", color=self.text_color)
+            self.bar_ax.tick_params(axis="x", colors=self.text_color)
+            self.bar_ax.tick_params(axis="y", colors=self.text_color)
+            self.bar_texts = [
+                self.bar_ax.text(i, 0, "", ha="center", va="center",
+                                 fontweight="bold", color=self.text_color)
+                for i in range(2)
+            ]
+            self.bar_ax.set_facecolor(chart_bg_color)
+
+        # Create canvases
+        if self.headless:
+            self.pie_canvas = FigureCanvasAgg(self.pie_fig)
+            self.bar_canvas = FigureCanvasAgg(self.bar_fig)
+        else:
+            # Create frame for charts
+            self.charts_row = tk.Frame(self.app.chart_frame)
+            self.charts_row.pack(fill=tk.BOTH, expand=True)
+            self.pie_canvas = FigureCanvasTkAgg(self.pie_fig, master=self.charts_row)
+            self.bar_canvas = FigureCanvasTkAgg(self.bar_fig, master=self.charts_row)
+        self.pie_visible = False
+        self.bar_visible = False
+        self.built = True
+        self.built_for_dark_mode = self.app.dark_mode
+
+    def new_figure(self, facecolor):
+        """Create a figure owned by this manager, closing the oldest if needed."""
+        from matplotlib.figure import Figure
+
+        while len(self.figures) >= MAX_LIVE_FIGURES:
+            self.close_figure(self.figures[0])
+        figure = Figure(figsize=(5, 4), facecolor=facecolor)
+        self.figures.append(figure)
+        return figure
+
+    def close_figure(self, figure):
+        # Drop the artists so the figure's memory is released right away
+        figure.clear()
+        self.figures.remove(figure)
+
+    def update_pie(self, expenses):
+        # Zero-value categories are hidden for a cleaner pie chart
+        total = sum(amount for amount in expenses if amount > 0)
+        if total <= 0:  # Only show the pie chart if there are expenses
+            if self.pie_visible:
+                self.hide_canvas(self.pie_canvas)
+                self.pie_visible = False
+            return
+
+        theta = 90.0
+        for amount, wedge, label, autotext in zip(
+                expenses, self.pie_wedges, self.pie_texts, self.pie_autotexts):
+            visible = amount > 0
+            wedge.set_visible(visible)
+            label.set_visible(visible)
+            autotext.set_visible(visible)
+            if not visible:
+                continue
+
+            fraction = amount / total
+            wedge.set_theta1(theta)
+            wedge.set_theta2(theta + 360 * fraction)
+
+            # Same label placement as Axes.pie
+            middle = math.radians(theta + 180 * fraction)
+            x, y = math.cos(middle), math.sin(middle)
+            label.set_position((1.1 * x, 1.1 * y))
+            label.set_horizontalalignment("left" if x > 0 else "right")
+            autotext.set_position((0.6 * x, 0.6 * y))
+            autotext.set_text(f"{fraction * 100:.1f}%")
+            theta += 360 * fraction
+
+        if not self.pie_visible:
+            self.show_canvas(self.pie_canvas,
+                             before=self.bar_canvas if self.bar_visible else None)
+            self.pie_visible = True
+        self.pie_canvas.draw_idle()
+
+    def update_bars(self, gross, net):
         values = [gross, net]
 
-        # Create bars with colors based on profit/loss
-        colors = [bar_colors[0], bar_colors[1] if net >= 0 else bar_colors[0]]
-        ax2.bar(categories, values, color=colors)
-        ax2.set_title("Profit Analysis", fontsize=12, pad=20, color=text_color)
-        ax2.set_ylabel("Amount ($)", color=text_color)
-        ax2.tick_params(axis="x", colors=text_color)
-        ax2.tick_params(axis="y", colors=text_color)
-
-        # Add value labels on bars
-        for i, v in enumerate(values):
-            ax2.text(
-                i,
-                v / 2,
-                f"${v:.2f}",
-                ha="center",
-                va="center",
-                fontweight="bold",
-                color=text_color,
-            )
-
-        # Set axes background color
-        ax2.set_facecolor(chart_bg_color)
-
-        # Create canvas
-        canvas2 = FigureCanvasTkAgg(fig2, master=charts_row)
-        canvas2.draw()
-        canvas2.get_tk_widget().pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        # Colors based on profit/loss
+        colors = [BAR_COLORS[0], BAR_COLORS[1] if net >= 0 else BAR_COLORS[0]]
+        for bar, text, value, color in zip(self.bars, self.bar_texts, values, colors):
+            bar.set_height(value)
+            bar.set_facecolor(color)
+            # Value labels on bars
+            text.set_position((bar.get_x() + bar.get_width() / 2, value / 2))
+            text.set_text(f"${value:.2f}")
+
+        self.bar_ax.relim()
+        self.bar_ax.autoscale_view()
+
+        if not self.bar_visible:
+            self.show_canvas(self.bar_canvas)
+            self.bar_visible = True
+        self.bar_canvas.draw_idle()
+
+    def show_canvas(self, canvas, before=None):
+        if self.headless:
+            return
+        canvas.get_tk_widget().pack(
+            side=tk.LEFT, fill=tk.BOTH, expand=True,
+            before=before.get_tk_widget() if before is not None else None)
+
+    def hide_canvas(self, canvas):
+        if not self.headless:
+            canvas.get_tk_widget().pack_forget()
+
+    def rebuild_charts(self):
+        """Rebuild the charts for a new theme, keeping the last data."""
+        if not self.built or self.built_for_dark_mode == self.app.dark_mode:
+            return
+        self.build_charts()
+        if self.last_data is not None:
+            self.update_charts(*self.last_data)
+
+    def destroy_charts(self):
+        """Destroy the chart widgets and release the figures."""
+        if not self.headless:
+            for widget in self.app.chart_frame.winfo_children():
+                widget.destroy()
+        for figure in list(self.figures):
+            self.close_figure(figure)
+        self.built = False
 
     def clear_charts(self):
-        for widget in self.app.chart_frame.winfo_children():
-            widget.destroy()
+        # Hide the charts but keep the figures around for the next update
+        self.last_data = None
+        if not self.built:
+            return
+        for canvas in (self.pie_canvas, self.bar_canvas):
+            self.hide_canvas(canvas)
+        self.pie_visible = False
+        self.bar_visible = False
@@ -0,0 +1,97 @@
+"""Headless memory soak test for chart rendering.
+
+Runs ChartManager.update_charts hundreds of times on the Agg backend and
+uses tracemalloc to check that memory stays flat. The theme is toggled
+every cycle of updates to exercise the rebuild path too.
+
+Matplotlib keeps a bounded text-metrics cache per canvas, which fills as
+new labels are drawn and is dropped when the charts are rebuilt. Memory
+is therefore compared at the end of each cycle, when those caches are
+equally full, rather than against a single point after warm-up.
+
+    python chart_soak.py --cycles 10
+"""
+import argparse
+import gc
+import random
+import sys
+import tracemalloc
+from types import SimpleNamespace
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+from chart_manager import ChartManager, MAX_LIVE_FIGURES  # noqa: E402
+
+
+def run_updates(chart_manager, app, iterations, rng):
+    for _ in range(iterations):
+        costs = [rng.choice((0, rng.uniform(0, 5000))) for _ in range(5)]
+        gross = sum(costs)
+        net = rng.uniform(-2000, 10000)
+        chart_manager.update_charts(*costs, gross, net)
+        if len(chart_manager.figures) > MAX_LIVE_FIGURES:
+            raise AssertionError(
+                f"{len(chart_manager.figures)} live figures, cap is {MAX_LIVE_FIGURES}")
+
+
+def run_cycle(chart_manager, app, iterations, rng):
+    """Toggle the theme, then update the charts `iterations` times."""
+    app.dark_mode = not app.dark_mode
+    run_updates(chart_manager, app, iterations, rng)
+    gc.collect()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cycles", type=int, default=4,
+                        help="measured theme cycles (at least 2)")
+    parser.add_argument("--cycle-length", type=int, default=50,
+                        help="updates between theme toggles")
+    parser.add_argument("--warmup", type=int, default=2,
+                        help="cycles run before tracing starts")
+    parser.add_argument("--max-growth-kb", type=float, default=256,
+                        help="allowed growth from the first to the last cycle")
+    args = parser.parse_args(argv)
+    if args.cycles < 2:
+        parser.error("--cycles must be at least 2")
+
+    rng = random.Random(42)
+    app = SimpleNamespace(dark_mode=False, chart_frame=None)
+    chart_manager = ChartManager(app, headless=True)
+
+    # Warm-up runs untraced, so it costs no tracemalloc overhead
+    for _ in range(args.warmup):
+        run_cycle(chart_manager, app, args.cycle_length, rng)
+
+    tracemalloc.start()
+    checkpoints = []
+    for cycle in range(args.cycles):
+        run_cycle(chart_manager, app, args.cycle_length, rng)
+        checkpoints.append(tracemalloc.get_traced_memory()[0])
+        if cycle == 0:
+            start = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    end = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    growth_kb = (checkpoints[-1] - checkpoints[0]) / 1024
+    print(f"Cycles: {args.cycles} of {args.cycle_length} updates "
+          f"(after {args.warmup} warmup cycles)")
+    print("Traced memory per cycle: "
+          + ", ".join(f"{checkpoint / 1024:.0f}" for checkpoint in checkpoints) + " KB")
+    print(f"Growth from the first cycle: {growth_kb:+.0f} KB "
+          f"(peak {peak / 1024:.0f} KB)")
+    print(f"Live figures: {len(chart_manager.figures)}")
+
+    if growth_kb > args.max_growth_kb:
+        print("Memory grew beyond the allowed limit. Top allocations:")
+        for stat in end.compare_to(start, "lineno")[:10]:
+            print(f"  {stat}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
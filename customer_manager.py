@@ -0,0 +1,119 @@
+import tkinter as tk
+from tkinter import ttk
+from history_indexes import CustomerIndex
+from utils import Debouncer
+
+# Bulk changes (backfill, imports) refresh the table at most this often
+REFRESH_DELAY_MS = 300
+
+CUSTOMER_COLUMNS = (
+    ("customer_name", "Customer", 160),
+    ("quotes", "Quotes", 70),
+    ("total_payment", "Total Payment", 110),
+    ("total_gross", "Total Gross", 110),
+    ("total_net", "Total Net", 110),
+    ("avg_payment", "Avg Payment", 100),
+    ("avg_gross", "Avg Gross", 100),
+    ("avg_net", "Avg Net", 100),
+    ("avg_margin", "Avg Margin %", 100),
+)
+
+
+def format_summary(summary):
+    values = [summary["customer_name"], summary["quotes"]]
+    for key, _, _ in CUSTOMER_COLUMNS[2:-1]:
+        values.append(f"${summary[key]:.2f}")
+    values.append(f"{summary['avg_margin']:.1f}%")
+    return values
+
+
+class CustomerManager:
+    """Customers tab: per-customer totals and averages over the history."""
+
+    def __init__(self, app):
+        self.app = app
+        self.index = CustomerIndex(app.history_manager.history)
+        # The Customers tab is built the first time it is selected
+        self.customer_tree = None
+        self.refresh_later = Debouncer(app.root, REFRESH_DELAY_MS, self.refresh)
+
+    def setup_customer_tab(self):
+        customer_frame = tk.Frame(self.app.customer_tab, padx=10, pady=10)
+        customer_frame.pack(fill=tk.BOTH, expand=True)
+        self.app.theme_manager.register(customer_frame, "panel")
+
+        customer_title = tk.Label(
+            customer_frame,
+            text="Customers",
+            font=("Helvetica", 14, "bold"),
+        )
+        customer_title.pack(anchor="w", pady=(0, 5))
+        self.app.theme_manager.register(customer_title, "label")
+
+        customer_hint = tk.Label(
+            customer_frame,
+            text="Double-click a customer to see their quotes.",
+            font=("Helvetica", 10),
+        )
+        customer_hint.pack(anchor="w", pady=(0, 10))
+        self.app.theme_manager.register(customer_hint, "label")
+
+        self.customer_tree = ttk.Treeview(
+            customer_frame,
+            columns=[key for key, _, _ in CUSTOMER_COLUMNS],
+            show="headings",
+            style="Custom.Treeview",
+        )
+        for key, heading, width in CUSTOMER_COLUMNS:
+            self.customer_tree.heading(key, text=heading)
+            self.customer_tree.column(key, width=width)
+        self.customer_tree.bind("<Double-Button-1>", self.on_customer_opened)
+
+        customer_scroll = ttk.Scrollbar(
+            customer_frame,
+            orient="vertical",
+            command=self.customer_tree.yview
+        )
+        self.customer_tree.configure(yscrollcommand=customer_scroll.set)
+
+        self.customer_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        customer_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.refresh()
+
+    def history_changed(self, index=None):
+        """Called by HistoryManager after records are added or cleared.
+
+        `index` is the position of a single added record. Its customer's row
+        is updated straight away; anything bigger refreshes the table once
+        the changes settle.
+        """
+        if self.customer_tree is None:
+            return
+        if index is None:
+            self.refresh_later.schedule()
+            return
+        customer_id = int(self.app.history_manager.history.customer_id[index])
+        values = format_summary(self.index.summary(customer_id))
+        iid = str(customer_id)
+        if self.customer_tree.exists(iid):
+            self.customer_tree.item(iid, values=values)
+        else:
+            self.refresh()
+
+    def refresh(self):
+        if self.customer_tree is None:
+            return
+        self.customer_tree.delete(*self.customer_tree.get_children())
+        history = self.app.history_manager.history
+        for summary in self.index.summaries():
+            customer_id = history.name_ids[summary["customer_name"]]
+            self.customer_tree.insert(
+                "", "end", iid=str(customer_id), values=format_summary(summary))
+
+    def on_customer_opened(self, event=None):
+        selection = self.customer_tree.selection()
+        if not selection:
+            return
+        customer_name = self.app.history_manager.history.names[int(selection[0])]
+        self.app.history_manager.show_customer(customer_name)
@@ -0,0 +1,110 @@
+import tkinter as tk
+from tkinter import filedialog, messagebox, ttk
+import os
+import perf_stats
+
+# How often the open panel re-reads the statistics
+REFRESH_MS = 1000
+
+STAT_COLUMNS = ("count", "last_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms")
+
+
+class DebugPanel:
+    """Window showing the rolling hot-path timings from perf_stats.
+
+    Opened with F12 or by double-clicking the status bar.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.window = None
+        self.refresh_job = None
+
+    def show(self, event=None):
+        if self.window is not None:
+            self.window.deiconify()
+            self.window.lift()
+            return
+
+        self.window = tk.Toplevel(self.app.root)
+        self.window.title("Performance")
+        self.window.geometry("640x320")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        frame = tk.Frame(self.window, padx=10, pady=10)
+        frame.pack(fill=tk.BOTH, expand=True)
+        self.app.theme_manager.register(frame, "panel")
+
+        self.enabled_var = tk.BooleanVar(value=perf_stats.enabled)
+        enabled_check = tk.Checkbutton(
+            frame,
+            text="Record timings",
+            variable=self.enabled_var,
+            command=self.toggle_recording,
+            font=("Helvetica", 10),
+        )
+        enabled_check.pack(anchor="w")
+        self.app.theme_manager.register(enabled_check, "checkbutton")
+
+        self.tree = ttk.Treeview(
+            frame,
+            columns=STAT_COLUMNS,
+            style="Custom.Treeview",
+            height=8,
+        )
+        self.tree.heading("#0", text="Phase")
+        self.tree.column("#0", width=160)
+        for column in STAT_COLUMNS:
+            self.tree.heading(column, text=column.replace("_ms", " (ms)"))
+            self.tree.column(column, width=70, anchor="e")
+        self.tree.pack(fill=tk.BOTH, expand=True, pady=10)
+
+        buttons = tk.Frame(frame)
+        buttons.pack(fill=tk.X)
+        self.app.theme_manager.register(buttons, "panel")
+
+        for text, command in (("Export JSON", self.export_json),
+                              ("Reset", self.reset)):
+            button = tk.Button(buttons, text=text, command=command,
+                               font=("Helvetica", 10))
+            button.pack(side=tk.RIGHT, padx=5)
+            self.app.theme_manager.register(button, "button_tertiary")
+
+        self.refresh()
+
+    def toggle_recording(self):
+        perf_stats.set_enabled(self.enabled_var.get())
+
+    def refresh(self):
+        self.tree.delete(*self.tree.get_children())
+        for name, summary in perf_stats.snapshot().items():
+            values = [summary.get(column, 0) for column in STAT_COLUMNS]
+            values = [values[0]] + [f"{value:.2f}" for value in values[1:]]
+            self.tree.insert("", "end", text=name, values=values)
+        self.refresh_job = self.window.after(REFRESH_MS, self.refresh)
+
+    def reset(self):
+        perf_stats.reset()
+        self.tree.delete(*self.tree.get_children())
+
+    def export_json(self):
+        file_path = filedialog.asksaveasfilename(
+            parent=self.window, defaultextension=".json",
+            filetypes=[("JSON Files", "*.json")])
+        if not file_path:
+            return
+        try:
+            perf_stats.export_json(file_path)
+        except OSError as e:
+            messagebox.showerror(
+                "Error", f"Failed to export timings: {str(e)}", parent=self.window)
+            return
+        self.app.status_bar.config(
+            text=f"Timings exported to {os.path.basename(file_path)}")
+
+    def close(self):
+        if self.refresh_job is not None:
+            self.window.after_cancel(self.refresh_job)
+            self.refresh_job = None
+        self.window.destroy()
+        self.window = None
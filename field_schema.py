@@ -0,0 +1,120 @@
+from quote_engine import parse_discount
+from utils import normalize_field_name
+
+
+class MissingFieldsError(ValueError):
+    """Raised when required form fields are empty."""
+
+    def __init__(self, fields):
+        super().__init__(
+            "Missing required fields: " + ", ".join(field.name for field in fields))
+        self.fields = fields
+
+
+def parse_text(text):
+    return text.strip()
+
+
+def make_float_parser(name):
+    def parse_float(text):
+        try:
+            return float(text)
+        except ValueError:
+            raise ValueError(f"Invalid number in {name}") from None
+    return parse_float
+
+
+class Field:
+    """One input field of the calculator form.
+
+    Everything that used to be derived from the field name on every call
+    (the entry key, the parser, the empty value) is computed once here.
+    """
+
+    def __init__(self, name, attr, field_type, csv_header, required=False,
+                 placeholder=None):
+        self.name = name
+        self.key = normalize_field_name(name)  # Key into app.entries
+        self.attr = attr  # Key in the validated record
+        self.type = field_type
+        self.csv_header = csv_header
+        self.required = required
+        self.placeholder = placeholder
+        if field_type == "float":
+            self.parser = make_float_parser(name)
+            self.default = 0.0
+        elif field_type == "discount":
+            self.parser = parse_discount
+            self.default = (0.0, 0.0)
+        else:
+            self.parser = parse_text
+            self.default = ""
+
+    def parse(self, raw, check_required=True):
+        """Parse raw entry text. Returns None for an empty required field."""
+        text = raw.strip()
+        if not text or text == self.placeholder:
+            return None if (self.required and check_required) else self.default
+        return self.parser(text)
+
+
+# Input fields, in form order. Adding a field here adds it to the form,
+# reset, validation and the Save CSV. A new cost must also be priced: add
+# it to ProfitCalculatorApp.price_inputs, the price_batch and solve_payment
+# arguments, quote_import.PRICED_ATTRS, solve_quotes.SOLVER_ATTRS and
+# monte_carlo.simulation_key.
+FIELDS = [
+    Field("Customer Name", "customer_name", "text", "Customer Name",
+          required=True),
+    Field("Gear Rental Cost ($)", "gear_cost", "float", "Gear Rental",
+          required=True),
+    Field("Travel Expenses ($)", "travel_cost", "float", "Travel"),
+    Field("Hotel Expenses ($)", "hotel_cost", "float", "Hotel"),
+    Field("Payroll Costs ($)", "payroll_cost", "float", "Payroll",
+          required=True),
+    Field("Other Expenses ($)", "other_cost", "float", "Other"),
+    Field("Customer Payment ($)", "customer_payment", "float",
+          "Customer Payment", required=True),
+    Field("Tax Rate (%)", "tax_rate", "float", "Tax Rate"),
+    Field("Discount", "discount", "discount", "Discount",
+          placeholder="e.g. 10% or $50"),
+]
+
+# Columns of the Save CSV, which is also the bulk import format
+QUOTE_CSV_HEADERS = [field.csv_header for field in FIELDS] + ["Gross", "Net", "Margin %"]
+
+FIELDS_BY_KEY = {field.key: field for field in FIELDS}
+FIELDS_BY_NAME = {field.name: field for field in FIELDS}
+FIELDS_BY_CSV_HEADER = {field.csv_header: field for field in FIELDS}
+
+
+def validate_form(values, check_required=True):
+    """Validate raw form text in one pass and return a typed record.
+
+    `values` maps field keys to raw entry text. Returns a dict keyed by each
+    field's `attr`. Raises MissingFieldsError if required fields are empty
+    (unless check_required is False, in which case they get their default)
+    and ValueError for text that does not parse.
+    """
+    record = {}
+    missing = []
+    for field in FIELDS:
+        value = field.parse(values.get(field.key, ""), check_required)
+        if value is None:
+            missing.append(field)
+        record[field.attr] = value
+    if missing:
+        raise MissingFieldsError(missing)
+    return record
+
+
+def csv_values(record, values):
+    """Row for the Save CSV: typed values, with the discount as typed."""
+    row = []
+    for field in FIELDS:
+        if field.type == "discount":
+            text = values.get(field.key, "").strip()
+            row.append("" if text == field.placeholder else text)
+        else:
+            row.append(record[field.attr])
+    return row
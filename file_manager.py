@@ -1,28 +1,20 @@
 import csv
 import os
 from tkinter import messagebox, filedialog
-from fpdf import FPDF
-from utils import normalize_field_name
+from background_tasks import BackgroundTask
+from pdf_report import export_history_pdf
+from field_schema import QUOTE_CSV_HEADERS, csv_values, validate_form
 
 
 class FileManager:
     def __init__(self, app):
         self.app = app
+        self.pdf_task = None
 
     def save_to_csv(self):
         try:
-            customer_name = self.app.entries[normalize_field_name(
-                "Customer Name")].get().strip()
-            gear_cost = self.app.get_float_value("Gear Rental Cost ($)", 0)
-            travel_cost = self.app.get_float_value("Travel Expenses ($)", 0)
-            hotel_cost = self.app.get_float_value("Hotel Expenses ($)", 0)
-            payroll_cost = self.app.get_float_value("Payroll Costs ($)", 0)
-            other_cost = self.app.get_float_value("Other Expenses ($)", 0)
-            customer_payment = self.app.get_float_value(
-                "Customer Payment ($)", 0)
-            tax_rate = self.app.get_float_value("Tax Rate (%)", 0)
-            discount = self.app.entries[normalize_field_name(
-                "Discount")].get().strip()
+            values = self.app.form_values()
+            record = validate_form(values, check_required=False)
 
             # Get results
             gross_text = self.app.result_gross_value.cget(
@@ -41,36 +33,10 @@ class FileManager:
                 return
 
             # Save to CSV
-            with open(file_path, mode="w", newline="") as file:
+            with open(file_path, mode="w", newline="", encoding="utf-8") as file:
                 writer = csv.writer(file)
-                writer.writerow([
-                    "Customer Name",
-                    "Gear Rental",
-                    "Travel",
-                    "Hotel",
-                    "Payroll",
-                    "Other",
-                    "Customer Payment",
-                    "Tax Rate",
-                    "Discount",
-                    "Gross",
-                    "Net",
-                    "Margin %",
-                ])
-                writer.writerow([
-                    customer_name,
-                    gear_cost,
-                    travel_cost,
-                    hotel_cost,
-                    payroll_cost,
-                    other_cost,
-                    customer_payment,
-                    tax_rate,
-                    discount,
-                    gross,
-                    net,
-                    margin,
-                ])
+                writer.writerow(QUOTE_CSV_HEADERS)
+                writer.writerow(csv_values(record, values) + [gross, net, margin])
 
             # Update status
             self.app.status_bar.config(
@@ -84,54 +50,44 @@ class FileManager:
         if not history:
             messagebox.showwarning("Warning", "No history to export.")
             return
+        if self.pdf_task is not None:
+            messagebox.showwarning("Warning", "A PDF export is already running.")
+            return
 
         file_path = filedialog.asksaveasfilename(
             defaultextension=".pdf", filetypes=[("PDF Files", "*.pdf")])
         if not file_path:
             return
 
-        try:
-            # Create PDF with landscape orientation
-            pdf = FPDF(orientation="L")  # Landscape mode
-            pdf.add_page()
-            # Use a smaller font size to fit more data
-            pdf.set_font("Arial", size=11)
-
-            # Add title
-            pdf.cell(0, 10, txt="Calculation History", ln=True, align="C")
+        # Offer to include the charts of the last calculation
+        chart_data = self.app.chart_manager.last_data
+        if chart_data is not None and not messagebox.askyesno(
+                "Export to PDF", "Include the expense charts in the report?"):
+            chart_data = None
 
-            # Define column widths (adjust as needed)
-            # Wider columns for better readability
-            col_widths = [40, 50, 50, 50, 40, 40]
+        # The report is built in a worker process from a snapshot of history
+        self.pdf_task = BackgroundTask(
+            self.app.root,
+            export_history_pdf,
+            args=(file_path, history.snapshot(), chart_data),
+            on_progress=self.on_pdf_progress,
+            on_done=self.on_pdf_done,
+            on_error=self.on_pdf_error,
+        ).start()
+        self.app.status_bar.config(text="Building PDF report...")
 
-            # Add table headers
-            headers = ["Date", "Customer Name", "Customer Payment",
-                       "Gross Expenses", "Net Profit", "Margin %"]
-            for i, header in enumerate(headers):
-                pdf.cell(col_widths[i], 10, txt=header, border=1)
-            pdf.ln()
+    def on_pdf_progress(self, done, total):
+        self.app.status_bar.config(
+            text=f"Building PDF report... {done}/{total} rows")
 
-            # Add table rows
-            for item in history:
-                pdf.cell(col_widths[0], 10, txt=item["date"], border=1)
-                pdf.cell(col_widths[1], 10,
-                         txt=item["customer_name"], border=1)
-                pdf.cell(col_widths[2], 10,
-                         txt=f"${item['customer']:.2f}", border=1)
-                pdf.cell(col_widths[3], 10,
-                         txt=f"${item['gross']:.2f}", border=1)
-                pdf.cell(col_widths[4], 10,
-                         txt=f"${item['net']:.2f}", border=1)
-                pdf.cell(col_widths[5], 10,
-                         txt=f"{item['margin']:.1f}%", border=1)
-                pdf.ln()
+    def on_pdf_done(self, file_path):
+        self.pdf_task = None
+        messagebox.showinfo(
+            "Success", "History exported to PDF successfully!")
+        self.app.status_bar.config(
+            text=f"History exported to {os.path.basename(file_path)}")
 
-            # Save PDF
-            pdf.output(file_path)
-            messagebox.showinfo(
-                "Success", "History exported to PDF successfully!")
-            self.app.status_bar.config(
-                text=f"History exported to {os.path.basename(file_path)}")
-        except Exception as e:
-            messagebox.showerror(
-                "Error", f"Failed to export history: {str(e)}")
+    def on_pdf_error(self, error):
+        self.pdf_task = None
+        messagebox.showerror(
+            "Error", f"Failed to export history: {str(error)}")
@@ -0,0 +1,247 @@
+import json
+import os
+import struct
+import zstandard
+from json.encoder import encode_basestring
+import perf_stats
+from background_tasks import TaskCancelled
+from history_columns import HistoryColumns
+from history_merge import history_key, stored_keys
+from utils import atomic_write
+
+ARCHIVE_FORMAT = "profit-calculator-history"
+ARCHIVE_VERSION = 1
+
+# Rows per zstd frame. Each frame is compressed and decompressed on its
+# own, so this bounds the memory used on both sides and is the unit that
+# partial loads seek to.
+FRAME_ROWS = 20000
+COMPRESSION_LEVEL = 3
+
+# The index goes in a zstd skippable frame at the end of the file, so
+# `zstd -d` still turns an archive into plain JSON lines. It ends with a
+# fixed footer: index length, then INDEX_MAGIC.
+SKIPPABLE_MAGIC = 0x184D2A5E
+INDEX_MAGIC = 0x8F92EAB1
+FRAME_HEADER = struct.Struct("<II")
+INDEX_FOOTER = struct.Struct("<II")
+
+# Bytes read at a time when streaming an archive without an index
+STREAM_READ_SIZE = 1024 * 1024
+
+# One record per line: [timestamp, name, customer, gross, net, margin]
+format_record = "[{},{},{},{},{},{}]".format
+
+
+def json_values(array):
+    """JSON text of each value of a numeric array, converted in bulk.
+
+    json.dumps() formats the whole list in C (NaN and infinity included);
+    numbers never contain ", ", so splitting the result is safe.
+    """
+    return json.dumps(array.tolist())[1:-1].split(", ")
+
+
+def encode_records(history, start, stop):
+    """JSON lines for records start..stop of a HistoryColumns."""
+    ids = history.customer_id[start:stop].tolist()
+    quoted = {i: encode_basestring(history.names[i]) for i in set(ids)}
+    lines = map(
+        format_record,
+        json_values(history.timestamp[start:stop]),
+        [quoted[i] for i in ids],
+        json_values(history.customer[start:stop]),
+        json_values(history.gross[start:stop]),
+        json_values(history.net[start:stop]),
+        json_values(history.margin[start:stop]),
+    )
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def decode_rows(data):
+    """Rows of a block of JSON lines, parsing the whole block as one JSON array.
+
+    JSON escapes newlines inside strings, so the only newlines in the
+    block are the ones between records.
+    """
+    text = data.decode("utf-8").strip()
+    if not text:
+        return []
+    return [tuple(row) for row in json.loads("[" + text.replace("\n", ",") + "]")]
+
+
+@perf_stats.timed_function("export.archive")
+def write_history_archive(report, cancel_event, file_path, history,
+                          frame_rows=FRAME_ROWS):
+    """Write a HistoryColumns snapshot as a zstd-compressed archive.
+
+    Runs as a BackgroundTask target. Rows are converted, encoded and
+    compressed one frame at a time, so only one frame's worth of data is
+    ever held in memory. The file replaces `file_path` once complete.
+    """
+    compressor = zstandard.ZstdCompressor(
+        level=COMPRESSION_LEVEL, write_checksum=True, write_content_size=True)
+    total = len(history)
+    frames = []
+    offset = 0
+    with atomic_write(file_path, "wb") as file:
+        for start in range(0, total, frame_rows):
+            if cancel_event.is_set():
+                raise TaskCancelled()
+            stop = min(start + frame_rows, total)
+            timestamps = history.column("timestamp")[start:stop]
+            frame = compressor.compress(encode_records(history, start, stop))
+            file.write(frame)
+            frames.append([offset, len(frame), stop - start,
+                           int(timestamps.min()), int(timestamps.max())])
+            offset += len(frame)
+            report(stop, total)
+
+        index = json.dumps({
+            "format": ARCHIVE_FORMAT,
+            "version": ARCHIVE_VERSION,
+            "rows": total,
+            "frames": frames,
+        }).encode("utf-8")
+        file.write(FRAME_HEADER.pack(SKIPPABLE_MAGIC, len(index) + INDEX_FOOTER.size))
+        file.write(index)
+        file.write(INDEX_FOOTER.pack(len(index), INDEX_MAGIC))
+    return file_path
+
+
+class HistoryArchive:
+    """Reader for archives written by write_history_archive.
+
+    `frames` lists (offset, compressed size, rows, first timestamp, last
+    timestamp) per frame, so a caller can load just the frames covering a
+    date range. Archives whose index is missing (say, a copy that was cut
+    short) can still be read from the start with stream_rows().
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        self.decompressor = zstandard.ZstdDecompressor()
+        self.frames = self.read_index()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def read_index(self):
+        """The frame table, or None when the file has no index."""
+        size = self.file.seek(0, os.SEEK_END)
+        if size < FRAME_HEADER.size + INDEX_FOOTER.size:
+            return None
+        self.file.seek(size - INDEX_FOOTER.size)
+        length, magic = INDEX_FOOTER.unpack(self.file.read(INDEX_FOOTER.size))
+        if magic != INDEX_MAGIC or length > size - FRAME_HEADER.size - INDEX_FOOTER.size:
+            return None
+        self.file.seek(size - INDEX_FOOTER.size - length)
+        try:
+            index = json.loads(self.file.read(length))
+        except ValueError:
+            return None
+        if index.get("format") != ARCHIVE_FORMAT:
+            raise ValueError("Not a history archive")
+        if index.get("version", 0) > ARCHIVE_VERSION:
+            raise ValueError("The archive was written by a newer version")
+        return [tuple(frame) for frame in index["frames"]]
+
+    def row_count(self):
+        if self.frames is None:
+            return None
+        return sum(frame[2] for frame in self.frames)
+
+    def frames_between(self, first=None, last=None):
+        """Indexes of the frames that may hold rows with first <= timestamp <= last."""
+        return [
+            number for number, (_, _, _, low, high) in enumerate(self.frames)
+            if (first is None or high >= first) and (last is None or low <= last)
+        ]
+
+    def read_frame(self, number):
+        """Rows of one frame, read by seeking straight to it."""
+        offset, length = self.frames[number][:2]
+        self.file.seek(offset)
+        return decode_rows(self.decompressor.decompress(self.file.read(length)))
+
+    def stream_rows(self, chunk_size=FRAME_ROWS):
+        """Yield lists of rows, decompressing the file from the start.
+
+        Doesn't need the index, and skips it when there is one.
+        """
+        self.file.seek(0)
+        reader = self.decompressor.stream_reader(self.file, read_across_frames=True)
+        buffered = b""
+        rows = []
+        while True:
+            data = reader.read(STREAM_READ_SIZE)
+            if not data:
+                break
+            lines, _, buffered = (buffered + data).rpartition(b"\n")
+            rows.extend(decode_rows(lines))
+            if len(rows) >= chunk_size:
+                yield rows
+                rows = []
+        rows.extend(decode_rows(buffered))
+        if rows:
+            yield rows
+
+    def iter_rows(self, first=None, last=None):
+        """Yield lists of rows, one per frame, with timestamps in [first, last]."""
+        if self.frames is None:
+            chunks = self.stream_rows()
+        else:
+            chunks = map(self.read_frame, self.frames_between(first, last))
+        for rows in chunks:
+            if first is not None or last is not None:
+                rows = [
+                    row for row in rows
+                    if (first is None or row[0] >= first)
+                    and (last is None or row[0] <= last)
+                ]
+            yield rows
+
+    def close(self):
+        self.file.close()
+
+
+@perf_stats.timed_function("import.archive")
+def read_history_archive(report, cancel_event, file_path, db_path,
+                         first=None, last=None):
+    """BackgroundTask target: load an archive into the history database.
+
+    Records already in the database (by history_key()) are skipped, so
+    opening an archive twice adds nothing. All frames are stored in one
+    transaction, which is rolled back if a frame fails to load or the
+    task is cancelled. Returns a dict with the new records as a
+    HistoryColumns, for the UI to append, and the number of duplicates.
+    Uses its own database connection, since SQLite connections can't be
+    shared with the Tk thread.
+    """
+    from history_store import HistoryStore
+
+    history = HistoryColumns()
+    duplicates = 0
+    store = HistoryStore(db_path)
+
+    def new_rows(archive):
+        nonlocal duplicates
+        seen = stored_keys(store)
+        total = archive.row_count()
+        for rows in archive.iter_rows(first, last):
+            new = [row for row in rows if history_key(row) not in seen]
+            duplicates += len(rows) - len(new)
+            history.extend_rows(new)
+            report(len(history) + duplicates, total)
+            yield from new
+
+    try:
+        with HistoryArchive(file_path) as archive:
+            store.add_many(new_rows(archive))
+    finally:
+        store.close()
+    return {"history": history, "duplicates": duplicates}
@@ -0,0 +1,226 @@
+import time
+from datetime import datetime
+import numpy as np
+
+DATE_FORMAT = "%Y-%m-%d %H:%M"
+
+# Numeric columns, in display order after date and customer name
+VALUE_COLUMNS = ("customer", "gross", "net", "margin")
+
+
+def format_timestamp(timestamp):
+    return time.strftime(DATE_FORMAT, time.localtime(timestamp))
+
+
+def parse_date(text):
+    """Epoch seconds for a "%Y-%m-%d %H:%M" local date string."""
+    return int(datetime.strptime(text, DATE_FORMAT).timestamp())
+
+
+class HistoryColumns:
+    """Calculation history stored as one NumPy array per column.
+
+    Dates are int64 epoch seconds and customer names are interned into a
+    string table, so a record costs a few dozen bytes rather than a dict
+    of Python objects. Arrays grow by doubling, and column() returns
+    zero-copy views for charts and aggregates.
+
+    Indexes registered with add_index() are told about every insert and
+    clear, so they can be kept up to date incrementally.
+    """
+
+    def __init__(self, capacity=1024):
+        self.size = 0
+        self.names = []  # String table: customer id -> name
+        self.name_ids = {}  # Customer name -> id
+        self.timestamp = np.empty(capacity, dtype=np.int64)
+        self.customer_id = np.empty(capacity, dtype=np.int64)
+        self.customer = np.empty(capacity, dtype=np.float64)
+        self.gross = np.empty(capacity, dtype=np.float64)
+        self.net = np.empty(capacity, dtype=np.float64)
+        self.margin = np.empty(capacity, dtype=np.float64)
+        self.indexes = []
+
+    def __len__(self):
+        return self.size
+
+    def arrays(self):
+        return {
+            "timestamp": self.timestamp,
+            "customer_id": self.customer_id,
+            "customer": self.customer,
+            "gross": self.gross,
+            "net": self.net,
+            "margin": self.margin,
+        }
+
+    def add_index(self, index):
+        """Register an object with on_insert(start, count) and on_clear()."""
+        self.indexes.append(index)
+        if self.size:
+            index.on_insert(0, self.size)
+
+    def column(self, name):
+        """Zero-copy view of the filled part of a column."""
+        return getattr(self, name)[:self.size]
+
+    def intern(self, name):
+        customer_id = self.name_ids.get(name)
+        if customer_id is None:
+            customer_id = len(self.names)
+            self.names.append(name)
+            self.name_ids[name] = customer_id
+        return customer_id
+
+    def reserve(self, capacity):
+        """Make room for `capacity` records, doubling as needed."""
+        current = len(self.timestamp)
+        if capacity <= current:
+            return
+        new_capacity = max(capacity, current * 2)
+        for name, array in self.arrays().items():
+            grown = np.empty(new_capacity, dtype=array.dtype)
+            grown[:self.size] = array[:self.size]
+            setattr(self, name, grown)
+
+    def append(self, timestamp, customer_name, customer, gross, net, margin):
+        """Add one record and return its index."""
+        self.reserve(self.size + 1)
+        index = self.size
+        self.timestamp[index] = timestamp
+        self.customer_id[index] = self.intern(customer_name)
+        self.customer[index] = customer
+        self.gross[index] = gross
+        self.net[index] = net
+        self.margin[index] = margin
+        self.size += 1
+        for history_index in self.indexes:
+            history_index.on_insert(index, 1)
+        return index
+
+    def insert_rows(self, position, rows):
+        """Insert (timestamp, name, customer, gross, net, margin) rows.
+
+        Records after `position` are shifted along, so inserting near the
+        end (the common case) only moves a few records.
+        """
+        if not rows:
+            return
+        count = len(rows)
+        timestamps, names, customer, gross, net, margin = zip(*rows)
+        self.reserve(self.size + count)
+
+        values = {
+            "timestamp": timestamps,
+            "customer_id": [self.intern(name) for name in names],
+            "customer": customer,
+            "gross": gross,
+            "net": net,
+            "margin": margin,
+        }
+        for name, array in self.arrays().items():
+            array[position + count:self.size + count] = array[position:self.size]
+            array[position:position + count] = values[name]
+        self.size += count
+        for index in self.indexes:
+            index.on_insert(position, count)
+
+    def insert_at(self, positions, rows):
+        """Insert rows before the records at `positions`, one per row.
+
+        Each column is rebuilt with a single np.insert() instead of being
+        shifted once per position; the indexes are then rebuilt as if the
+        records had just been loaded.
+        """
+        if not rows:
+            return
+        count = len(rows)
+        timestamps, names, customer, gross, net, margin = zip(*rows)
+        values = {
+            "timestamp": timestamps,
+            "customer_id": [self.intern(name) for name in names],
+            "customer": customer,
+            "gross": gross,
+            "net": net,
+            "margin": margin,
+        }
+        columns = {name: np.insert(self.column(name), positions, values[name])
+                   for name in values}
+        self.reserve(self.size + count)
+        for name, array in self.arrays().items():
+            array[:self.size + count] = columns[name]
+        self.size += count
+        for index in self.indexes:
+            index.on_clear()
+            index.on_insert(0, self.size)
+
+    def extend_rows(self, rows):
+        self.insert_rows(self.size, rows)
+
+    def insert_columns(self, position, other):
+        """Insert every record of another HistoryColumns, array by array."""
+        if not other.size:
+            return
+        count = other.size
+        # Map the other string table onto this one
+        ids = np.array([self.intern(name) for name in other.names], dtype=np.int64)
+        self.reserve(self.size + count)
+        for name, array in self.arrays().items():
+            values = other.column(name)
+            if name == "customer_id":
+                values = ids[values]
+            array[position + count:self.size + count] = array[position:self.size]
+            array[position:position + count] = values
+        self.size += count
+        for index in self.indexes:
+            index.on_insert(position, count)
+
+    def clear(self):
+        self.size = 0
+        self.names = []
+        self.name_ids = {}
+        for index in self.indexes:
+            index.on_clear()
+
+    def customer_name(self, index):
+        return self.names[self.customer_id[index]]
+
+    def row(self, index):
+        """(timestamp, customer name, customer, gross, net, margin)."""
+        return (int(self.timestamp[index]), self.customer_name(index),
+                float(self.customer[index]), float(self.gross[index]),
+                float(self.net[index]), float(self.margin[index]))
+
+    def rows(self, start=0, stop=None):
+        """Rows between start and stop, converted in bulk."""
+        stop = self.size if stop is None else min(stop, self.size)
+        names = self.names
+        return list(zip(
+            self.timestamp[start:stop].tolist(),
+            [names[i] for i in self.customer_id[start:stop].tolist()],
+            self.customer[start:stop].tolist(),
+            self.gross[start:stop].tolist(),
+            self.net[start:stop].tolist(),
+            self.margin[start:stop].tolist(),
+        ))
+
+    def display_row(self, index):
+        """Row values as shown in the History tab."""
+        return (
+            format_timestamp(int(self.timestamp[index])),
+            self.customer_name(index),
+            f"${self.customer[index]:.2f}",
+            f"${self.gross[index]:.2f}",
+            f"${self.net[index]:.2f}",
+            f"{self.margin[index]:.1f}%",
+        )
+
+    def snapshot(self):
+        """An independent, compact copy for use on another thread or process."""
+        copy = HistoryColumns(capacity=max(self.size, 1))
+        for name, array in self.arrays().items():
+            getattr(copy, name)[:self.size] = array[:self.size]
+        copy.size = self.size
+        copy.names = list(self.names)
+        copy.name_ids = dict(self.name_ids)
+        return copy
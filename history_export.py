@@ -0,0 +1,45 @@
+import csv
+import perf_stats
+from background_tasks import TaskCancelled
+from history_columns import format_timestamp
+from utils import atomic_write
+
+HISTORY_HEADERS = ["Date", "Customer Name", "Customer Payment",
+                   "Gross Expenses", "Net Profit", "Margin %"]
+
+# Rows written per chunk between progress reports
+EXPORT_CHUNK_SIZE = 5000
+
+# Bound format methods are cheaper than building f-strings per value
+format_money = "${:.2f}".format
+format_percent = "{:.1f}%".format
+
+
+def format_history_row(row):
+    """Display values for a (timestamp, name, customer, gross, net, margin) row."""
+    timestamp, customer_name, customer, gross, net, margin = row
+    return (format_timestamp(timestamp), customer_name, format_money(customer),
+            format_money(gross), format_money(net), format_percent(margin))
+
+
+@perf_stats.timed_function("export.csv")
+def write_history_csv(report, cancel_event, file_path, history,
+                      chunk_size=EXPORT_CHUNK_SIZE):
+    """Stream a HistoryColumns snapshot to a CSV file in chunks.
+
+    Runs as a BackgroundTask target. Each chunk is converted out of the
+    column arrays in bulk just before it is written. The rows go to a
+    temporary file that only replaces `file_path` once every row has been
+    written.
+    """
+    total = len(history)
+    with atomic_write(file_path, newline="", encoding="utf-8",
+                      buffering=1024 * 1024) as file:
+        writer = csv.writer(file)
+        writer.writerow(HISTORY_HEADERS)
+        for start in range(0, total, chunk_size):
+            if cancel_event.is_set():
+                raise TaskCancelled()
+            writer.writerows(map(format_history_row, history.rows(start, start + chunk_size)))
+            report(min(start + chunk_size, total), total)
+    return file_path
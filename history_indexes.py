@@ -0,0 +1,495 @@
+import bisect
+import time
+from array import array
+from datetime import date, timedelta
+import numpy as np
+
+# Per-customer running sums kept by CustomerIndex
+CUSTOMER_SUMS = ("customer", "gross", "net", "margin")
+
+
+class CustomerIndex:
+    """Per-customer totals and record positions over a HistoryColumns.
+
+    The totals are updated as records are inserted, in O(1) for a single
+    record and with one bincount per column for a batch, so they are never
+    recomputed from the whole history. Each customer also has the list of
+    their record positions, so their quotes can be shown without a scan.
+    """
+
+    def __init__(self, history):
+        self.history = history
+        self.counts = np.zeros(64, dtype=np.int64)
+        self.sums = {name: np.zeros(64, dtype=np.float64) for name in CUSTOMER_SUMS}
+        self.positions = []  # Customer id -> array of record positions
+        # Inserting before the end shifts positions; they are then rebuilt
+        # the next time they are needed
+        self.positions_valid = True
+        history.add_index(self)
+
+    def reserve(self, customers):
+        capacity = len(self.counts)
+        if customers <= capacity:
+            return
+        capacity = max(customers, capacity * 2)
+        self.counts = np.concatenate(
+            [self.counts, np.zeros(capacity - len(self.counts), dtype=np.int64)])
+        for name, sums in self.sums.items():
+            self.sums[name] = np.concatenate(
+                [sums, np.zeros(capacity - len(sums), dtype=np.float64)])
+
+    def on_insert(self, start, count):
+        history = self.history
+        customers = len(history.names)
+        self.reserve(customers)
+        stop = start + count
+
+        if count == 1:
+            customer_id = int(history.customer_id[start])
+            self.counts[customer_id] += 1
+            for name, sums in self.sums.items():
+                sums[customer_id] += getattr(history, name)[start]
+        else:
+            ids = history.customer_id[start:stop]
+            self.counts[:customers] += np.bincount(ids, minlength=customers)
+            for name, sums in self.sums.items():
+                sums[:customers] += np.bincount(
+                    ids, weights=getattr(history, name)[start:stop],
+                    minlength=customers)
+
+        if stop != history.size:
+            self.positions_valid = False
+        elif self.positions_valid:
+            while len(self.positions) < customers:
+                self.positions.append(array("q"))
+            if count == 1:
+                self.positions[int(history.customer_id[start])].append(start)
+            else:
+                self.add_positions(start, stop)
+
+    def add_positions(self, start, stop):
+        """Append the positions of records start..stop, grouped by customer."""
+        ids = self.history.customer_id[start:stop]
+        order = np.argsort(ids, kind="stable")
+        boundaries = np.flatnonzero(np.diff(ids[order])) + 1
+        for group in np.split(order, boundaries):
+            customer_id = int(ids[group[0]])
+            self.positions[customer_id].extend((group + start).tolist())
+
+    def on_clear(self):
+        self.counts[:] = 0
+        for sums in self.sums.values():
+            sums[:] = 0
+        self.positions = []
+        self.positions_valid = True
+
+    def positions_of(self, customer_name):
+        """Record positions of one customer's quotes, in history order."""
+        customer_id = self.history.name_ids.get(customer_name)
+        if customer_id is None:
+            return np.empty(0, dtype=np.int64)
+        if not self.positions_valid:
+            self.positions = [array("q") for _ in self.history.names]
+            self.add_positions(0, self.history.size)
+            self.positions_valid = True
+        return np.array(self.positions[customer_id], dtype=np.int64)
+
+    def summary(self, customer_id):
+        count = int(self.counts[customer_id])
+        totals = {name: float(sums[customer_id]) for name, sums in self.sums.items()}
+        return {
+            "customer_name": self.history.names[customer_id],
+            "quotes": count,
+            "total_payment": totals["customer"],
+            "total_gross": totals["gross"],
+            "total_net": totals["net"],
+            "avg_payment": totals["customer"] / count,
+            "avg_gross": totals["gross"] / count,
+            "avg_net": totals["net"] / count,
+            "avg_margin": totals["margin"] / count,
+        }
+
+    def summaries(self):
+        """Summaries of every customer with at least one quote, by name."""
+        ids = np.flatnonzero(self.counts[:len(self.history.names)])
+        return sorted((self.summary(int(customer_id)) for customer_id in ids),
+                      key=lambda summary: summary["customer_name"].lower())
+
+
+class NameIndex:
+    """Distinct customer names in sorted order, for prefix lookups.
+
+    Names are kept lowercased in a sorted list, so a prefix is a range
+    found with two bisects. Substring search scans the distinct names
+    rather than the records.
+    """
+
+    def __init__(self, history):
+        self.history = history
+        self.keys = []  # Lowercased names, sorted
+        self.ids = []  # Customer id of each entry of self.keys
+        self.lower = []  # Customer id -> lowercased name
+        history.add_index(self)
+
+    def on_insert(self, start, count):
+        names = self.history.names
+        for customer_id in range(len(self.lower), len(names)):
+            key = names[customer_id].lower()
+            self.lower.append(key)
+            position = bisect.bisect_right(self.keys, key)
+            self.keys.insert(position, key)
+            self.ids.insert(position, customer_id)
+
+    def on_clear(self):
+        self.keys = []
+        self.ids = []
+        self.lower = []
+
+    def with_prefix(self, prefix):
+        """Customer ids whose name starts with `prefix`, in name order."""
+        prefix = prefix.lower()
+        start = bisect.bisect_left(self.keys, prefix)
+        stop = bisect.bisect_left(self.keys, prefix + "\U0010ffff", start)
+        return self.ids[start:stop]
+
+    def containing(self, text):
+        """Customer ids whose name contains `text`, ignoring case."""
+        text = text.lower()
+        return [customer_id for customer_id, key in enumerate(self.lower)
+                if text in key]
+
+    def complete(self, prefix, limit=8):
+        names = self.history.names
+        return [names[customer_id] for customer_id in self.with_prefix(prefix)[:limit]]
+
+
+class SortIndex:
+    """Record positions ordered by one column, kept sorted as records are added.
+
+    Appended records are placed with bisect.insort, so the order is never
+    re-sorted. Ties keep history order. Inserting before the end (the
+    startup backfill) or a large batch marks the order stale, and it is
+    rebuilt with one stable argsort the next time it is read.
+    """
+
+    # Batches larger than this are cheaper to re-sort than to insort
+    INSORT_LIMIT = 256
+
+    def __init__(self, history, column, names):
+        self.history = history
+        self.column = column  # A HistoryColumns column, or "customer_name"
+        self.names = names  # NameIndex, for case-insensitive name order
+        self.order = array("q")
+        self.valid = False
+        history.add_index(self)
+
+    def key(self, index):
+        if self.column == "customer_name":
+            return self.names.lower[self.history.customer_id[index]]
+        return getattr(self.history, self.column)[index]
+
+    def on_insert(self, start, count):
+        if not self.valid:
+            return
+        if start + count != self.history.size or count > self.INSORT_LIMIT:
+            self.valid = False
+            return
+        for index in range(start, start + count):
+            bisect.insort(self.order, index, key=self.key)
+
+    def on_clear(self):
+        self.order = array("q")
+        self.valid = True
+
+    def positions(self):
+        """All record positions in ascending order of the column."""
+        self.ensure_valid()
+        # A copy: the array can't grow while a NumPy view of it exists
+        return np.array(self.order, dtype=np.int64)
+
+    def between(self, low=None, high=None):
+        """Positions with low <= value < high, in column order.
+
+        Found with two binary searches over the maintained order.
+        """
+        self.ensure_valid()
+        start = 0 if low is None else bisect.bisect_left(self.order, low, key=self.key)
+        stop = (len(self.order) if high is None
+                else bisect.bisect_left(self.order, high, start, key=self.key))
+        return np.array(self.order[start:stop], dtype=np.int64)
+
+    def ensure_valid(self):
+        if not self.valid:
+            if self.column == "customer_name":
+                # Rank the distinct names once, then sort the records by rank
+                _, rank = np.unique(np.array(self.names.lower, dtype=object),
+                                    return_inverse=True)
+                values = rank[self.history.column("customer_id")]
+            else:
+                values = self.history.column(self.column)
+            self.order = array("q", np.argsort(values, kind="stable").tobytes())
+            self.valid = True
+
+
+class HistoryFilter:
+    """What the History tab is filtered by. None means no limit."""
+
+    def __init__(self, customer=None, text="", payment=(None, None),
+                 margin=(None, None), dates=(None, None), label=""):
+        self.customer = customer  # Exact customer name
+        self.text = text  # Substring of the customer name
+        self.payment = payment  # (min, max) customer payment
+        self.margin = margin  # (min, max) margin %
+        self.dates = dates  # (start, end) epoch seconds, end exclusive
+        self.label = label  # Describes the customer or period filtered to
+
+    def active(self):
+        return (self.customer is not None or bool(self.text)
+                or self.payment != (None, None) or self.margin != (None, None)
+                or self.dates != (None, None))
+
+
+def filter_customer_ids(history, names, history_filter):
+    """Customer ids allowed by the name conditions, or None for any."""
+    ids = None
+    if history_filter.customer is not None:
+        customer_id = history.name_ids.get(history_filter.customer)
+        ids = [] if customer_id is None else [customer_id]
+    if history_filter.text:
+        matching = names.containing(history_filter.text)
+        ids = matching if ids is None else sorted(set(ids) & set(matching))
+    return ids
+
+
+def filter_history(history, names, customers, history_filter, timestamps=None):
+    """Positions of the records matching `history_filter`, in history order.
+
+    The name conditions are resolved to a set of customer ids first, so
+    the records are only scanned once, with vectorized comparisons. A date
+    range is looked up by binary search in `timestamps`, the SortIndex of
+    the timestamp column.
+    """
+    ids = filter_customer_ids(history, names, history_filter)
+    if ids is not None and not ids:
+        return np.empty(0, dtype=np.int64)
+
+    ranges = [(history.column(column), low, high)
+              for column, (low, high) in (("customer", history_filter.payment),
+                                          ("margin", history_filter.margin))
+              if (low, high) != (None, None)]
+    in_period = None
+    if history_filter.dates != (None, None):
+        in_period = np.sort(timestamps.between(*history_filter.dates))
+        if ids is None and not ranges:
+            return in_period
+    elif ids is not None and len(ids) == 1 and not ranges:
+        # One customer: their positions are already indexed
+        return customers.positions_of(history.names[ids[0]])
+
+    mask = np.ones(len(history), dtype=bool)
+    if ids is not None:
+        wanted = np.zeros(len(history.names), dtype=bool)
+        wanted[ids] = True
+        mask = wanted[history.column("customer_id")]
+    if in_period is not None:
+        period_mask = np.zeros(len(history), dtype=bool)
+        period_mask[in_period] = True
+        mask &= period_mask
+    for values, low, high in ranges:
+        if low is not None:
+            mask &= values >= low
+        if high is not None:
+            mask &= values <= high
+    return np.flatnonzero(mask)
+
+
+def filter_slice(history, names, history_filter, start, stop):
+    """Positions from start to stop of the records matching `history_filter`.
+
+    For records just inserted: only the slice is scanned, so the cost
+    depends on the number of new records rather than the whole history.
+    """
+    ids = filter_customer_ids(history, names, history_filter)
+    mask = np.ones(stop - start, dtype=bool)
+    if ids is not None:
+        wanted = np.zeros(len(history.names), dtype=bool)
+        wanted[ids] = True
+        mask = wanted[history.customer_id[start:stop]]
+    # Dates are end exclusive, like SortIndex.between()
+    low, high = history_filter.dates
+    timestamps = history.timestamp[start:stop]
+    if low is not None:
+        mask &= timestamps >= low
+    if high is not None:
+        mask &= timestamps < high
+    for column, (low, high) in (("customer", history_filter.payment),
+                                ("margin", history_filter.margin)):
+        values = getattr(history, column)[start:stop]
+        if low is not None:
+            mask &= values >= low
+        if high is not None:
+            mask &= values <= high
+    return np.flatnonzero(mask) + start
+
+
+# Rollup periods, shortest first
+PERIODS = ("day", "week", "month", "quarter")
+
+# Per-bucket totals: record count, then sums of these columns
+ROLLUP_COLUMNS = ("customer", "gross", "net", "margin")
+
+
+def bucket_start(period, day):
+    """First day of the `period` bucket that contains the date `day`."""
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    if period == "month":
+        return day.replace(day=1)
+    if period == "quarter":
+        return day.replace(month=(day.month - 1) // 3 * 3 + 1, day=1)
+    return day
+
+
+def bucket_end(period, start):
+    """First day after the bucket that begins on `start`."""
+    if period == "day":
+        return start + timedelta(days=1)
+    if period == "week":
+        return start + timedelta(days=7)
+    months = 1 if period == "month" else 3
+    month = start.month - 1 + months
+    return date(start.year + month // 12, month % 12 + 1, 1)
+
+
+def bucket_label(period, start):
+    if period == "week":
+        year, week, _ = start.isocalendar()
+        return f"{year}-W{week:02d}"
+    if period == "month":
+        return start.strftime("%Y-%m")
+    if period == "quarter":
+        return f"{start.year}-Q{(start.month - 1) // 3 + 1}"
+    return start.isoformat()
+
+
+def local_midnight(day):
+    return int(time.mktime(day.timetuple()))
+
+
+def local_day_ordinals(timestamps):
+    """Local calendar day (as a date ordinal) of each epoch timestamp.
+
+    Local midnights are computed once per day in the span, so this is
+    exact across DST changes without a per-record localtime() call.
+    """
+    first = date.fromtimestamp(int(timestamps.min())).toordinal()
+    last = date.fromtimestamp(int(timestamps.max())).toordinal()
+    ordinals = np.arange(first, last + 1)
+    midnights = np.array([local_midnight(date.fromordinal(int(ordinal)))
+                          for ordinal in ordinals])
+    return ordinals[np.searchsorted(midnights, timestamps, side="right") - 1]
+
+
+class PeriodRollups:
+    """Daily, weekly, monthly and quarterly totals over a HistoryColumns.
+
+    Daily totals are updated as records are inserted. Longer buckets are
+    summed from the days they contain when first asked for and cached;
+    an insert only drops the cached buckets that contain its days.
+    """
+
+    def __init__(self, history):
+        self.history = history
+        self.days = {}  # Date ordinal -> [count, *sums of ROLLUP_COLUMNS]
+        self.cache = {period: {} for period in PERIODS[1:]}
+        history.add_index(self)
+
+    def on_insert(self, start, count):
+        history = self.history
+        stop = start + count
+        if count == 1:
+            days = [date.fromtimestamp(int(history.timestamp[start])).toordinal()]
+            totals = [[1.0] + [float(getattr(history, column)[start])
+                               for column in ROLLUP_COLUMNS]]
+        else:
+            ordinals, inverse = np.unique(
+                local_day_ordinals(history.timestamp[start:stop]),
+                return_inverse=True)
+            days = ordinals.tolist()
+            columns = [np.bincount(inverse, minlength=len(days))]
+            columns += [np.bincount(inverse, weights=getattr(history, column)[start:stop],
+                                    minlength=len(days))
+                        for column in ROLLUP_COLUMNS]
+            totals = np.column_stack(columns).tolist()
+
+        for ordinal, day_totals in zip(days, totals):
+            current = self.days.get(ordinal)
+            if current is None:
+                self.days[ordinal] = day_totals
+            else:
+                self.days[ordinal] = [a + b for a, b in zip(current, day_totals)]
+            self.invalidate(date.fromordinal(ordinal))
+
+    def invalidate(self, day):
+        for period, buckets in self.cache.items():
+            buckets.pop(bucket_start(period, day), None)
+
+    def on_clear(self):
+        self.days = {}
+        for buckets in self.cache.values():
+            buckets.clear()
+
+    def totals(self, period, start):
+        """[count, *sums] for the bucket of `period` beginning on `start`."""
+        if period == "day":
+            return self.days.get(start.toordinal())
+        buckets = self.cache[period]
+        totals = buckets.get(start)
+        if totals is None:
+            totals = self.sum_days(start, bucket_end(period, start))
+            buckets[start] = totals
+        return totals
+
+    def sum_days(self, first, stop):
+        """[count, *sums] for the days from `first` up to, not including, `stop`."""
+        totals = [0.0] * (len(ROLLUP_COLUMNS) + 1)
+        for ordinal in range(first.toordinal(), stop.toordinal()):
+            day_totals = self.days.get(ordinal)
+            if day_totals is not None:
+                totals = [a + b for a, b in zip(totals, day_totals)]
+        return totals
+
+    def rollup(self, period, first=None, last=None):
+        """Summaries of every non-empty bucket, newest first.
+
+        When the dates `first` and `last` (inclusive) are given, only
+        buckets overlapping them are returned, and a bucket cut by either
+        date sums and spans just its days inside the range.
+        """
+        starts = {bucket_start(period, date.fromordinal(ordinal)) for ordinal in self.days}
+        summaries = []
+        for start in sorted(starts, reverse=True):
+            end = bucket_end(period, start)
+            low = start if first is None else max(start, first)
+            high = end if last is None else min(end, last + timedelta(days=1))
+            if low >= high:
+                continue
+            if (low, high) == (start, end):
+                totals = self.totals(period, start)
+            else:
+                totals = self.sum_days(low, high)
+            count, revenue, costs, net, margin = totals
+            if not count:
+                continue
+            summaries.append({
+                "label": bucket_label(period, start),
+                "start": local_midnight(low),
+                "end": local_midnight(high),
+                "quotes": int(count),
+                "revenue": revenue,
+                "costs": costs,
+                "net": net,
+                "margin": net / revenue * 100 if revenue > 0 else 0.0,
+                "avg_margin": margin / count,
+            })
+        return summaries
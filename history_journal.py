@@ -0,0 +1,133 @@
+import os
+import struct
+import threading
+import time
+import zlib
+
+# Pending writes are fsynced together this long after the first one
+GROUP_COMMIT_MS = 200
+
+# Record: payload length and CRC-32, then the payload
+RECORD_HEADER = struct.Struct("<II")
+# Payload: sequence, timestamp, customer, gross, net, margin, then the
+# UTF-8 customer name
+RECORD_FIELDS = struct.Struct("<qqdddd")
+
+
+def journal_path(db_path):
+    """Journal file kept next to the history database."""
+    return os.path.splitext(db_path)[0] + ".journal"
+
+
+def encode_record(sequence, row):
+    timestamp, customer_name, customer, gross, net, margin = row
+    payload = RECORD_FIELDS.pack(sequence, timestamp, customer, gross, net, margin)
+    payload += customer_name.encode("utf-8")
+    return RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def decode_records(data):
+    """Return ([(sequence, row)], length of the valid prefix of `data`).
+
+    Reading stops at the first record that is incomplete or fails its
+    checksum, which is where a crash interrupted a write.
+    """
+    records = []
+    offset = 0
+    while offset + RECORD_HEADER.size <= len(data):
+        length, checksum = RECORD_HEADER.unpack_from(data, offset)
+        start = offset + RECORD_HEADER.size
+        payload = data[start:start + length]
+        if (length < RECORD_FIELDS.size or len(payload) < length
+                or zlib.crc32(payload) != checksum):
+            break
+        sequence, timestamp, customer, gross, net, margin = \
+            RECORD_FIELDS.unpack_from(payload)
+        try:
+            customer_name = payload[RECORD_FIELDS.size:].decode("utf-8")
+        except UnicodeDecodeError:
+            break
+        records.append((sequence, (timestamp, customer_name, customer, gross, net, margin)))
+        offset = start + length
+    return records, offset
+
+
+class HistoryJournal:
+    """Append-only, crash-safe journal of history rows.
+
+    Each row is written to the file as soon as it is appended, so it
+    survives the app crashing. A background thread fsyncs pending writes
+    as a group GROUP_COMMIT_MS after the first one, so it also survives
+    the OS going down, without an fsync on the UI thread per calculation.
+
+    Rows are numbered with increasing sequence numbers. The owner moves
+    them into the history database (HistoryStore.apply_journal) and then
+    truncates the journal, which keeps replay short.
+    """
+
+    def __init__(self, path, start_sequence=0, group_commit_ms=GROUP_COMMIT_MS):
+        self.path = path
+        self.group_commit = group_commit_ms / 1000
+        flags = os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0)
+        self.fd = os.open(path, flags, 0o600)
+
+        # Replay, dropping a torn record left at the end by a crash
+        with open(path, "rb") as file:
+            data = file.read()
+        self.records, valid_length = decode_records(data)
+        if valid_length < len(data):
+            os.ftruncate(self.fd, valid_length)
+            os.fsync(self.fd)
+        os.lseek(self.fd, valid_length, os.SEEK_SET)
+
+        last = self.records[-1][0] if self.records else 0
+        self.sequence = max(start_sequence, last)
+
+        self.lock = threading.Lock()  # Sequence numbers and self.records
+        # Held while the descriptor is synced, truncated or closed; appends
+        # don't take it, so they never wait for an fsync in progress
+        self.file_lock = threading.Lock()
+        self.dirty = threading.Event()
+        self.closed = False
+        self.sync_thread = threading.Thread(target=self.sync_loop, daemon=True)
+        self.sync_thread.start()
+
+    def append(self, row):
+        """Write one row and return its sequence number."""
+        with self.lock:
+            self.sequence += 1
+            os.write(self.fd, encode_record(self.sequence, row))
+            self.records.append((self.sequence, row))
+        self.dirty.set()
+        return self.sequence
+
+    def pending(self):
+        return len(self.records)
+
+    def sync_loop(self):
+        while not self.closed:
+            self.dirty.wait()
+            # Let more writes arrive, then make them all durable at once
+            time.sleep(self.group_commit)
+            self.dirty.clear()
+            self.sync()
+
+    def sync(self):
+        with self.file_lock:
+            if not self.closed:
+                os.fsync(self.fd)
+
+    def truncate(self):
+        """Drop every record, once they are safely stored elsewhere."""
+        with self.file_lock, self.lock:
+            os.ftruncate(self.fd, 0)
+            os.lseek(self.fd, 0, os.SEEK_SET)
+            os.fsync(self.fd)
+            self.records = []
+
+    def close(self):
+        with self.file_lock:
+            os.fsync(self.fd)
+            os.close(self.fd)
+            self.closed = True
+        self.dirty.set()
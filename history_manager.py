@@ -1,18 +1,81 @@
+import bisect
 import tkinter as tk
 from tkinter import messagebox, ttk, filedialog
-import csv
 import os
+import numpy as np
+import perf_stats
+import ui_watchdog
+from background_tasks import BackgroundTask
+from history_columns import HistoryColumns
+from history_export import write_history_csv
+from history_indexes import (HistoryFilter, NameIndex, SortIndex, filter_history,
+                             filter_slice)
+from history_journal import HistoryJournal, journal_path
+from history_merge import merge_exports_task
+from history_store import HistoryStore
+from quote_import import import_quotes_task
+from utils import Debouncer
+from virtual_tree import VirtualTreeview
+
+# Above this many records the Treeview only holds the visible rows
+VIRTUAL_MODE_THRESHOLD = 2000
+
+# Rows read from the store per page; only the first page is read at startup
+HISTORY_PAGE_SIZE = 500
+
+# Journaled records are moved into the database once there are this many
+JOURNAL_COMPACT_RECORDS = 500
+
+# Pause in typing after which the filter is applied
+FILTER_DELAY_MS = 100
+
+# Tree column -> (heading, HistoryColumns column it sorts by)
+HISTORY_TREE_COLUMNS = {
+    "date": ("Date", "timestamp"),
+    "customer_name": ("Customer Name", "customer_name"),
+    "customer": ("Customer Payment", "customer"),
+    "gross": ("Gross Expenses", "gross"),
+    "net": ("Net Profit", "net"),
+    "margin": ("Margin %", "margin"),
+}
 
 
 class HistoryManager:
     def __init__(self, app):
         self.app = app
-        self.history = []
+        self.history = HistoryColumns()
+        self.name_index = NameIndex(self.history)
+        self.virtual_mode = False
+        self.export_task = None
+        self.import_task = None
+        # The History tab is built the first time it is selected
+        self.history_tree = None
+        self.store = HistoryStore()
+        # New calculations go to the journal first, which is cheaper and
+        # safer than a database commit per click
+        self.journal = HistoryJournal(
+            journal_path(self.store.path), self.store.journal_sequence())
+        # Anything a crash left in the journal is stored before loading
+        self.compact_journal()
+        # Rows of the store that are loaded into self.history, in id order
+        self.loaded_count = 0
+        self.last_loaded_id = 0
+        self.backfill_max_id = 0
+        # Positions of the records shown while filtered or sorted
+        self.view_filter = HistoryFilter()
+        self.view_positions = None
+        self.sort_column = None
+        self.sort_descending = False
+        # Created the first time a column is sorted, then kept up to date
+        self.sort_indexes = {}
+        self.filter_later = Debouncer(app.root, FILTER_DELAY_MS, self.read_filter)
+        self.view_later = Debouncer(app.root, FILTER_DELAY_MS, self.apply_view)
 
     def setup_history_tab(self):
         # History view
         history_frame = tk.Frame(self.app.history_tab, padx=10, pady=10)
         history_frame.pack(fill=tk.BOTH, expand=True)
+        self.app.theme_manager.register(history_frame, "panel")
 
         # History title
         history_title = tk.Label(
@@ -21,6 +84,41 @@ class HistoryManager:
             font=("Helvetica", 14, "bold"),
         )
         history_title.pack(anchor="w", pady=(0, 15))
+        self.app.theme_manager.register(history_title, "label")
+
+        # Filter bar, applied as the user types
+        filter_bar = tk.Frame(history_frame)
+        filter_bar.pack(fill=tk.X, pady=(0, 5))
+        self.app.theme_manager.register(filter_bar, "panel")
+
+        self.filter_entries = {}
+        for key, text, width in (("text", "Search", 18),
+                                 ("min_payment", "Payment", 8),
+                                 ("max_payment", "to", 8),
+                                 ("min_margin", "Margin %", 6),
+                                 ("max_margin", "to", 6)):
+            label = tk.Label(filter_bar, text=text, font=("Helvetica", 10))
+            label.pack(side=tk.LEFT, padx=(5, 2))
+            self.app.theme_manager.register(label, "label")
+            entry = tk.Entry(filter_bar, width=width, font=("Helvetica", 10),
+                             relief="solid", bd=1)
+            entry.pack(side=tk.LEFT)
+            entry.bind("<KeyRelease>", lambda event: self.filter_later.schedule())
+            self.app.theme_manager.register(entry, "entry")
+            self.filter_entries[key] = entry
+
+        clear_filter_btn = tk.Button(
+            filter_bar,
+            text="Clear Filter",
+            command=self.show_all,
+            font=("Helvetica", 10),
+        )
+        clear_filter_btn.pack(side=tk.LEFT, padx=10)
+        self.app.theme_manager.register(clear_filter_btn, "button_tertiary")
+
+        self.filter_label = tk.Label(history_frame, font=("Helvetica", 10), anchor="w")
+        self.filter_label.pack(fill=tk.X, pady=(0, 5))
+        self.app.theme_manager.register(self.filter_label, "label")
 
         # Create treeview for history
         columns = ("date", "customer_name", "customer",
@@ -32,13 +130,11 @@ class HistoryManager:
             style="Custom.Treeview"  # Use a custom style for dark mode
         )
 
-        # Define headings
-        self.history_tree.heading("date", text="Date")
-        self.history_tree.heading("customer_name", text="Customer Name")
-        self.history_tree.heading("customer", text="Customer Payment")
-        self.history_tree.heading("gross", text="Gross Expenses")
-        self.history_tree.heading("net", text="Net Profit")
-        self.history_tree.heading("margin", text="Margin %")
+        # Define headings; clicking one sorts by it
+        for column in columns:
+            self.history_tree.heading(
+                column, command=lambda column=column: self.sort_by(column))
+        self.update_headings()
 
         # Define columns
         self.history_tree.column("date", width=150)
@@ -56,6 +152,11 @@ class HistoryManager:
         )
         self.history_tree.configure(yscrollcommand=history_scroll.set)
 
+        # Virtualized view, used once the history gets large
+        self.virtual_view = VirtualTreeview(
+            self.history_tree, history_scroll,
+            self.view_row)
+
         # Pack tree and scrollbar
         self.history_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         history_scroll.pack(side=tk.RIGHT, fill=tk.Y)
@@ -63,68 +164,553 @@ class HistoryManager:
         # Action buttons
         history_buttons = tk.Frame(history_frame)
         history_buttons.pack(fill=tk.X, pady=10)
+        self.app.theme_manager.register(history_buttons, "panel")
 
-        export_btn = tk.Button(
+        self.export_btn = tk.Button(
             history_buttons,
             text="Export to CSV",
-            command=self.export_history,
+            command=ui_watchdog.watch(self.export_history),
+            font=("Helvetica", 10),
+        )
+        self.export_btn.pack(side=tk.RIGHT, padx=5)
+        self.app.theme_manager.register(self.export_btn, "button_tertiary")
+
+        # Only shown while an export is running
+        self.cancel_export_btn = tk.Button(
+            history_buttons,
+            text="Cancel Export",
+            command=ui_watchdog.watch(self.cancel_export),
             font=("Helvetica", 10),
         )
-        export_btn.pack(side=tk.RIGHT, padx=5)
+        self.app.theme_manager.register(self.cancel_export_btn, "button_tertiary")
 
         export_pdf_btn = tk.Button(
             history_buttons,
             text="Export to PDF",
-            command=self.export_to_pdf,
+            command=ui_watchdog.watch(self.export_to_pdf),
             font=("Helvetica", 10),
         )
         export_pdf_btn.pack(side=tk.RIGHT, padx=5)
+        self.app.theme_manager.register(export_pdf_btn, "button_tertiary")
+
+        save_archive_btn = tk.Button(
+            history_buttons,
+            text="Save Archive",
+            command=ui_watchdog.watch(self.save_archive),
+            font=("Helvetica", 10),
+        )
+        save_archive_btn.pack(side=tk.RIGHT, padx=5)
+        self.app.theme_manager.register(save_archive_btn, "button_tertiary")
+
+        open_archive_btn = tk.Button(
+            history_buttons,
+            text="Open Archive",
+            command=ui_watchdog.watch(self.open_archive),
+            font=("Helvetica", 10),
+        )
+        open_archive_btn.pack(side=tk.RIGHT, padx=5)
+        self.app.theme_manager.register(open_archive_btn, "button_tertiary")
+
+        merge_btn = tk.Button(
+            history_buttons,
+            text="Merge Exports",
+            command=ui_watchdog.watch(self.merge_exports),
+            font=("Helvetica", 10),
+        )
+        merge_btn.pack(side=tk.RIGHT, padx=5)
+        self.app.theme_manager.register(merge_btn, "button_tertiary")
+
+        import_btn = tk.Button(
+            history_buttons,
+            text="Import Quotes",
+            command=ui_watchdog.watch(self.import_quotes),
+            font=("Helvetica", 10),
+        )
+        import_btn.pack(side=tk.RIGHT, padx=5)
+        self.app.theme_manager.register(import_btn, "button_tertiary")
 
         clear_btn = tk.Button(
             history_buttons,
             text="Clear History",
-            command=self.clear_history,
+            command=ui_watchdog.watch(self.clear_history),
             font=("Helvetica", 10),
         )
         clear_btn.pack(side=tk.RIGHT, padx=5)
+        self.app.theme_manager.register(clear_btn, "button_tertiary")
 
-        # Apply dark mode styling if enabled
-        self.update_history_theme()
+        # Show the history loaded so far
+        self.update_filter_label()
+        if len(self.history) > VIRTUAL_MODE_THRESHOLD:
+            self.set_virtual_mode(True)
+        else:
+            self.update_history_view()
 
-    def add_to_history(self, item):
-        self.history.append(item)
+    def load_history(self):
+        """Load the first page of stored history, then the rest when idle."""
+        self.backfill_max_id = self.store.last_id()
+        self.load_next_page()
+
+    def load_next_page(self):
+        self.last_loaded_id, rows = self.store.page(
+            self.last_loaded_id, HISTORY_PAGE_SIZE, self.backfill_max_id)
+        if not rows:
+            return
+
+        # Stored rows go before anything calculated since startup
+        position = self.loaded_count
+        self.history.insert_rows(position, rows)
+        self.loaded_count += len(rows)
+
+        self.show_inserted_rows(position, len(rows))
+        self.app.customer_manager.history_changed()
+        self.app.report_manager.history_changed()
+
+        self.app.status_bar.config(
+            text=f"History loaded ({len(self.history)} records)")
+        self.app.root.after_idle(self.load_next_page)
+
+    def add_to_history(self, timestamp, customer_name, customer, gross, net, margin):
+        index = self.history.append(
+            timestamp, customer_name, customer, gross, net, margin)
+        self.journal.append(self.history.row(index))
+        if self.journal.pending() >= JOURNAL_COMPACT_RECORDS:
+            self.app.root.after_idle(self.compact_journal)
+        self.show_inserted_rows(index, 1)
+        self.app.customer_manager.history_changed(index)
+        self.app.report_manager.history_changed()
+
+        self.app.status_bar.config(
+            text=f"History updated ({len(self.history)} records)")
+
+    def extend_history(self, rows, persist=True):
+        """Add many rows at once, stored in a single transaction."""
+        if persist:
+            # Keep the database in history order
+            self.compact_journal()
+            self.store.add_many(rows)
+        position = self.stored_end()
+        self.history.insert_rows(position, rows)
+        self.history_extended(position, len(rows))
+
+    def stored_end(self):
+        """Position after the last stored record, before the journaled ones.
+
+        While an import task runs the journal is not compacted, so rows the
+        task stored go before the quotes calculated meanwhile, both in
+        self.history and in the database.
+        """
+        return len(self.history) - self.journal.pending()
+
+    def history_extended(self, position, count):
+        """Update the views after `count` records were inserted at `position`."""
+        self.show_inserted_rows(position, count)
+        self.app.customer_manager.history_changed()
+        self.app.report_manager.history_changed()
+
+        self.app.status_bar.config(
+            text=f"History updated ({len(self.history)} records)")
+
+    def history_reordered(self):
+        """Update the views after records were inserted among existing ones."""
+        if self.history_tree is not None:
+            # Positions of every shown row may have moved
+            self.apply_view()
+        self.app.customer_manager.history_changed()
+        self.app.report_manager.history_changed()
+
+        self.app.status_bar.config(
+            text=f"History updated ({len(self.history)} records)")
+
+    def show_inserted_rows(self, position, count):
+        """Show `count` rows just inserted into self.history at `position`."""
+        if self.history_tree is None:
+            return
+        if self.sort_column is not None:
+            positions = self.view_positions
+            if count != 1 or position != len(self.history) - 1:
+                # Re-sorting for every backfill page or import chunk would
+                # be quadratic; the shown records just move along and the
+                # view is re-sorted once the inserts pause
+                self.view_positions = np.where(
+                    positions >= position, positions + count, positions)
+                self.view_later.schedule()
+                return
+            # A new calculation: find its place in the view by binary search
+            index = self.sorted_position(position)
+            if index is None:
+                count = 0
+            else:
+                self.view_positions = np.insert(positions, index, position)
+                position = index
+            self.update_filter_label()
+        elif self.view_filter.active():
+            # Only the new records are checked against the filter; the
+            # shown records after them move along by `count`
+            positions = self.view_positions
+            split = int(np.searchsorted(positions, position))
+            matching = filter_slice(self.history, self.name_index,
+                                    self.view_filter, position, position + count)
+            self.view_positions = np.concatenate(
+                [positions[:split], matching, positions[split:] + count])
+            self.update_filter_label()
+            position, count = split, len(matching)
+
+        if not self.virtual_mode and self.view_count() > VIRTUAL_MODE_THRESHOLD:
+            self.set_virtual_mode(True)
+        elif self.virtual_mode:
+            self.virtual_view.set_row_count(self.view_count())
+        else:
+            # Insert only the new rows instead of rebuilding the tree
+            for index in range(position, position + count):
+                self.history_tree.insert("", index, values=self.view_row(index))
+
+    def sorted_position(self, index):
+        """Where the record at `index` goes in the sorted view, or None if filtered out."""
+        if self.view_filter.active() and not len(filter_slice(
+                self.history, self.name_index, self.view_filter, index, index + 1)):
+            return None
+        key = self.sort_index(self.sort_column).key
+        positions = self.view_positions
+        # Equal keys stay in history order, like SortIndex, so the record
+        # goes after them ascending and before them descending
+        if self.sort_descending:
+            return len(positions) - bisect.bisect_right(positions[::-1], key(index), key=key)
+        return bisect.bisect_right(positions, key(index), key=key)
+
+    def view_count(self):
+        if self.view_positions is not None:
+            return len(self.view_positions)
+        return len(self.history)
+
+    def view_row(self, index):
+        """Display values of row `index` of the (possibly filtered) view."""
+        if self.view_positions is not None:
+            index = self.view_positions[index]
+        return self.history.display_row(index)
+
+    def read_filter(self):
+        """Rebuild the filter from the filter bar; blank or invalid bounds are ignored."""
+        bounds = {}
+        for key in ("min_payment", "max_payment", "min_margin", "max_margin"):
+            try:
+                bounds[key] = float(self.filter_entries[key].get())
+            except ValueError:
+                bounds[key] = None
+        self.view_filter = HistoryFilter(
+            customer=self.view_filter.customer,
+            text=self.filter_entries["text"].get().strip(),
+            payment=(bounds["min_payment"], bounds["max_payment"]),
+            margin=(bounds["min_margin"], bounds["max_margin"]),
+            dates=self.view_filter.dates,
+            label=self.view_filter.label,
+        )
+        self.apply_view()
+
+    def apply_view(self):
+        """Recompute which records are shown, and in what order."""
+        self.view_later.cancel()
+        positions = None
+        with perf_stats.timed("history.filter"):
+            if self.view_filter.active():
+                timestamps = (self.sort_index("timestamp")
+                              if self.view_filter.dates != (None, None) else None)
+                positions = filter_history(
+                    self.history, self.name_index,
+                    self.app.customer_manager.index, self.view_filter, timestamps)
+        if self.sort_column is not None:
+            with perf_stats.timed("history.sort"):
+                order = self.sort_index(self.sort_column).positions()
+                if positions is not None:
+                    shown = np.zeros(len(self.history), dtype=bool)
+                    shown[positions] = True
+                    order = order[shown[order]]
+                positions = order[::-1] if self.sort_descending else order
+        self.view_positions = positions
+        self.update_filter_label()
+        if not self.virtual_mode and self.view_count() > VIRTUAL_MODE_THRESHOLD:
+            self.set_virtual_mode(True)
+        else:
+            self.update_history_view()
+
+    def sort_index(self, column):
+        index = self.sort_indexes.get(column)
+        if index is None:
+            index = SortIndex(self.history, column, self.name_index)
+            self.sort_indexes[column] = index
+        return index
+
+    def sort_by(self, tree_column):
+        """Sort by a column; clicking it again reverses, then unsorts."""
+        column = HISTORY_TREE_COLUMNS[tree_column][1]
+        if self.sort_column != column:
+            self.sort_column, self.sort_descending = column, False
+        elif not self.sort_descending:
+            self.sort_descending = True
+        else:
+            self.sort_column, self.sort_descending = None, False
+        self.update_headings()
+        self.apply_view()
+
+    def update_headings(self):
+        for tree_column, (heading, column) in HISTORY_TREE_COLUMNS.items():
+            if column == self.sort_column:
+                heading += " \u25bc" if self.sort_descending else " \u25b2"
+            self.history_tree.heading(tree_column, text=heading)
+
+    def show_customer(self, customer_name):
+        """Filter the History tab to one customer's quotes and switch to it."""
+        self.show_filtered(HistoryFilter(customer=customer_name, label=customer_name))
+
+    def show_period(self, start, end, label):
+        """Filter the History tab to quotes from start to end (epoch seconds)."""
+        self.show_filtered(HistoryFilter(dates=(start, end), label=label))
+
+    def show_filtered(self, history_filter):
+        if self.history_tree is None:
+            self.setup_history_tab()
+        self.clear_filter_entries()
+        self.view_filter = history_filter
+        self.apply_view()
+        self.app.notebook.select(self.app.history_tab)
+
+    def show_all(self):
+        self.clear_filter_entries()
+        self.view_filter = HistoryFilter()
+        self.apply_view()
+
+    def clear_filter_entries(self):
+        self.filter_later.cancel()
+        for entry in self.filter_entries.values():
+            entry.delete(0, tk.END)
+
+    def update_filter_label(self):
+        if not self.view_filter.active():
+            self.filter_label.config(text="")
+            return
+        text = f"Showing {len(self.view_positions)} of {len(self.history)} records"
+        if self.view_filter.label:
+            text += f" for {self.view_filter.label}"
+        self.filter_label.config(text=text)
+
+    def set_virtual_mode(self, enabled):
+        """Switch between a fully populated and a virtualized Treeview."""
+        if enabled == self.virtual_mode:
+            return
+        self.virtual_mode = enabled
+        if enabled:
+            self.virtual_view.attach()
+        else:
+            self.virtual_view.detach()
         self.update_history_view()
 
     def export_history(self):
+        self.start_export(write_history_csv, ".csv", [("CSV Files", "*.csv")])
+
+    def save_archive(self):
+        """Save the whole history as a compressed archive."""
+        # zstandard is only loaded once archives are used
+        from history_archive import write_history_archive
+
+        self.start_export(write_history_archive, ".zst",
+                          [("History Archives", "*.zst")])
+
+    def start_export(self, writer, extension, filetypes):
         if not self.history:
             messagebox.showwarning("Warning", "No history to export.")
             return
+        if self.export_task is not None:
+            messagebox.showwarning("Warning", "An export is already running.")
+            return
 
         file_path = filedialog.asksaveasfilename(
-            defaultextension=".csv", filetypes=[("CSV Files", "*.csv")])
+            defaultextension=extension, filetypes=filetypes)
+        if not file_path:
+            return
+
+        # Write on a worker thread from a snapshot of the current history
+        self.export_task = BackgroundTask(
+            self.app.root,
+            writer,
+            args=(file_path, self.history.snapshot()),
+            on_progress=self.on_export_progress,
+            on_done=self.on_export_done,
+            on_error=self.on_export_error,
+            on_cancelled=self.on_export_cancelled,
+        ).start()
+        self.export_btn.config(state=tk.DISABLED)
+        self.cancel_export_btn.pack(side=tk.RIGHT, padx=5)
+        self.app.status_bar.config(text="Exporting history...")
+
+    def cancel_export(self):
+        if self.export_task is not None:
+            self.export_task.cancel()
+
+    def on_export_progress(self, done, total):
+        self.app.status_bar.config(
+            text=f"Exporting history... {done}/{total} rows ({done * 100 // total}%)")
+
+    def on_export_done(self, file_path):
+        self.finish_export()
+        messagebox.showinfo("Success", "History exported successfully!")
+        self.app.status_bar.config(
+            text=f"History exported to {os.path.basename(file_path)}")
+
+    def on_export_error(self, error):
+        self.finish_export()
+        messagebox.showerror(
+            "Error", f"Failed to export history: {str(error)}")
+
+    def on_export_cancelled(self):
+        self.finish_export()
+        self.app.status_bar.config(text="History export cancelled")
+
+    def finish_export(self):
+        self.export_task = None
+        self.export_btn.config(state=tk.NORMAL)
+        self.cancel_export_btn.pack_forget()
+
+    def import_quotes(self):
+        """Price a CSV of quotes in the background and add them to history."""
+        if self.import_task is not None:
+            messagebox.showwarning("Warning", "An import is already running.")
+            return
+
+        file_path = filedialog.askopenfilename(
+            filetypes=[("CSV Files", "*.csv")])
+        if not file_path:
+            return
+
+        # Keep the database in history order
+        self.compact_journal()
+        self.import_task = BackgroundTask(
+            self.app.root,
+            import_quotes_task,
+            args=(file_path, self.store.path),
+            on_progress=self.on_import_progress,
+            on_done=self.on_import_done,
+            on_error=self.on_import_error,
+        ).start()
+        self.app.status_bar.config(text="Importing quotes...")
+
+    def on_import_progress(self, done, total):
+        self.app.status_bar.config(text=f"Importing quotes... {done} rows")
+
+    def on_import_done(self, result):
+        self.import_task = None
+        # The import already wrote these rows to the store
+        self.extend_history(result["history"], persist=False)
+        message = (f"Imported {result['rows']} quotes in {result['seconds']:.2f} s "
+                   f"({result['rows_per_second']:.0f} rows/s)")
+        if result["skipped"]:
+            message += f", skipped {result['skipped']} invalid rows"
+        self.app.status_bar.config(text=message)
+        messagebox.showinfo("Success", message)
+
+    def on_import_error(self, error):
+        self.import_task = None
+        messagebox.showerror("Error", f"Failed to import quotes: {str(error)}")
+
+    def open_archive(self):
+        """Load a history archive into the database and the History tab."""
+        if self.import_task is not None:
+            messagebox.showwarning("Warning", "An import is already running.")
+            return
+
+        file_path = filedialog.askopenfilename(
+            filetypes=[("History Archives", "*.zst"), ("All Files", "*.*")])
         if not file_path:
             return
 
-        try:
-            with open(file_path, mode="w", newline="") as file:
-                writer = csv.writer(file)
-                writer.writerow(["Date", "Customer Name", "Customer Payment",
-                                "Gross Expenses", "Net Profit", "Margin %"])
-                for item in self.history:
-                    writer.writerow([
-                        item["date"],
-                        item["customer_name"],
-                        f"${item['customer']:.2f}",
-                        f"${item['gross']:.2f}",
-                        f"${item['net']:.2f}",
-                        f"{item['margin']:.1f}%",
-                    ])
-            messagebox.showinfo("Success", "History exported successfully!")
-            self.app.status_bar.config(
-                text=f"History exported to {os.path.basename(file_path)}")
-        except Exception as e:
-            messagebox.showerror(
-                "Error", f"Failed to export history: {str(e)}")
+        from history_archive import read_history_archive
+
+        # Keep the database in history order
+        self.compact_journal()
+        self.import_task = BackgroundTask(
+            self.app.root,
+            read_history_archive,
+            args=(file_path, self.store.path),
+            on_progress=self.on_archive_progress,
+            on_done=self.on_archive_done,
+            on_error=self.on_archive_error,
+        ).start()
+        self.app.status_bar.config(text="Opening archive...")
+
+    def on_archive_progress(self, done, total):
+        self.app.status_bar.config(
+            text=f"Opening archive... {done}/{total or '?'} rows")
+
+    def on_archive_done(self, result):
+        self.import_task = None
+        # The task already wrote these rows to the store
+        history = result["history"]
+        position = self.stored_end()
+        self.history.insert_columns(position, history)
+        self.history_extended(position, len(history))
+        messagebox.showinfo(
+            "Success", f"Loaded {len(history)} records from the archive "
+                       f"({result['duplicates']} already in history).")
+
+    def on_archive_error(self, error):
+        self.import_task = None
+        messagebox.showerror("Error", f"Failed to open archive: {str(error)}")
+
+    def merge_exports(self):
+        """Add the records of exported history CSVs that aren't in history yet."""
+        if self.import_task is not None:
+            messagebox.showwarning("Warning", "An import is already running.")
+            return
+
+        if self.last_loaded_id < self.backfill_max_id:
+            # Merged records are placed by their position in the database,
+            # which only matches self.history once everything is loaded
+            messagebox.showwarning("Warning", "History is still loading.")
+            return
+
+        file_paths = filedialog.askopenfilenames(
+            filetypes=[("CSV Files", "*.csv")])
+        if not file_paths:
+            return
+
+        # Duplicates are looked for in the database, so store everything first
+        self.compact_journal()
+        self.import_task = BackgroundTask(
+            self.app.root,
+            merge_exports_task,
+            args=(list(file_paths), self.store.path),
+            on_progress=self.on_merge_progress,
+            on_done=self.on_merge_done,
+            on_error=self.on_merge_error,
+        ).start()
+        self.app.status_bar.config(text="Merging exports...")
+
+    def on_merge_progress(self, done, total):
+        self.app.status_bar.config(text=f"Merging exports... {done}/{total} files")
+
+    def on_merge_done(self, result):
+        self.import_task = None
+        # The merge already wrote these rows to the store
+        history, positions = result["history"], result["positions"]
+        if history and positions[0] < len(self.history):
+            # Older records go among the existing ones, in date order
+            self.history.insert_at(positions, history)
+            self.history_reordered()
+        else:
+            self.extend_history(history, persist=False)
+        message = (f"Merged {len(result['history'])} new records from "
+                   f"{result['files']} files ({result['duplicates']} duplicates)")
+        if result["skipped"]:
+            message += f", skipped {result['skipped']} invalid rows"
+        self.app.status_bar.config(text=message)
+        if result["failed"]:
+            messagebox.showwarning(
+                "Merge Exports",
+                message + "\n\nCould not read:\n" + "\n".join(result["failed"][:10]))
+        else:
+            messagebox.showinfo("Success", message)
+
+    def on_merge_error(self, error):
+        self.import_task = None
+        messagebox.showerror("Error", f"Failed to merge exports: {str(error)}")
 
     def export_to_pdf(self):
         """Export history to a PDF file."""
@@ -139,54 +725,51 @@ class HistoryManager:
         if not self.history:
             messagebox.showwarning("Warning", "No history to clear.")
             return
+        if self.import_task is not None:
+            # The task's rows would go into the cleared database unseen
+            messagebox.showwarning("Warning", "An import is still running.")
+            return
 
         if messagebox.askyesno("Confirm", "Are you sure you want to clear all history?"):
             self.history.clear()
-            self.update_history_view()
+            self.journal.truncate()
+            self.store.clear()
+            self.view_filter = HistoryFilter()
+            self.clear_filter_entries()
+            self.apply_view()
+            self.app.customer_manager.history_changed()
+            self.app.report_manager.history_changed()
+            self.loaded_count = 0
+            self.backfill_max_id = self.last_loaded_id
             self.app.status_bar.config(text="History cleared")
             messagebox.showinfo("Success", "Calculation history cleared.")
 
+    def compact_journal(self):
+        """Move journaled records into the database and empty the journal."""
+        if not self.journal.pending():
+            return
+        if self.import_task is not None:
+            # The task is storing its rows; journaled records must follow
+            # them, so they wait (the journal is durable meanwhile)
+            return
+        with perf_stats.timed("history.compact"):
+            self.store.apply_journal(list(self.journal.records))
+            self.journal.truncate()
+
+    def close(self):
+        self.compact_journal()
+        self.journal.close()
+        self.store.close()
+
+    @perf_stats.timed_function("history.view")
     def update_history_view(self):
-        for item in self.history_tree.get_children():
-            self.history_tree.delete(item)
-
-        for item in self.history:
-            self.history_tree.insert("", "end", values=(
-                item["date"],
-                item["customer_name"],
-                f"${item['customer']:.2f}",
-                f"${item['gross']:.2f}",
-                f"${item['net']:.2f}",
-                f"{item['margin']:.1f}%",
-            ))
+        if self.virtual_mode:
+            self.virtual_view.set_row_count(self.view_count())
+        elif self.history_tree is not None:
+            self.history_tree.delete(*self.history_tree.get_children())
+            for index in range(self.view_count()):
+                self.history_tree.insert(
+                    "", "end", values=self.view_row(index))
 
         self.app.status_bar.config(
             text=f"History updated ({len(self.history)} records)")
-
-    def update_history_theme(self):
-        if self.app.dark_mode:
-            # Dark mode colors
-            bg_color = "#121212"
-            fg_color = "white"
-            self.history_tree.configure(style="Custom.Treeview")
-            style = ttk.Style()
-            style.configure("Custom.Treeview",
-                            background=bg_color,
-                            foreground=fg_color,
-                            fieldbackground=bg_color)
-            style.map("Custom.Treeview",
-                      background=[("selected", "#333333")],
-                      foreground=[("selected", "white")])
-        else:
-            # Light mode colors
-            bg_color = "white"
-            fg_color = "black"
-            self.history_tree.configure(style="Custom.Treeview")
-            style = ttk.Style()
-            style.configure("Custom.Treeview",
-                            background=bg_color,
-                            foreground=fg_color,
-                            fieldbackground=bg_color)
-            style.map("Custom.Treeview",
-                      background=[("selected", "#f0f0f0")],
-                      foreground=[("selected", "black")])
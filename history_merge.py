@@ -0,0 +1,200 @@
+import csv
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+import numpy as np
+from history_export import HISTORY_HEADERS
+
+# Rows of the history database read per query when collecting known records
+STORE_PAGE_SIZE = 50000
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def parse_values(texts, symbol):
+    """Floats from display strings such as "$-100.00" or "88.8%".
+
+    The symbol is removed from the whole column in one string operation
+    and the result converted by NumPy in a single call, rather than
+    float(s.replace(...)) per cell. Raises ValueError on a bad value.
+    """
+    if not texts:
+        return np.empty(0, dtype=np.float64)
+    return np.array("\n".join(texts).replace(symbol, "").split("\n"),
+                    dtype=np.float64)
+
+
+def parse_dates(texts):
+    """Epoch seconds for "%Y-%m-%d %H:%M" local date strings.
+
+    NumPy parses the dates as naive minutes; the local UTC offset is then
+    looked up once per distinct hour, so DST is handled like
+    history_columns.parse_date without a strptime() per row.
+    """
+    minutes = np.array(texts, dtype="datetime64[m]").astype(np.int64)
+    hours, inverse = np.unique(minutes // 60, return_inverse=True)
+    offsets = np.array([
+        int((EPOCH + timedelta(hours=hour)).timestamp()) - hour * 3600
+        for hour in hours.tolist()
+    ], dtype=np.int64)
+    return minutes * 60 + offsets[inverse]
+
+
+def parse_columns(rows):
+    """(timestamps, names, [customer, gross, net, margin]) for export rows."""
+    dates, names, customer, gross, net, margin = zip(*rows)
+    return (parse_dates(dates), list(names), [
+        parse_values(customer, "$"),
+        parse_values(gross, "$"),
+        parse_values(net, "$"),
+        parse_values(margin, "%"),
+    ])
+
+
+def valid_row(row):
+    try:
+        parse_columns([row])
+    except ValueError:
+        return False
+    return True
+
+
+def read_history_export(file_path):
+    """Parse a CSV written by HistoryManager.export_history.
+
+    Runs in a worker process. Returns (timestamps, names, value columns,
+    number of rows skipped because they could not be parsed).
+    """
+    with open(file_path, newline="", encoding="utf-8-sig") as file:
+        reader = csv.reader(file)
+        if next(reader, None) != HISTORY_HEADERS:
+            raise ValueError("not a history export")
+        rows = [row for row in reader if row]
+
+    count = len(rows)
+    rows = [row for row in rows if len(row) == len(HISTORY_HEADERS)]
+    if not rows:
+        return np.empty(0, dtype=np.int64), [], [np.empty(0)] * 4, count
+    try:
+        timestamps, names, values = parse_columns(rows)
+    except ValueError:
+        # Only files with bad rows pay for checking row by row
+        rows = [row for row in rows if valid_row(row)]
+        if not rows:
+            return np.empty(0, dtype=np.int64), [], [np.empty(0)] * 4, count
+        timestamps, names, values = parse_columns(rows)
+    return timestamps, names, values, count - len(rows)
+
+
+def history_key(row):
+    """A stored record at the precision of an export, for finding duplicates.
+
+    Exports only keep the minute and rounded amounts. Records parsed from
+    an export are already at that precision, so they are their own key.
+    """
+    timestamp, customer_name, customer, gross, net, margin = row
+    return (timestamp - timestamp % 60, customer_name, round(customer, 2),
+            round(gross, 2), round(net, 2), round(margin, 1))
+
+
+def stored_keys(store):
+    """history_key() of every record in the history database."""
+    keys = set()
+    after_id = 0
+    while True:
+        after_id, rows = store.page(after_id, STORE_PAGE_SIZE)
+        if not rows:
+            return keys
+        keys.update(map(history_key, rows))
+
+
+def merge_history_exports(paths, store=None, workers=None, progress=None):
+    """Merge exported history CSVs into one list of new records.
+
+    Files are parsed in parallel across a process pool. Their records are
+    put in date order and duplicates, within the files or of records
+    already in `store`, are dropped with a hash set of history_key().
+    The new records are inserted into `store` (if given) by date: each
+    goes after the last record that is not later than it. `progress(files,
+    total)` is called as each file is parsed. Returns a dict with the new
+    history rows, the position each was inserted at (counted in the
+    history before the merge), and counts of what was merged, skipped
+    and rejected.
+    """
+    start = time.perf_counter()
+    workers = workers or max(1, min(len(paths), (os.cpu_count() or 2) - 1))
+    parsed = []
+    failed = []
+    skipped = 0
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = [pool.submit(read_history_export, path) for path in paths]
+        for done, (path, future) in enumerate(zip(paths, futures), 1):
+            try:
+                timestamps, names, values, file_skipped = future.result()
+            except (OSError, UnicodeDecodeError, ValueError) as e:
+                failed.append(f"{os.path.basename(path)}: {e}")
+            else:
+                parsed.append((timestamps, names, values))
+                skipped += file_skipped
+            if progress:
+                progress(done, len(paths))
+
+    history = []
+    positions = np.empty(0, dtype=np.int64)
+    total = 0
+    if parsed:
+        timestamps = np.concatenate([item[0] for item in parsed])
+        names = [name for item in parsed for name in item[1]]
+        total = len(names)
+
+        # Stable, so records of the same minute keep their file order
+        order = np.argsort(timestamps, kind="stable")
+        rows = zip(
+            timestamps[order].tolist(),
+            [names[i] for i in order.tolist()],
+            *(np.concatenate([item[2][column] for item in parsed])[order].tolist()
+              for column in range(4)),
+        )
+        seen = stored_keys(store) if store is not None else set()
+        for row in rows:
+            if row not in seen:
+                seen.add(row)
+                history.append(row)
+        if store is not None:
+            # A running maximum, so the positions ascend even where the
+            # stored history is not in date order
+            stored = np.maximum.accumulate(np.array(store.timestamps(), dtype=np.int64))
+            positions = np.searchsorted(
+                stored, [row[0] for row in history], side="right")
+            store.insert_at(positions, history)
+
+    seconds = time.perf_counter() - start
+    return {
+        "history": history,
+        "positions": positions,
+        "files": len(paths) - len(failed),
+        "rows": total,
+        "duplicates": total - len(history),
+        "skipped": skipped,
+        "failed": failed,
+        "seconds": seconds,
+    }
+
+
+def merge_exports_task(report, cancel_event, paths, db_path):
+    """BackgroundTask target: merge exported CSVs into the history database.
+
+    Uses its own database connection, since SQLite connections can't be
+    shared with the Tk thread.
+    """
+    from history_store import HistoryStore
+
+    store = HistoryStore(db_path)
+    try:
+        return merge_history_exports(paths, store=store, progress=report)
+    finally:
+        store.close()
@@ -0,0 +1,205 @@
+import os
+import sqlite3
+
+HISTORY_COLUMNS = ("timestamp", "customer_name", "customer", "gross", "net", "margin")
+
+# Bumped whenever the table layout changes; see migrate()
+SCHEMA_VERSION = 2
+
+CREATE_HISTORY_TABLE = """
+    CREATE TABLE IF NOT EXISTS history (
+        id INTEGER PRIMARY KEY,
+        timestamp INTEGER NOT NULL,
+        customer_name TEXT NOT NULL,
+        customer REAL NOT NULL,
+        gross REAL NOT NULL,
+        net REAL NOT NULL,
+        margin REAL NOT NULL
+    );
+"""
+
+CREATE_HISTORY_INDEXES = """
+    CREATE INDEX IF NOT EXISTS idx_history_timestamp ON history (timestamp);
+    CREATE INDEX IF NOT EXISTS idx_history_customer_name
+        ON history (customer_name);
+"""
+
+# Small key/value table; holds the last journal sequence applied
+CREATE_META_TABLE = """
+    CREATE TABLE IF NOT EXISTS meta (
+        key TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    );
+"""
+
+DEFAULT_DB_PATH = os.path.join(
+    os.path.expanduser("~"), ".profit_calculator", "history.db")
+
+
+class HistoryStore:
+    """SQLite-backed persistent storage for calculation history."""
+
+    def __init__(self, path=None):
+        self.path = path or os.environ.get("HISTORY_DB_PATH", DEFAULT_DB_PATH)
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.migrate()
+
+    def migrate(self):
+        """Create the table, or bring an older one up to SCHEMA_VERSION."""
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(history)")]
+        if version >= 1:
+            upgrade = ""
+        elif "date" in columns:
+            # Version 0 stored local "%Y-%m-%d %H:%M" text; convert it to
+            # epoch seconds in one statement
+            upgrade = """
+                ALTER TABLE history RENAME TO history_v0;
+            """ + CREATE_HISTORY_TABLE + """
+                INSERT INTO history (id, timestamp, customer_name, customer,
+                                     gross, net, margin)
+                SELECT id, CAST(strftime('%s', date, 'utc') AS INTEGER),
+                       customer_name, customer, gross, net, margin
+                FROM history_v0;
+                DROP TABLE history_v0;
+            """
+        else:
+            upgrade = CREATE_HISTORY_TABLE
+        self.conn.executescript(
+            "BEGIN;" + upgrade + CREATE_HISTORY_INDEXES + CREATE_META_TABLE
+            + f"PRAGMA user_version = {SCHEMA_VERSION}; COMMIT;")
+
+    def add(self, row):
+        self.add_many([row])
+
+    def add_many(self, rows):
+        """Insert many history rows in a single transaction.
+
+        Rows are (timestamp, customer_name, customer, gross, net, margin)
+        tuples, as produced by HistoryColumns.rows().
+        """
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO history (timestamp, customer_name, customer, gross, net, margin) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def insert_at(self, positions, rows):
+        """Insert rows before the records at `positions`, counted in id order.
+
+        Records are kept in history order by id, so the records from the
+        first position on are read, deleted and written back with the new
+        rows among them, all in one transaction. `positions` ascend, one
+        per row; a position past the last record appends.
+        """
+        if not rows:
+            return
+        with self.conn:
+            # Take the write lock before reading, so no record is added
+            # between reading the tail and deleting it
+            self.conn.execute("BEGIN IMMEDIATE")
+            first_id = self.conn.execute(
+                "SELECT id FROM history ORDER BY id LIMIT 1 OFFSET ?",
+                (int(positions[0]),)).fetchone()
+            tail = []
+            if first_id is not None:
+                tail = self.conn.execute(
+                    "SELECT timestamp, customer_name, customer, gross, net, margin "
+                    "FROM history WHERE id >= ? ORDER BY id", first_id).fetchall()
+                self.conn.execute("DELETE FROM history WHERE id >= ?", first_id)
+
+            merged = []
+            new = 0
+            for position, record in enumerate(tail, int(positions[0])):
+                while new < len(rows) and positions[new] <= position:
+                    merged.append(rows[new])
+                    new += 1
+                merged.append(record)
+            merged.extend(rows[new:])
+            self.conn.executemany(
+                "INSERT INTO history (timestamp, customer_name, customer, gross, net, margin) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                merged,
+            )
+
+    def journal_sequence(self):
+        """Sequence number of the last journal record applied to the store."""
+        row = self.conn.execute(
+            "SELECT value FROM meta WHERE key = 'journal_sequence'").fetchone()
+        return row[0] if row else 0
+
+    def apply_journal(self, records):
+        """Insert (sequence, row) journal records not applied yet.
+
+        The rows and the new journal sequence are committed together, with
+        a full sync, so a record is never applied twice or lost even if the
+        journal is not truncated afterwards.
+        """
+        applied = self.journal_sequence()
+        records = [(sequence, row) for sequence, row in records if sequence > applied]
+        if not records:
+            return 0
+        self.conn.execute("PRAGMA synchronous=FULL")
+        try:
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT INTO history (timestamp, customer_name, customer, gross, net, margin) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [row for _, row in records],
+                )
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('journal_sequence', ?)",
+                    (records[-1][0],),
+                )
+        finally:
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        return len(records)
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+
+    def last_id(self):
+        return self.conn.execute("SELECT MAX(id) FROM history").fetchone()[0] or 0
+
+    def timestamps(self):
+        """Timestamps of every record, in id order."""
+        return [row[0] for row in self.conn.execute(
+            "SELECT timestamp FROM history ORDER BY id")]
+
+    def page(self, after_id=0, limit=500, max_id=None):
+        """Return (last id, rows) for up to `limit` rows with id > after_id.
+
+        Pages are read by key rather than OFFSET, so every page costs the
+        same no matter how deep into the table it is.
+        """
+        if max_id is None:
+            rows = self.conn.execute(
+                "SELECT id, timestamp, customer_name, customer, gross, net, margin "
+                "FROM history WHERE id > ? ORDER BY id LIMIT ?",
+                (after_id, limit),
+            ).fetchall()
+        else:
+            rows = self.conn.execute(
+                "SELECT id, timestamp, customer_name, customer, gross, net, margin "
+                "FROM history WHERE id > ? AND id <= ? ORDER BY id LIMIT ?",
+                (after_id, max_id, limit),
+            ).fetchall()
+
+        if not rows:
+            return after_id, []
+        return rows[-1][0], [row[1:] for row in rows]
+
+    def clear(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM history")
+
+    def close(self):
+        self.conn.close()
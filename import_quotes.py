@@ -0,0 +1,44 @@
+"""Price a CSV of raw quotes from the command line.
+
+The input uses the same columns that the Save button writes. Priced
+quotes are added to the history database and, with --output, written to
+a CSV as well.
+
+    python import_quotes.py quotes.csv --output priced.csv
+"""
+import argparse
+import multiprocessing
+import sys
+from history_store import HistoryStore
+from quote_import import IMPORT_CHUNK_SIZE, import_quotes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="CSV file of quotes to price")
+    parser.add_argument("--output", help="write the priced quotes to this CSV")
+    parser.add_argument("--no-history", action="store_true",
+                        help="do not add the quotes to the history database")
+    parser.add_argument("--db", help="history database (default: HISTORY_DB_PATH)")
+    parser.add_argument("--workers", type=int, help="worker processes")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    store = None if args.no_history else HistoryStore(args.db)
+    try:
+        result = import_quotes(args.input, args.output, store,
+                               workers=args.workers, chunk_size=args.chunk_size)
+    finally:
+        if store is not None:
+            store.close()
+
+    print(f"Priced {result['rows']} quotes in {result['seconds']:.2f} s "
+          f"({result['rows_per_second']:.0f} rows/s)")
+    if result["skipped"]:
+        print(f"Skipped {result['skipped']} rows that could not be parsed")
+    return 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -1,15 +1,27 @@
 
-import tkinter as tk
-from dotenv import load_dotenv, find_dotenv
-import os
-from profit_calculator import ProfitCalculatorApp
+import startup_timing
+
+startup_timing.start()
+
+import multiprocessing  # noqa: E402
+import tkinter as tk  # noqa: E402
+from dotenv import load_dotenv, find_dotenv  # noqa: E402
+import os  # noqa: E402
+import ui_watchdog  # noqa: E402
+from profit_calculator import ProfitCalculatorApp  # noqa: E402
 
 
 load_dotenv(find_dotenv())
 
 if __name__ == "__main__":
-    root = tk.Tk()
-    app = ProfitCalculatorApp(root)
+    # Needed for worker processes in the PyInstaller build
+    multiprocessing.freeze_support()
+    with startup_timing.phase("create window"):
+        root = tk.Tk()
+    with startup_timing.phase("build app"):
+        app = ProfitCalculatorApp(root)
     ICON_PATH = os.environ.get("ICON_PATH", "")
     root.iconbitmap(ICON_PATH)
+    startup_timing.report_first_frame(root)
+    ui_watchdog.start(root)
     root.mainloop()
@@ -0,0 +1,43 @@
+"""Merge history CSVs exported from the History tab into the history database.
+
+Records already in the database, or in more than one file, are only
+added once. New records are inserted among the stored ones by date.
+
+    python merge_history.py exports/*.csv
+"""
+import argparse
+import glob
+import multiprocessing
+import sys
+from history_merge import merge_history_exports
+from history_store import HistoryStore
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("inputs", nargs="+", help="exported history CSV files")
+    parser.add_argument("--db", help="history database (default: HISTORY_DB_PATH)")
+    parser.add_argument("--workers", type=int, help="worker processes")
+    args = parser.parse_args(argv)
+
+    # Windows shells don't expand wildcards
+    paths = [path for pattern in args.inputs for path in sorted(glob.glob(pattern)) or [pattern]]
+
+    store = HistoryStore(args.db)
+    try:
+        result = merge_history_exports(paths, store, workers=args.workers)
+    finally:
+        store.close()
+
+    print(f"Merged {len(result['history'])} new records from {result['files']} files "
+          f"in {result['seconds']:.2f} s ({result['duplicates']} duplicates)")
+    if result["skipped"]:
+        print(f"Skipped {result['skipped']} rows that could not be parsed")
+    for failure in result["failed"]:
+        print(f"Could not read {failure}", file=sys.stderr)
+    return 1 if result["failed"] else 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,89 @@
+import numpy as np
+from quote_engine import price_batch
+
+# Fields whose cost can be given as a range, in form order
+UNCERTAIN_FIELDS = ("travel_cost", "hotel_cost", "payroll_cost")
+
+SIMULATION_DRAWS = 100000
+# Draws priced per step; the worker reports progress and can be
+# cancelled between chunks
+SIMULATION_CHUNK = 20000
+# Fixed, so the same inputs always give the same figures
+SIMULATION_SEED = 20240601
+
+HISTOGRAM_BINS = 40
+
+
+def sample_triangular(rng, low, mode, high, size):
+    """Triangular draws; a range of zero width is just its value."""
+    if low == high:
+        return np.full(size, mode, dtype=np.float64)
+    return rng.triangular(low, mode, high, size)
+
+
+def simulation_key(record, ranges, draws=SIMULATION_DRAWS, seed=SIMULATION_SEED):
+    """Hashable description of a simulation, for caching its result."""
+    return (
+        tuple(record[attr] for attr in (
+            "gear_cost", "travel_cost", "hotel_cost", "payroll_cost",
+            "other_cost", "customer_payment", "tax_rate")),
+        tuple(record["discount"]),
+        tuple(sorted(ranges.items())),
+        draws,
+        seed,
+    )
+
+
+def simulate_quote(record, ranges, draws=SIMULATION_DRAWS, seed=SIMULATION_SEED,
+                   chunk_size=SIMULATION_CHUNK, progress=None):
+    """Monte Carlo of a quote's net profit and margin.
+
+    `record` is a validated form record; `ranges` maps fields of
+    UNCERTAIN_FIELDS to (min, max), with the record's value as the most
+    likely cost. Each chunk draws every uncertain cost from a triangular
+    distribution and prices the draws with price_batch. `progress(done,
+    draws)` is called after each chunk.
+
+    Returns a dict with P(loss), the P5/P50/P95 net profit, the mean
+    margin and a histogram of the margin.
+    """
+    # One stream per field, so the draws don't depend on the chunk size
+    rngs = dict(zip(UNCERTAIN_FIELDS, map(
+        np.random.default_rng, np.random.SeedSequence(seed).spawn(len(UNCERTAIN_FIELDS)))))
+    net = np.empty(draws, dtype=np.float64)
+    margin = np.empty(draws, dtype=np.float64)
+    flat, percent = record["discount"]
+    for start in range(0, draws, chunk_size):
+        size = min(chunk_size, draws - start)
+        costs = {
+            attr: (sample_triangular(rngs[attr], ranges[attr][0], record[attr],
+                                     ranges[attr][1], size)
+                   if attr in ranges else record[attr])
+            for attr in UNCERTAIN_FIELDS
+        }
+        _, chunk_net, chunk_margin = price_batch(
+            record["gear_cost"], costs["travel_cost"], costs["hotel_cost"],
+            costs["payroll_cost"], record["other_cost"],
+            record["customer_payment"], record["tax_rate"], flat, percent)
+        net[start:start + size] = chunk_net
+        margin[start:start + size] = chunk_margin
+        if progress:
+            progress(start + size, draws)
+
+    p5, p50, p95 = np.percentile(net, [5, 50, 95]).tolist()
+    counts, edges = np.histogram(margin, bins=HISTOGRAM_BINS)
+    return {
+        "draws": draws,
+        "p_loss": float(np.count_nonzero(net < 0)) / draws,
+        "net_p5": p5,
+        "net_p50": p50,
+        "net_p95": p95,
+        "margin_mean": float(margin.mean()),
+        "margin_counts": counts.tolist(),
+        "margin_edges": edges.tolist(),
+    }
+
+
+def simulate_task(report, cancel_event, record, ranges):
+    """BackgroundTask target for simulate_quote()."""
+    return simulate_quote(record, ranges, progress=report)
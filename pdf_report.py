@@ -0,0 +1,225 @@
+import multiprocessing
+import os
+import queue
+import tempfile
+import perf_stats
+from background_tasks import TaskCancelled
+from history_columns import format_timestamp
+from history_export import HISTORY_HEADERS, format_money, format_percent
+from utils import atomic_write
+
+# Landscape A4 layout, in millimetres
+COL_WIDTHS = [40, 67, 45, 45, 45, 35]
+ROW_HEIGHT = 7
+HEADER_HEIGHT = 8
+TITLE_HEIGHT = 10
+MARGIN = 10
+
+
+def pdf_text(text):
+    # The core PDF fonts only cover latin-1
+    return str(text).encode("latin-1", "replace").decode("latin-1")
+
+
+def fit_text(pdf, text, width):
+    """Shorten text with an ellipsis so it fits in a cell of `width`."""
+    text = pdf_text(text)
+    if pdf.get_string_width(text) <= width - 2:
+        return text
+    while text and pdf.get_string_width(text + "...") > width - 2:
+        text = text[:-1]
+    return text + "..."
+
+
+def render_chart_images(chart_data, directory):
+    """Render the expense charts with Agg and return the PNG paths."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    from types import SimpleNamespace
+    from chart_manager import ChartManager
+
+    chart_manager = ChartManager(SimpleNamespace(dark_mode=False), headless=True)
+    chart_manager.update_charts(*chart_data)
+    figures = [chart_manager.bar_fig]
+    if chart_manager.pie_visible:
+        figures.insert(0, chart_manager.pie_fig)
+
+    paths = []
+    for index, figure in enumerate(figures):
+        path = os.path.join(directory, f"chart_{index}.png")
+        figure.savefig(path, dpi=100, facecolor=figure.get_facecolor())
+        paths.append(path)
+    chart_manager.destroy_charts()
+    return paths
+
+
+class HistoryReport:
+    """Builds a paginated history PDF one page of rows at a time.
+
+    Each page repeats the table header and ends with a subtotal line; the
+    last page also carries the grand total. Rows are only formatted as
+    their page is written, so a long report never holds a formatted copy
+    of the whole history.
+    """
+
+    def __init__(self, title="Calculation History"):
+        from fpdf import FPDF
+
+        self.title = title
+        self.pdf = FPDF(orientation="L")
+        self.pdf.set_auto_page_break(False)
+        self.pdf.set_margins(MARGIN, MARGIN)
+        # Room is left for the header, the subtotal and the grand total lines
+        self.rows_per_page = int(
+            (self.pdf.h - 2 * MARGIN - TITLE_HEIGHT - 3 * HEADER_HEIGHT)
+            // ROW_HEIGHT)
+        self.page_number = 0
+
+    def add_charts(self, image_paths):
+        pdf = self.pdf
+        pdf.add_page()
+        pdf.set_font("Arial", "B", 14)
+        pdf.cell(0, TITLE_HEIGHT, txt="Expense Charts", ln=True, align="C")
+        width = (pdf.w - 2 * MARGIN) / max(len(image_paths), 1)
+        for index, path in enumerate(image_paths):
+            pdf.image(path, x=MARGIN + index * width, y=MARGIN + TITLE_HEIGHT + 5,
+                      w=width)
+
+    def add_page(self, rows):
+        """Add one page with the given history rows, a header and a subtotal."""
+        pdf = self.pdf
+        self.page_number += 1
+        pdf.add_page()
+
+        pdf.set_font("Arial", "B", 12)
+        pdf.cell(0, TITLE_HEIGHT, txt=pdf_text(self.title), ln=True, align="C")
+
+        # Table header, repeated on every page
+        pdf.set_font("Arial", "B", 10)
+        for width, header in zip(COL_WIDTHS, HISTORY_HEADERS):
+            pdf.cell(width, HEADER_HEIGHT, txt=header, border=1)
+        pdf.ln()
+
+        pdf.set_font("Arial", size=10)
+        payment = gross = net = 0.0
+        for timestamp, customer_name, row_payment, row_gross, row_net, row_margin in rows:
+            cells = (
+                format_timestamp(timestamp),
+                fit_text(pdf, customer_name, COL_WIDTHS[1]),
+                format_money(row_payment),
+                format_money(row_gross),
+                format_money(row_net),
+                format_percent(row_margin),
+            )
+            for width, text in zip(COL_WIDTHS, cells):
+                pdf.cell(width, ROW_HEIGHT, txt=text, border=1)
+            pdf.ln()
+            payment += row_payment
+            gross += row_gross
+            net += row_net
+
+        self.add_total_line(f"Page {self.page_number} subtotal",
+                            payment, gross, net)
+        return payment, gross, net
+
+    def add_total_line(self, label, payment, gross, net):
+        pdf = self.pdf
+        margin = (net / payment * 100) if payment > 0 else 0
+        pdf.set_font("Arial", "B", 10)
+        cells = (label, "", format_money(payment), format_money(gross),
+                 format_money(net), format_percent(margin))
+        widths = [COL_WIDTHS[0] + COL_WIDTHS[1], 0] + COL_WIDTHS[2:]
+        for width, text in zip(widths, cells):
+            if width:
+                pdf.cell(width, HEADER_HEIGHT, txt=text, border=1)
+        pdf.ln()
+
+    def build(self, history, progress=None):
+        """Write all pages of a HistoryColumns.
+
+        `progress(done, total)` is called per page.
+        """
+        total = len(history)
+        totals = [0.0, 0.0, 0.0]
+        for start in range(0, max(total, 1), self.rows_per_page):
+            page_totals = self.add_page(history.rows(start, start + self.rows_per_page))
+            totals = [a + b for a, b in zip(totals, page_totals)]
+            if progress:
+                progress(min(start + self.rows_per_page, total), total)
+        self.add_total_line("Grand total", *totals)
+
+    def save(self, file_path):
+        with atomic_write(file_path, "wb") as file:
+            file.write(self.pdf.output(dest="S").encode("latin-1"))
+
+
+def write_history_pdf(file_path, history, chart_data=None, progress=None):
+    """Build the complete history report and save it to file_path."""
+    report = HistoryReport()
+    if chart_data is not None:
+        with tempfile.TemporaryDirectory() as directory:
+            report.add_charts(render_chart_images(chart_data, directory))
+    report.build(history, progress)
+    report.save(file_path)
+    return file_path
+
+
+def _report_process(file_path, history, chart_data, messages, cancel_event):
+    def progress(done, total):
+        if cancel_event.is_set():
+            raise TaskCancelled()
+        messages.put(("progress", done, total))
+
+    try:
+        write_history_pdf(file_path, history, chart_data, progress)
+        messages.put(("done",))
+    except TaskCancelled:
+        messages.put(("cancelled",))
+    except Exception as e:
+        messages.put(("error", str(e)))
+
+
+@perf_stats.timed_function("export.pdf")
+def export_history_pdf(report, cancel_event, file_path, history, chart_data=None):
+    """BackgroundTask target: build the PDF in a separate worker process.
+
+    The process does all of the formatting and layout, so neither the Tk
+    thread nor the GIL it needs is held up by large reports. `history` is
+    a HistoryColumns snapshot, which pickles as a handful of arrays.
+    """
+    context = multiprocessing.get_context("spawn")
+    messages = context.Queue()
+    process_cancel = context.Event()
+    process = context.Process(
+        target=_report_process,
+        args=(file_path, history, chart_data, messages, process_cancel),
+        daemon=True,
+    )
+    process.start()
+    try:
+        while True:
+            if cancel_event.is_set():
+                # The process stops at the next page and removes its temp file
+                process_cancel.set()
+            try:
+                message = messages.get(timeout=0.1)
+            except queue.Empty:
+                if not process.is_alive() and messages.empty():
+                    raise RuntimeError("Report process exited unexpectedly")
+                continue
+            if message[0] == "progress":
+                report(message[1], message[2])
+            elif message[0] == "cancelled":
+                raise TaskCancelled()
+            elif message[0] == "error":
+                raise RuntimeError(message[1])
+            else:
+                return file_path
+    except TaskCancelled:
+        process_cancel.set()
+        raise
+    finally:
+        process.join(timeout=10)
+        if process.is_alive():
+            process.terminate()
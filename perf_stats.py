@@ -0,0 +1,127 @@
+"""Hot-path timing statistics.
+
+Wrap a phase in `with perf_stats.timed("name"):` (or decorate a function
+with `@perf_stats.timed_function("name")`) to record how long it takes.
+The last RING_SIZE durations of each phase are kept in a ring buffer, from
+which rolling p50/p95/p99 are computed on demand.
+
+Recording is off unless PROFIT_CALC_PERF=1 is set or the debug panel turns
+it on. While off, timed() returns a shared no-op context manager, so an
+instrumented call costs one global lookup and a function call.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+import numpy as np
+from utils import atomic_write
+
+ENV_VAR = "PROFIT_CALC_PERF"
+
+# Durations kept per phase
+RING_SIZE = 1024
+
+enabled = os.environ.get(ENV_VAR, "") not in ("", "0")
+phases = {}  # Phase name -> PhaseStats
+
+_lock = threading.Lock()
+_disabled = nullcontext()
+
+
+class PhaseStats:
+    """Fixed-size ring buffer of durations, in seconds, for one phase."""
+
+    def __init__(self, size=RING_SIZE):
+        # A plain list: storing a float in it is cheaper than into an array
+        self.durations = [0.0] * size
+        self.next = 0
+        self.count = 0  # Total recorded, including overwritten ones
+        self.last = 0.0
+
+    def record(self, seconds):
+        # Exporters record from worker threads
+        with _lock:
+            self.durations[self.next] = seconds
+            self.next = (self.next + 1) % len(self.durations)
+            self.count += 1
+            self.last = seconds
+
+    def summary(self):
+        """Rolling statistics over the buffered durations, in milliseconds."""
+        with _lock:
+            window = self.durations[:min(self.count, len(self.durations))]
+            count, last = self.count, self.last * 1000
+        if not window:
+            return {"count": 0}
+        window = np.array(window) * 1000
+        p50, p95, p99 = np.percentile(window, [50, 95, 99]).tolist()
+        return {"count": count, "last_ms": last, "p50_ms": p50,
+                "p95_ms": p95, "p99_ms": p99, "max_ms": float(window.max())}
+
+
+class _Timer:
+    __slots__ = ("stats", "start")
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        # Phases that fail (invalid input, a cancelled export) are not counted
+        if exc_type is None:
+            self.stats.record(time.perf_counter() - self.start)
+
+
+def get_stats(name):
+    stats = phases.get(name)
+    if stats is None:
+        stats = phases.setdefault(name, PhaseStats())
+    return stats
+
+
+def timed(name):
+    """Context manager that records the duration of a named phase."""
+    if not enabled:
+        return _disabled
+    return _Timer(get_stats(name))
+
+
+def timed_function(name):
+    """Decorator form of timed()."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with timed(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def set_enabled(value):
+    global enabled
+    enabled = bool(value)
+
+
+def reset():
+    phases.clear()
+
+
+def snapshot():
+    """Summary of every phase recorded so far, keyed by phase name."""
+    return {name: stats.summary() for name, stats in sorted(phases.items())}
+
+
+def export_json(file_path):
+    data = {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "ring_size": RING_SIZE,
+        "phases": snapshot(),
+    }
+    with atomic_write(file_path) as file:
+        json.dump(data, file, indent=2)
+    return file_path
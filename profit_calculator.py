@@ -1,11 +1,27 @@
+import math
 import tkinter as tk
 from tkinter import messagebox, ttk
 from datetime import datetime
 from theme_manager import ThemeManager
 from history_manager import HistoryManager
+from autocomplete import Autocomplete
+from customer_manager import CustomerManager
+from report_manager import ReportManager
 from file_manager import FileManager
 from chart_manager import ChartManager
-from utils import normalize_field_name
+from debug_panel import DebugPanel
+from scenario_panel import ScenarioPanel
+from simulation_manager import SimulationManager
+from quote_engine import parse_target, price_quote, solve_payment
+import perf_stats
+import startup_timing
+import ui_watchdog
+from field_schema import FIELDS, FIELDS_BY_NAME, MissingFieldsError, validate_form
+from utils import Debouncer
+
+# Live mode: results follow typing quickly, charts once typing has stopped
+LIVE_RESULTS_DELAY_MS = 150
+LIVE_CHARTS_DELAY_MS = 600
 
 
 class ProfitCalculatorApp:
@@ -18,8 +34,13 @@ class ProfitCalculatorApp:
         # Initialize managers
         self.theme_manager = ThemeManager(self)
         self.history_manager = HistoryManager(self)
+        self.customer_manager = CustomerManager(self)
+        self.report_manager = ReportManager(self)
         self.file_manager = FileManager(self)
         self.chart_manager = ChartManager(self)
+        self.debug_panel = DebugPanel(self)
+        self.scenario_panel = ScenarioPanel(self)
+        self.simulation_manager = SimulationManager(self)
 
         # App state
         self.dark_mode = False
@@ -34,9 +55,22 @@ class ProfitCalculatorApp:
         self.last_gross = 0
         self.last_net = 0
 
+        # Debounced live recalculation
+        self.live_numbers = Debouncer(
+            self.root, LIVE_RESULTS_DELAY_MS, self.live_recalculate)
+        self.live_charts = Debouncer(
+            self.root, LIVE_CHARTS_DELAY_MS, self.update_charts)
+
         # Create UI elements
+        self.theme_manager.register(self.root, "root")
         self.create_widgets()
         self.theme_manager.update_theme()
+        self.history_manager.load_history()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def on_close(self):
+        self.history_manager.close()
+        self.root.destroy()
 
     def create_widgets(self):
         # Main container with padding
@@ -46,6 +80,7 @@ class ProfitCalculatorApp:
         # Create header with logo and title
         self.header_frame = tk.Frame(main_container)
         self.header_frame.pack(fill=tk.X, pady=(0, 20))
+        self.theme_manager.register(self.header_frame, "header")
 
         # App title with better font
         self.header_label = tk.Label(
@@ -56,6 +91,7 @@ class ProfitCalculatorApp:
             pady=15,
         )
         self.header_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.theme_manager.register(self.header_label, "title")
 
         # Mode toggle with a pill switch (slider)
         self.toggle_var = tk.BooleanVar(value=False)  # Default to light mode
@@ -65,7 +101,7 @@ class ProfitCalculatorApp:
             variable=self.toggle_var,
             onvalue=True,
             offvalue=False,
-            command=self.theme_manager.toggle_mode,
+            command=ui_watchdog.watch(self.theme_manager.toggle_mode),
             font=("Helvetica", 10),
             relief="flat",
             indicatoron=False,
@@ -76,6 +112,7 @@ class ProfitCalculatorApp:
             activeforeground="#333333",
         )
         self.toggle_button.pack(side=tk.RIGHT, padx=10)
+        self.theme_manager.register(self.toggle_button, "toggle")
 
         # Create main content frame with tabs
         self.notebook = ttk.Notebook(main_container)
@@ -89,11 +126,20 @@ class ProfitCalculatorApp:
         self.history_tab = ttk.Frame(self.notebook, padding=10)
         self.notebook.add(self.history_tab, text="History")
 
+        # Tab 3: Customers
+        self.customer_tab = ttk.Frame(self.notebook, padding=10)
+        self.notebook.add(self.customer_tab, text="Customers")
+
+        # Tab 4: Reports
+        self.report_tab = ttk.Frame(self.notebook, padding=10)
+        self.notebook.add(self.report_tab, text="Reports")
+
         # Setup calculator tab content
         self.setup_calculator_tab()
 
-        # Setup history tab content
-        self.history_manager.setup_history_tab()
+        # History, Customers and Reports tab content is built the first time
+        # the tab is selected
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
 
         # Status bar
         self.status_bar = tk.Label(
@@ -105,6 +151,28 @@ class ProfitCalculatorApp:
             font=("Helvetica", 9),
         )
         self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.theme_manager.register(self.status_bar, "status")
+
+        # Performance panel
+        self.status_bar.bind("<Double-Button-1>", self.debug_panel.show)
+        self.root.bind("<F12>", self.debug_panel.show)
+
+    def on_tab_changed(self, event=None):
+        selected = self.notebook.select()
+        if (selected == str(self.history_tab)
+                and self.history_manager.history_tree is None):
+            with startup_timing.phase("build history tab"):
+                self.history_manager.setup_history_tab()
+        elif selected == str(self.customer_tab):
+            if self.customer_manager.customer_tree is None:
+                self.customer_manager.setup_customer_tab()
+            else:
+                self.customer_manager.refresh()
+        elif selected == str(self.report_tab):
+            if self.report_manager.report_tree is None:
+                self.report_manager.setup_report_tab()
+            else:
+                self.report_manager.refresh()
 
     def setup_calculator_tab(self):
         # Split into left (form) and right (results) panes
@@ -115,10 +183,12 @@ class ProfitCalculatorApp:
         # Left pane: Form container with border and rounded corners
         self.form_container = tk.Frame(calculator_panes, padx=10, pady=10)
         calculator_panes.add(self.form_container, width=400)
+        self.theme_manager.register(self.form_container, "container")
 
         # Create form with labels and entries
         self.form_frame = tk.Frame(self.form_container, padx=15, pady=15)
         self.form_frame.pack(fill=tk.BOTH, expand=True)
+        self.theme_manager.register(self.form_frame, "panel")
 
         # Form title
         form_title = tk.Label(
@@ -128,32 +198,20 @@ class ProfitCalculatorApp:
         )
         form_title.grid(row=0, column=0, columnspan=2,
                         sticky="w", pady=(0, 15))
+        self.theme_manager.register(form_title, "label")
 
-        # Input fields with better layout and visual cues for required fields
-        self.fields = [
-            {"name": "Customer Name", "required": True, "type": "text"},
-            {"name": "Gear Rental Cost ($)",
-             "required": True, "type": "float"},
-            {"name": "Travel Expenses ($)",
-             "required": False, "type": "float"},
-            {"name": "Hotel Expenses ($)", "required": False, "type": "float"},
-            {"name": "Payroll Costs ($)", "required": True, "type": "float"},
-            {"name": "Other Expenses ($)", "required": False, "type": "float"},
-            {"name": "Customer Payment ($)",
-             "required": True, "type": "float"},
-            {"name": "Tax Rate (%)", "required": False, "type": "float"},
-            {"name": "Discount", "required": False,
-                "type": "text", "placeholder": "e.g. 10% or $50"},
-        ]
+        # Input fields come from the shared field schema
+        self.fields = FIELDS
 
         self.entries = {}
         for idx, field in enumerate(self.fields):
             # Create frame for each field
             field_frame = tk.Frame(self.form_frame)
             field_frame.grid(row=idx + 1, column=0, sticky="ew", pady=8)
+            self.theme_manager.register(field_frame, "panel")
 
             # Label with asterisk for required fields
-            label_text = field["name"] + (" *" if field["required"] else "")
+            label_text = field.name + (" *" if field.required else "")
             label = tk.Label(
                 field_frame,
                 text=label_text,
@@ -162,6 +220,7 @@ class ProfitCalculatorApp:
                 width=20,
             )
             label.pack(side=tk.LEFT)
+            self.theme_manager.register(label, "label")
 
             # Entry with validation
             entry = tk.Entry(field_frame, font=(
@@ -169,17 +228,17 @@ class ProfitCalculatorApp:
             entry.pack(side=tk.LEFT, fill=tk.X, expand=True, ipady=3)
 
             # Add placeholder text
-            if "placeholder" in field:
-                entry.insert(0, field["placeholder"])
+            if field.placeholder:
+                entry.insert(0, field.placeholder)
                 entry.config(fg="#999999")
 
-                def on_focus_in(event, entry=entry, placeholder=field["placeholder"]):
+                def on_focus_in(event, entry=entry, placeholder=field.placeholder):
                     if entry.get() == placeholder:
                         entry.delete(0, tk.END)
                         entry.config(
                             fg=self.theme_manager.get_theme_color("fg_entry"))
 
-                def on_focus_out(event, entry=entry, placeholder=field["placeholder"]):
+                def on_focus_out(event, entry=entry, placeholder=field.placeholder):
                     if entry.get() == "":
                         entry.insert(0, placeholder)
                         entry.config(fg="#999999")
@@ -187,206 +246,349 @@ class ProfitCalculatorApp:
                 entry.bind("<FocusIn>", on_focus_in)
                 entry.bind("<FocusOut>", on_focus_out)
 
+            self.theme_manager.register(entry, "entry")
+
+            # Recalculate as the user types when live mode is on
+            entry.bind("<KeyRelease>", self.on_entry_changed, add="+")
+
             # Store entry reference
-            self.entries[
-                field["name"]
-                .lower()
-                .replace(" ", "_")
-                .replace("($)", "")
-                .replace("(%)", "")
-            ] = entry
+            self.entries[field.key] = entry
+
+        # Suggest customer names from the history as the name is typed
+        self.customer_autocomplete = Autocomplete(
+            self.entries[FIELDS_BY_NAME["Customer Name"].key],
+            self.history_manager.name_index.complete,
+            self.theme_manager,
+        )
 
         # Buttons frame with improved layout
         button_frame = tk.Frame(self.form_frame)
         button_frame.grid(row=len(self.fields) + 1, column=0, pady=20)
+        self.theme_manager.register(button_frame, "panel")
 
         # Calculate button with icon
         self.calculate_button = tk.Button(
             button_frame,
             text="Calculate",
-            command=self.calculate_profit,
+            command=ui_watchdog.watch(self.calculate_profit),
             font=("Helvetica", 12, "bold"),
             width=12,
             relief="raised",
             padx=10,
         )
         self.calculate_button.pack(side=tk.LEFT, padx=5)
+        self.theme_manager.register(self.calculate_button, "button_primary")
 
         # Reset button
         self.reset_button = tk.Button(
             button_frame,
             text="Reset",
-            command=self.reset_fields,
+            command=ui_watchdog.watch(self.reset_fields),
             font=("Helvetica", 12),
             width=8,
             relief="raised",
         )
         self.reset_button.pack(side=tk.LEFT, padx=5)
+        self.theme_manager.register(self.reset_button, "button_secondary")
 
         # Save button
         self.save_button = tk.Button(
             button_frame,
             text="Save",
-            command=self.file_manager.save_to_csv,
+            command=ui_watchdog.watch(self.file_manager.save_to_csv),
             font=("Helvetica", 12),
             width=8,
             relief="raised",
         )
         self.save_button.pack(side=tk.LEFT, padx=5)
+        self.theme_manager.register(self.save_button, "button_tertiary")
+
+        # What-if heatmap over discount and tax rate
+        self.what_if_button = tk.Button(
+            button_frame,
+            text="What-If",
+            command=ui_watchdog.watch(self.scenario_panel.show),
+            font=("Helvetica", 12),
+            width=8,
+            relief="raised",
+        )
+        self.what_if_button.pack(side=tk.LEFT, padx=5)
+        self.theme_manager.register(self.what_if_button, "button_tertiary")
+
+        # Live update toggle
+        self.live_var = tk.BooleanVar(value=False)
+        self.live_toggle = tk.Checkbutton(
+            self.form_frame,
+            text="Live update",
+            variable=self.live_var,
+            command=ui_watchdog.watch(self.toggle_live_mode),
+            font=("Helvetica", 10),
+        )
+        self.live_toggle.grid(row=len(self.fields) + 2, column=0, sticky="w")
+        self.theme_manager.register(self.live_toggle, "checkbutton")
+
+        # Solve for the customer payment that reaches a target
+        solver_frame = tk.Frame(self.form_frame)
+        solver_frame.grid(row=len(self.fields) + 3, column=0, sticky="ew", pady=(10, 0))
+        self.theme_manager.register(solver_frame, "panel")
+
+        solver_label = tk.Label(
+            solver_frame,
+            text="Target (30% or $500)",
+            font=("Helvetica", 10),
+            anchor="w",
+            width=20,
+        )
+        solver_label.pack(side=tk.LEFT)
+        self.theme_manager.register(solver_label, "label")
+
+        self.target_entry = tk.Entry(
+            solver_frame, font=("Helvetica", 10), relief="solid", bd=1, width=10)
+        self.target_entry.pack(side=tk.LEFT, ipady=3)
+        self.target_entry.bind(
+            "<Return>", ui_watchdog.watch(lambda event: self.solve_payment(),
+                                          "ProfitCalculatorApp.solve_payment"))
+        self.theme_manager.register(self.target_entry, "entry")
+
+        solve_button = tk.Button(
+            solver_frame,
+            text="Solve Payment",
+            command=ui_watchdog.watch(self.solve_payment),
+            font=("Helvetica", 10),
+        )
+        solve_button.pack(side=tk.LEFT, padx=5)
+        self.theme_manager.register(solve_button, "button_tertiary")
 
         # Right pane: Results and charts
         self.results_container = tk.Frame(calculator_panes)
         calculator_panes.add(self.results_container)
+        self.theme_manager.register(self.results_container, "container")
 
         # Results frame
         self.results_frame = tk.Frame(self.results_container, padx=15, pady=15)
         self.results_frame.pack(fill=tk.BOTH, expand=True)
+        self.theme_manager.register(self.results_frame, "panel")
 
         # Results title
         results_title = tk.Label(
             self.results_frame, text="Results", font=("Helvetica", 14, "bold")
         )
         results_title.pack(anchor="w", pady=(0, 15))
+        self.theme_manager.register(results_title, "label")
 
         # Results display
         self.result_frame = tk.Frame(
             self.results_frame, relief="ridge", bd=1, padx=15, pady=15
         )
         self.result_frame.pack(fill=tk.X)
+        self.theme_manager.register(self.result_frame, "result_frame")
 
         # Results with better layout
         self.result_gross_label = tk.Label(
             self.result_frame, text="Gross Expenses:", font=("Helvetica", 12)
         )
         self.result_gross_label.grid(row=0, column=0, sticky="w", pady=5)
+        self.theme_manager.register(self.result_gross_label, "result")
 
         self.result_gross_value = tk.Label(
             self.result_frame, text="$0.00", font=("Helvetica", 12, "bold")
         )
         self.result_gross_value.grid(row=0, column=1, sticky="e", pady=5)
+        self.theme_manager.register(self.result_gross_value, "result")
 
         self.result_net_label = tk.Label(
             self.result_frame, text="Net Profit:", font=("Helvetica", 12)
         )
         self.result_net_label.grid(row=1, column=0, sticky="w", pady=5)
+        self.theme_manager.register(self.result_net_label, "result")
 
         self.result_net_value = tk.Label(
             self.result_frame, text="$0.00", font=("Helvetica", 12, "bold")
         )
         self.result_net_value.grid(row=1, column=1, sticky="e", pady=5)
+        self.theme_manager.register(self.result_net_value, "result")
 
         self.result_margin_label = tk.Label(
             self.result_frame, text="Profit Margin:", font=("Helvetica", 12)
         )
         self.result_margin_label.grid(row=2, column=0, sticky="w", pady=5)
+        self.theme_manager.register(self.result_margin_label, "result")
 
         self.result_margin_value = tk.Label(
             self.result_frame, text="0%", font=("Helvetica", 12, "bold")
         )
         self.result_margin_value.grid(row=2, column=1, sticky="e", pady=5)
+        self.theme_manager.register(self.result_margin_value, "result")
 
         # Configure grid columns
         self.result_frame.grid_columnconfigure(0, weight=1)
         self.result_frame.grid_columnconfigure(1, weight=1)
 
+        # Optional cost ranges and their simulated outcome
+        self.simulation_manager.setup_simulation_frame(self.results_frame)
+
         # Charts frame
         self.chart_frame = tk.Frame(self.results_frame)
         self.chart_frame.pack(fill=tk.BOTH, expand=True, pady=20)
+        self.theme_manager.register(self.chart_frame, "panel")
+
+    def form_values(self):
+        return {key: entry.get() for key, entry in self.entries.items()}
+
+    def read_inputs(self, check_required=True):
+        """Validate the form and return a typed record.
+
+        Raises MissingFieldsError if a required field is empty and
+        ValueError if a value does not parse.
+        """
+        return validate_form(self.form_values(), check_required)
+
+    def price_inputs(self, inputs):
+        # Price the quote with the shared engine
+        return price_quote(
+            inputs["gear_cost"], inputs["travel_cost"], inputs["hotel_cost"],
+            inputs["payroll_cost"], inputs["other_cost"],
+            inputs["customer_payment"], inputs["tax_rate"], inputs["discount"])
+
+    def show_results(self, gross, net, margin_percent):
+        # Update result display
+        self.result_gross_value.config(text=f"${gross:.2f}")
+        self.result_net_value.config(text=f"${net:.2f}")
+        self.result_margin_value.config(text=f"{margin_percent:.1f}%")
+
+        # Color-code net profit based on value
+        if net > 0:
+            self.result_net_value.config(fg="#388E3C")  # Green for profit
+        elif net < 0:
+            self.result_net_value.config(fg="#D32F2F")  # Red for loss
+        else:
+            self.result_net_value.config(
+                fg=self.theme_manager.get_theme_color("fg_result"))
+
+    def update_charts(self, inputs, gross, net):
+        self.chart_manager.update_charts(
+            inputs["gear_cost"], inputs["travel_cost"], inputs["hotel_cost"],
+            inputs["payroll_cost"], inputs["other_cost"], gross, net
+        )
 
     def calculate_profit(self):
+        # A pending live update is superseded by this full calculation
+        self.live_numbers.cancel()
+        self.live_charts.cancel()
         try:
-            # Get values (handle required fields)
-            customer_name = self.entries[normalize_field_name(
-                "Customer Name")].get().strip()
-            gear_cost = self.get_float_value("Gear Rental Cost ($)")
-            payroll_cost = self.get_float_value("Payroll Costs ($)")
-            customer_payment = self.get_float_value("Customer Payment ($)")
-
-            # Check required fields
-            if None in [customer_name, gear_cost, payroll_cost, customer_payment]:
-                messagebox.showerror(
-                    "Error", "Please fill in all required fields marked with *")
-                return
-
-            # Get optional values (default to 0)
-            travel_cost = self.get_float_value("Travel Expenses ($)", 0)
-            hotel_cost = self.get_float_value("Hotel Expenses ($)", 0)
-            other_cost = self.get_float_value("Other Expenses ($)", 0)
-            tax_rate = self.get_float_value(
-                "Tax Rate (%)", 0) / 100  # Convert to decimal
-
-            # Handle discount
-            discount = 0
-            discount_text = self.entries[normalize_field_name(
-                "Discount")].get().strip()
-            if discount_text and discount_text != "e.g. 10% or $50":
-                if "%" in discount_text:
-                    discount_percent = float(discount_text.replace("%", ""))
-                    discount = (discount_percent / 100) * customer_payment
-                elif "$" in discount_text:
-                    discount = float(discount_text.replace("$", ""))
-                else:
-                    # Try to convert directly to float
-                    discount = float(discount_text)
-
-            # Calculate results
-            subtotal = gear_cost + travel_cost + hotel_cost + payroll_cost + other_cost
-            tax = subtotal * tax_rate
-            gross = subtotal + tax - discount
-            net = customer_payment - gross
-
-            # Calculate margin percentage
-            margin_percent = (net / customer_payment *
-                              100) if customer_payment > 0 else 0
-
-            # Update result display
-            self.result_gross_value.config(text=f"${gross:.2f}")
-            self.result_net_value.config(text=f"${net:.2f}")
-            self.result_margin_value.config(text=f"{margin_percent:.1f}%")
-
-            # Color-code net profit based on value
-            if net > 0:
-                self.result_net_value.config(fg="#388E3C")  # Green for profit
-            elif net < 0:
-                self.result_net_value.config(fg="#D32F2F")  # Red for loss
-            else:
-                self.result_net_value.config(
-                    fg=self.theme_manager.get_theme_color("fg_result"))
-
-            # Update charts
-            self.chart_manager.update_charts(
-                gear_cost, travel_cost, hotel_cost, payroll_cost, other_cost, gross, net
-            )
-
-            # Add to history
-            current_time = datetime.now().strftime("%Y-%m-%d %H:%M")
-            history_item = {
-                "date": current_time,
-                "customer_name": customer_name,
-                "customer": customer_payment,
-                "gross": gross,
-                "net": net,
-                "margin": margin_percent,
-            }
-            self.history_manager.add_to_history(history_item)
+            with perf_stats.timed("calculate"):
+                with perf_stats.timed("calculate.parse"):
+                    inputs = self.read_inputs()
+                with perf_stats.timed("calculate.price"):
+                    gross, net, margin_percent = self.price_inputs(inputs)
+                with perf_stats.timed("calculate.results"):
+                    self.show_results(gross, net, margin_percent)
+
+                # Update charts
+                self.update_charts(inputs, gross, net)
+
+                # Add to history
+                now = datetime.now()
+                current_time = now.strftime("%Y-%m-%d %H:%M")
+                with perf_stats.timed("calculate.history"):
+                    self.history_manager.add_to_history(
+                        int(now.timestamp()), inputs["customer_name"],
+                        inputs["customer_payment"], gross, net, margin_percent)
+
+                # Runs on a worker thread when cost ranges are given
+                self.simulation_manager.simulate(inputs)
 
             # Update status
             self.status_bar.config(
                 text=f"Calculation completed: {current_time}")
 
+        except MissingFieldsError:
+            messagebox.showerror(
+                "Error", "Please fill in all required fields marked with *")
         except ValueError as e:
             messagebox.showerror("Error", f"Invalid input: {str(e)}")
 
+    def solve_payment(self):
+        """Fill in the customer payment that reaches the target margin or net."""
+        try:
+            kind, target = parse_target(self.target_entry.get())
+            inputs = self.read_inputs(check_required=False)
+        except ValueError as e:
+            messagebox.showerror("Error", f"Invalid input: {str(e)}")
+            return
+
+        flat, percent = inputs["discount"]
+        payment = float(solve_payment(
+            inputs["gear_cost"], inputs["travel_cost"], inputs["hotel_cost"],
+            inputs["payroll_cost"], inputs["other_cost"], inputs["tax_rate"],
+            flat, percent, to_cents=True, **{f"target_{kind}": target}))
+        if math.isnan(payment):
+            messagebox.showerror(
+                "Error", "No positive customer payment reaches that target.")
+            return
+        if payment == 0:
+            messagebox.showinfo(
+                "Info", "Any positive customer payment reaches that target.")
+            return
+
+        entry = self.entries[FIELDS_BY_NAME["Customer Payment ($)"].key]
+        entry.delete(0, tk.END)
+        entry.insert(0, f"{payment:.2f}")
+        entry.config(fg=self.theme_manager.get_theme_color("fg_entry"))
+
+        # Show the outcome without recording it in history
+        inputs["customer_payment"] = payment
+        gross, net, margin_percent = self.price_inputs(inputs)
+        self.show_results(gross, net, margin_percent)
+        self.update_charts(inputs, gross, net)
+        self.scenario_panel.form_changed()
+        target_text = f"{target:g}% margin" if kind == "margin" else f"${target:.2f} net"
+        self.status_bar.config(
+            text=f"Customer payment for {target_text}: ${payment:.2f}")
+
+    def on_entry_changed(self, event=None):
+        if self.live_var.get():
+            self.live_numbers.schedule()
+        self.scenario_panel.form_changed()
+
+    def toggle_live_mode(self):
+        if self.live_var.get():
+            self.live_numbers.schedule()
+            self.status_bar.config(text="Live update on")
+        else:
+            self.live_numbers.cancel()
+            self.live_charts.cancel()
+            self.status_bar.config(text="Live update off")
+
+    @perf_stats.timed_function("live.recalculate")
+    def live_recalculate(self):
+        """Refresh the results while typing; charts follow once typing stops.
+
+        Nothing is added to history until Calculate is pressed, and invalid
+        or incomplete input is ignored rather than reported.
+        """
+        try:
+            inputs = self.read_inputs()
+            gross, net, margin_percent = self.price_inputs(inputs)
+        except ValueError:
+            # Includes MissingFieldsError: incomplete input is normal here
+            return
+
+        self.show_results(gross, net, margin_percent)
+        self.live_charts.schedule(inputs, gross, net)
+
     def reset_fields(self):
+        self.live_numbers.cancel()
+        self.live_charts.cancel()
+
         # Clear all entries
-        for field in self.fields:
-            field_name = normalize_field_name(field["name"])
-            entry = self.entries[field_name]
+        for field in FIELDS:
+            entry = self.entries[field.key]
             entry.delete(0, tk.END)
 
             # Restore placeholder if applicable
-            if "placeholder" in field:
-                entry.insert(0, field["placeholder"])
+            if field.placeholder:
+                entry.insert(0, field.placeholder)
                 entry.config(fg="#999999")
 
         # Clear results
@@ -397,32 +599,19 @@ class ProfitCalculatorApp:
 
         # Clear charts
         self.chart_manager.clear_charts()
+        self.simulation_manager.reset()
+        self.scenario_panel.form_changed()
 
         # Update status
         self.status_bar.config(text="Form reset")
 
     def get_float_value(self, field_name, default=None):
         """Get float value from entry or return default if empty"""
-        normalized_field_name = normalize_field_name(field_name)
-        if normalized_field_name not in self.entries:
+        field = FIELDS_BY_NAME.get(field_name)
+        if field is None:
             raise ValueError(f"Field '{field_name}' not found")
 
-        value = self.entries[normalized_field_name].get().strip()
-        field_def = None
-        for field in self.fields:
-            key = normalize_field_name(field["name"])
-            if key == normalized_field_name:
-                field_def = field
-                break
-
-        if field_def and "placeholder" in field_def and value == field_def["placeholder"]:
+        value = self.entries[field.key].get().strip()
+        if not value or value == field.placeholder:
             return default
-
-        if not value:
-            return default
-
-        try:
-            return float(value)
-        except ValueError:
-            raise ValueError(
-                f"Invalid number in {field_name.replace('_', ' ').title()}")
+        return field.parser(value)
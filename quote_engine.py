@@ -0,0 +1,186 @@
+import re
+import numpy as np
+
+
+# Column layout for structured-array input to price_batch
+QUOTE_DTYPE = np.dtype([
+    ("gear", "f8"),
+    ("travel", "f8"),
+    ("hotel", "f8"),
+    ("payroll", "f8"),
+    ("other", "f8"),
+    ("payment", "f8"),
+    ("tax_rate", "f8"),  # Percent, as typed into the form
+    ("discount", "f8"),  # Flat discount in dollars
+    ("discount_pct", "f8"),  # Percent of the customer payment
+])
+
+
+# "10%", "$50", "50" or "50$"; a single pattern replaces per-call string surgery
+DISCOUNT_PATTERN = re.compile(
+    r"^\s*(?P<dollar>\$)?\s*(?P<value>[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)"
+    r"\s*(?P<unit>[%$])?\s*$")
+
+
+def parse_discount(text, placeholder=None):
+    """Parse the discount field into (flat amount, percent of payment)."""
+    text = text.strip()
+    if not text or text == placeholder:
+        return 0.0, 0.0
+
+    match = DISCOUNT_PATTERN.match(text)
+    if match is None or (match["dollar"] and match["unit"] == "%"):
+        raise ValueError(f"Invalid discount '{text}'")
+    value = float(match["value"])
+    if match["unit"] == "%":
+        return 0.0, value
+    return value, 0.0
+
+
+def parse_target(text):
+    """Parse a solver target into ("margin", percent) or ("net", dollars).
+
+    "30%" is a margin; "$500", "500$" and "500" are a net profit, as with
+    the discount field.
+    """
+    match = DISCOUNT_PATTERN.match(text)
+    if match is None or (match["dollar"] and match["unit"] == "%"):
+        raise ValueError(f"Invalid target '{text.strip()}'")
+    return ("margin" if match["unit"] == "%" else "net"), float(match["value"])
+
+
+def price_batch(gear, travel=0.0, hotel=0.0, payroll=0.0, other=0.0,
+                payment=0.0, tax_rate=0.0, discount=0.0, discount_pct=0.0):
+    """Price many quotes in one vectorized pass.
+
+    Accepts either a structured array with the fields of QUOTE_DTYPE as the
+    first argument, or one array (or scalar) per input. Returns a tuple of
+    float64 arrays (gross, net, margin).
+    """
+    if isinstance(gear, np.ndarray) and gear.dtype.names:
+        quotes = gear
+        names = quotes.dtype.names
+        gear, travel, hotel, payroll, other, payment = (
+            quotes[name] for name in
+            ("gear", "travel", "hotel", "payroll", "other", "payment"))
+        tax_rate = quotes["tax_rate"] if "tax_rate" in names else 0.0
+        discount = quotes["discount"] if "discount" in names else 0.0
+        discount_pct = (quotes["discount_pct"]
+                        if "discount_pct" in names else 0.0)
+
+    gear, travel, hotel, payroll, other, payment, tax_rate, discount, \
+        discount_pct = (np.asarray(value, dtype=np.float64) for value in (
+            gear, travel, hotel, payroll, other, payment, tax_rate, discount,
+            discount_pct))
+
+    # Calculate results
+    subtotal = gear + travel + hotel + payroll + other
+    tax = subtotal * (tax_rate / 100)
+    gross = subtotal + tax - discount - (discount_pct / 100) * payment
+    net = payment - gross
+
+    # Margin is only defined for a positive payment
+    margin = np.zeros(net.shape)
+    np.divide(net, payment, out=margin, where=payment > 0)
+    margin *= 100
+
+    return gross, net, margin
+
+
+def price_quote(gear, travel, hotel, payroll, other, payment, tax_rate=0.0,
+                discount="", placeholder=None):
+    """Price a single quote. Returns (gross, net, margin) as floats.
+
+    `discount` is either the discount text or an already parsed
+    (flat amount, percent) pair.
+    """
+    if isinstance(discount, str):
+        discount = parse_discount(discount, placeholder)
+    discount_amount, discount_pct = discount
+    gross, net, margin = price_batch(
+        gear, travel, hotel, payroll, other, payment,
+        tax_rate, discount_amount, discount_pct)
+    return float(gross), float(net), float(margin)
+
+
+def price_grid(gear, travel, hotel, payroll, other, payment, discount,
+               discount_pcts, tax_rates):
+    """Price one quote over every (tax rate, percent discount) pair.
+
+    The two axes are broadcast against each other in a single price_batch
+    pass. `discount` is a flat discount applied everywhere. Returns (net,
+    margin) arrays of shape (len(tax_rates), len(discount_pcts)).
+    """
+    _, net, margin = price_batch(
+        gear, travel, hotel, payroll, other, payment,
+        np.asarray(tax_rates, dtype=np.float64)[:, np.newaxis], discount,
+        np.asarray(discount_pcts, dtype=np.float64)[np.newaxis, :])
+    return net, margin
+
+
+def solve_payment(gear, travel=0.0, hotel=0.0, payroll=0.0, other=0.0,
+                  tax_rate=0.0, discount=0.0, discount_pct=0.0,
+                  target_margin=None, target_net=None, to_cents=False):
+    """Customer payment that gives a target margin (percent) or net profit.
+
+    Inverts price_batch in closed form, so any number of quotes are solved
+    in one vectorized pass. With k = discount_pct / 100 and the fixed
+    costs C = subtotal + tax - discount, net profit is P * (1 + k) - C,
+    which gives
+
+        P = (target_net + C) / (1 + k)
+        P = C / (1 + k - target_margin / 100)
+
+    With `to_cents`, payments are rounded to the cent in the direction
+    that still meets the target: up for a net target, or a margin target
+    with positive fixed costs, and down where the margin falls as the
+    payment grows (C < 0).
+
+    Where the discount covers the fixed costs (C <= 0 for a margin, or
+    C + target_net <= 0), every positive payment reaches the target and
+    0.0 is returned.
+
+    Accepts a structured array like price_batch (its payment field is
+    ignored). Returns a float64 array, NaN where no positive payment
+    reaches the target.
+    """
+    if isinstance(gear, np.ndarray) and gear.dtype.names:
+        quotes = gear
+        gear, travel, hotel, payroll, other, _, tax_rate, discount, \
+            discount_pct = (quotes[name] if name in quotes.dtype.names else 0.0
+                            for name in QUOTE_DTYPE.names)
+    if (target_margin is None) == (target_net is None):
+        raise ValueError("Give either a target margin or a target net profit")
+
+    gear, travel, hotel, payroll, other, tax_rate, discount, discount_pct = (
+        np.asarray(value, dtype=np.float64) for value in (
+            gear, travel, hotel, payroll, other, tax_rate, discount,
+            discount_pct))
+
+    # Same order of operations as price_batch
+    subtotal = gear + travel + hotel + payroll + other
+    fixed_costs = subtotal + subtotal * (tax_rate / 100) - discount
+    scale = 1 + discount_pct / 100
+    if target_net is not None:
+        numerator, denominator = np.broadcast_arrays(
+            np.asarray(target_net, dtype=np.float64) + fixed_costs, scale)
+        any_payment = (numerator <= 0) & (denominator > 0)
+    else:
+        target_margin = np.asarray(target_margin, dtype=np.float64)
+        numerator, denominator = np.broadcast_arrays(
+            fixed_costs, scale - target_margin / 100)
+        # Margin is (1 + k) - C / P, never below 1 + k when C <= 0
+        any_payment = (numerator <= 0) & (target_margin <= scale * 100)
+
+    payment = np.full(numerator.shape, np.nan)
+    np.divide(numerator, denominator, out=payment, where=denominator != 0)
+    if to_cents:
+        cents = payment * 100
+        round_down = np.broadcast_to(
+            target_net is None and fixed_costs < 0, payment.shape)
+        payment = np.where(round_down, np.floor(cents + 1e-6),
+                           np.ceil(cents - 1e-6))
+        payment /= 100
+    payment[~(payment > 0)] = np.nan
+    payment[np.broadcast_to(any_payment, payment.shape)] = 0.0
+    return payment
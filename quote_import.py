@@ -0,0 +1,156 @@
+import csv
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from field_schema import FIELDS, QUOTE_CSV_HEADERS
+
+IMPORT_CHUNK_SIZE = 5000
+
+# Numeric fields passed to price_batch, in its argument order
+PRICED_ATTRS = ["gear_cost", "travel_cost", "hotel_cost", "payroll_cost",
+                "other_cost", "customer_payment", "tax_rate"]
+
+
+def read_quote_rows(file_path):
+    """Yield one dict per row of a quotes CSV, streaming from disk."""
+    with open(file_path, newline="", encoding="utf-8-sig") as file:
+        yield from csv.DictReader(file)
+
+
+def chunked(rows, size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def price_chunk(rows, timestamp):
+    """Parse and price one chunk of raw quote rows.
+
+    Runs in a worker process. Returns (priced rows, history rows, number
+    of rows skipped because they could not be parsed).
+    """
+    import numpy as np
+    from quote_engine import price_batch
+
+    names = []
+    discounts = []
+    values = []
+    skipped = 0
+    for row in rows:
+        try:
+            record = {
+                field.attr: field.parse(row.get(field.csv_header) or "",
+                                        check_required=False)
+                for field in FIELDS
+            }
+        except ValueError:
+            skipped += 1
+            continue
+        names.append(record["customer_name"])
+        discounts.append(row.get("Discount") or "")
+        values.append([record[attr] for attr in PRICED_ATTRS] + list(record["discount"]))
+
+    if not values:
+        return [], [], skipped
+
+    columns = np.array(values, dtype=np.float64).T
+    gear, travel, hotel, payroll, other, payment, tax_rate, flat, percent = columns
+    gross, net, margin = price_batch(
+        gear, travel, hotel, payroll, other, payment, tax_rate, flat, percent)
+
+    priced = [
+        [name, *inputs[:7], discount, g, n, m]
+        for name, inputs, discount, g, n, m in zip(
+            names, values, discounts, gross.tolist(), net.tolist(), margin.tolist())
+    ]
+    history = [
+        (timestamp, name, p, g, n, m)
+        for name, p, g, n, m in zip(
+            names, payment.tolist(), gross.tolist(), net.tolist(), margin.tolist())
+    ]
+    return priced, history, skipped
+
+
+def price_chunks(pool, chunks, timestamp, window):
+    """Price chunks on the pool in order, keeping at most `window` in flight.
+
+    Unlike Executor.map this never reads further ahead than the window, so
+    the input is streamed rather than loaded into memory up front.
+    """
+    pending = deque()
+    for chunk in chunks:
+        pending.append(pool.submit(price_chunk, chunk, timestamp))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def import_quotes(input_path, output_path=None, store=None, workers=None,
+                  chunk_size=IMPORT_CHUNK_SIZE, progress=None):
+    """Price every quote in a CSV, writing results and history in bulk.
+
+    Chunks are priced across a process pool while the next ones are still
+    being read. Priced rows go to `output_path` (if given) and history
+    rows to `store` (if given) one chunk at a time. `progress(rows, None)`
+    is called after each chunk. Returns a dict with the imported history
+    rows and throughput figures.
+    """
+    start = time.perf_counter()
+    timestamp = int(time.time())
+    workers = workers or max(1, (os.cpu_count() or 2) - 1)
+    history = []
+    skipped = 0
+
+    output = open(output_path, "w", newline="", encoding="utf-8") if output_path else None
+    try:
+        writer = csv.writer(output) if output else None
+        if writer:
+            writer.writerow(QUOTE_CSV_HEADERS)
+
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            chunks = chunked(read_quote_rows(input_path), chunk_size)
+            for priced, items, chunk_skipped in price_chunks(
+                    pool, chunks, timestamp, window=workers * 2):
+                if writer:
+                    writer.writerows(priced)
+                if store is not None:
+                    store.add_many(items)
+                history.extend(items)
+                skipped += chunk_skipped
+                if progress:
+                    progress(len(history), None)
+    finally:
+        if output:
+            output.close()
+
+    seconds = time.perf_counter() - start
+    return {
+        "history": history,
+        "rows": len(history),
+        "skipped": skipped,
+        "seconds": seconds,
+        "rows_per_second": len(history) / seconds if seconds else 0.0,
+    }
+
+
+def import_quotes_task(report, cancel_event, input_path, db_path):
+    """BackgroundTask target: import quotes into the history database.
+
+    Uses its own database connection, since SQLite connections can't be
+    shared with the Tk thread.
+    """
+    from history_store import HistoryStore
+
+    store = HistoryStore(db_path)
+    try:
+        return import_quotes(input_path, store=store, progress=report)
+    finally:
+        store.close()
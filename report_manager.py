@@ -0,0 +1,154 @@
+import tkinter as tk
+from tkinter import ttk
+from datetime import date
+from history_indexes import PeriodRollups
+from utils import Debouncer
+
+# Bulk changes and typing in the date range refresh the table at most this often
+REFRESH_DELAY_MS = 300
+
+PERIOD_NAMES = {"Daily": "day", "Weekly": "week", "Monthly": "month",
+                "Quarterly": "quarter"}
+
+REPORT_COLUMNS = (
+    ("label", "Period", 120),
+    ("quotes", "Quotes", 70),
+    ("revenue", "Revenue", 120),
+    ("costs", "Costs", 120),
+    ("net", "Net", 120),
+    ("margin", "Margin %", 90),
+)
+
+
+def format_rollup(summary):
+    return (summary["label"], summary["quotes"], f"${summary['revenue']:.2f}",
+            f"${summary['costs']:.2f}", f"${summary['net']:.2f}",
+            f"{summary['margin']:.1f}%")
+
+
+def parse_day(text):
+    """A YYYY-MM-DD date, or None when blank or invalid."""
+    try:
+        return date.fromisoformat(text.strip())
+    except ValueError:
+        return None
+
+
+class ReportManager:
+    """Reports tab: revenue, costs, net and margin per day, week, month or quarter."""
+
+    def __init__(self, app):
+        self.app = app
+        self.rollups = PeriodRollups(app.history_manager.history)
+        # The Reports tab is built the first time it is selected
+        self.report_tree = None
+        self.summaries = []
+        self.refresh_later = Debouncer(app.root, REFRESH_DELAY_MS, self.refresh)
+
+    def setup_report_tab(self):
+        report_frame = tk.Frame(self.app.report_tab, padx=10, pady=10)
+        report_frame.pack(fill=tk.BOTH, expand=True)
+        self.app.theme_manager.register(report_frame, "panel")
+
+        report_title = tk.Label(
+            report_frame,
+            text="Reports",
+            font=("Helvetica", 14, "bold"),
+        )
+        report_title.pack(anchor="w", pady=(0, 10))
+        self.app.theme_manager.register(report_title, "label")
+
+        # Period and date range
+        controls = tk.Frame(report_frame)
+        controls.pack(fill=tk.X, pady=(0, 10))
+        self.app.theme_manager.register(controls, "panel")
+
+        period_label = tk.Label(controls, text="Period", font=("Helvetica", 10))
+        period_label.pack(side=tk.LEFT, padx=(0, 5))
+        self.app.theme_manager.register(period_label, "label")
+        self.period_var = tk.StringVar(value="Monthly")
+        period_box = ttk.Combobox(
+            controls, textvariable=self.period_var, values=list(PERIOD_NAMES),
+            state="readonly", width=10)
+        period_box.pack(side=tk.LEFT)
+        period_box.bind("<<ComboboxSelected>>", lambda event: self.refresh())
+
+        self.range_entries = {}
+        for key, text in (("first", "From"), ("last", "To")):
+            label = tk.Label(controls, text=text, font=("Helvetica", 10))
+            label.pack(side=tk.LEFT, padx=(15, 5))
+            self.app.theme_manager.register(label, "label")
+            entry = tk.Entry(controls, width=11, font=("Helvetica", 10),
+                             relief="solid", bd=1)
+            entry.pack(side=tk.LEFT)
+            entry.bind("<KeyRelease>", lambda event: self.refresh_later.schedule())
+            self.app.theme_manager.register(entry, "entry")
+            self.range_entries[key] = entry
+
+        range_hint = tk.Label(controls, text="(YYYY-MM-DD)", font=("Helvetica", 9))
+        range_hint.pack(side=tk.LEFT, padx=5)
+        self.app.theme_manager.register(range_hint, "label")
+
+        self.report_tree = ttk.Treeview(
+            report_frame,
+            columns=[key for key, _, _ in REPORT_COLUMNS],
+            show="headings",
+            style="Custom.Treeview",
+        )
+        for key, heading, width in REPORT_COLUMNS:
+            self.report_tree.heading(key, text=heading)
+            self.report_tree.column(key, width=width)
+        self.report_tree.bind("<Double-Button-1>", self.on_period_opened)
+
+        # Totals of the periods shown, below the table
+        self.totals_label = tk.Label(
+            report_frame, font=("Helvetica", 10, "bold"), anchor="w")
+        self.totals_label.pack(side=tk.BOTTOM, fill=tk.X, pady=(10, 0))
+        self.app.theme_manager.register(self.totals_label, "label")
+
+        report_scroll = ttk.Scrollbar(
+            report_frame,
+            orient="vertical",
+            command=self.report_tree.yview
+        )
+        self.report_tree.configure(yscrollcommand=report_scroll.set)
+
+        self.report_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        report_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.refresh()
+
+    def history_changed(self):
+        """Called by HistoryManager after records are added or cleared."""
+        if self.report_tree is not None:
+            self.refresh_later.schedule()
+
+    def refresh(self):
+        if self.report_tree is None:
+            return
+        self.summaries = self.rollups.rollup(
+            PERIOD_NAMES[self.period_var.get()],
+            parse_day(self.range_entries["first"].get()),
+            parse_day(self.range_entries["last"].get()),
+        )
+        self.report_tree.delete(*self.report_tree.get_children())
+        for index, summary in enumerate(self.summaries):
+            self.report_tree.insert(
+                "", "end", iid=str(index), values=format_rollup(summary))
+
+        quotes = sum(summary["quotes"] for summary in self.summaries)
+        revenue = sum(summary["revenue"] for summary in self.summaries)
+        costs = sum(summary["costs"] for summary in self.summaries)
+        net = sum(summary["net"] for summary in self.summaries)
+        margin = net / revenue * 100 if revenue > 0 else 0
+        self.totals_label.config(
+            text=f"Total: {quotes} quotes, revenue ${revenue:.2f}, "
+                 f"costs ${costs:.2f}, net ${net:.2f}, margin {margin:.1f}%")
+
+    def on_period_opened(self, event=None):
+        selection = self.report_tree.selection()
+        if not selection:
+            return
+        summary = self.summaries[int(selection[0])]
+        self.app.history_manager.show_period(
+            summary["start"], summary["end"], summary["label"])
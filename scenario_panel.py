@@ -0,0 +1,187 @@
+import tkinter as tk
+import numpy as np
+import perf_stats
+from field_schema import MissingFieldsError
+from quote_engine import price_grid
+from utils import Debouncer
+
+# Grid points along each axis
+GRID_SIZE = 200
+
+# Slider ranges (percent) and where they start
+MAX_DISCOUNT_RANGE = (1, 100)
+MAX_TAX_RANGE = (1, 100)
+DEFAULT_MAX_DISCOUNT = 30
+DEFAULT_MAX_TAX = 25
+
+# Form edits reach the open panel once typing pauses this long
+FORM_DELAY_MS = 150
+
+METRICS = {"margin": "Margin %", "net": "Net Profit ($)"}
+
+
+class ScenarioPanel:
+    """What-if window: net or margin over a grid of discounts and tax rates.
+
+    The current form is the base quote. Discounts on the grid are a percent
+    of the customer payment, on top of any flat discount in the form. The
+    whole grid is priced in one NumPy pass (a fraction of a millisecond for
+    200x200), so the heatmap follows the sliders as they are dragged.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.window = None
+        self.base = None
+        self.form_later = Debouncer(app.root, FORM_DELAY_MS, self.read_form)
+
+    def show(self):
+        if self.window is not None:
+            self.read_form()
+            self.window.deiconify()
+            self.window.lift()
+            return
+
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+        self.window = tk.Toplevel(self.app.root)
+        self.window.title("What-If")
+        self.window.geometry("720x640")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        frame = tk.Frame(self.window, padx=10, pady=10)
+        frame.pack(fill=tk.BOTH, expand=True)
+        self.app.theme_manager.register(frame, "panel")
+
+        self.base_label = tk.Label(frame, font=("Helvetica", 10), anchor="w",
+                                   justify=tk.LEFT)
+        self.base_label.pack(fill=tk.X)
+        self.app.theme_manager.register(self.base_label, "label")
+
+        controls = tk.Frame(frame)
+        controls.pack(fill=tk.X, pady=5)
+        self.app.theme_manager.register(controls, "panel")
+
+        self.max_discount_var = tk.DoubleVar(value=DEFAULT_MAX_DISCOUNT)
+        self.max_tax_var = tk.DoubleVar(value=DEFAULT_MAX_TAX)
+        for text, variable, (low, high) in (
+                ("Max discount (%)", self.max_discount_var, MAX_DISCOUNT_RANGE),
+                ("Max tax rate (%)", self.max_tax_var, MAX_TAX_RANGE)):
+            scale = tk.Scale(
+                controls, label=text, variable=variable, from_=low, to=high,
+                orient=tk.HORIZONTAL, length=200, highlightthickness=0,
+                command=lambda value: self.update())
+            scale.pack(side=tk.LEFT, padx=(0, 15))
+            self.app.theme_manager.register(scale, "label")
+
+        self.metric_var = tk.StringVar(value="margin")
+        for metric, text in METRICS.items():
+            button = tk.Radiobutton(
+                controls, text=text, value=metric, variable=self.metric_var,
+                command=self.update, font=("Helvetica", 10))
+            button.pack(side=tk.LEFT, padx=5)
+            self.app.theme_manager.register(button, "checkbutton")
+
+        self.build_figure()
+        self.canvas = FigureCanvasTkAgg(self.figure, master=frame)
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, pady=(5, 0))
+
+        self.read_form()
+
+    def build_figure(self):
+        from matplotlib.colors import TwoSlopeNorm
+        from matplotlib.figure import Figure
+
+        # Colors are chosen once for the theme the panel was opened in
+        if self.app.dark_mode:
+            background, text_color = "#121212", "white"
+        else:
+            background, text_color = "#ffffff", "black"
+        self.figure = Figure(figsize=(6, 4.5), facecolor=background)
+        self.axes = self.figure.add_subplot()
+        self.axes.set_facecolor(background)
+        self.axes.set_xlabel("Discount (% of payment)", color=text_color)
+        self.axes.set_ylabel("Tax rate (%)", color=text_color)
+        self.axes.tick_params(colors=text_color)
+        # Red for a loss, green for a profit, white at break-even
+        self.image = self.axes.imshow(
+            np.zeros((GRID_SIZE, GRID_SIZE)), origin="lower", aspect="auto",
+            cmap="RdYlGn", norm=TwoSlopeNorm(vcenter=0, vmin=-1, vmax=1),
+            interpolation="nearest")
+        self.colorbar = self.figure.colorbar(self.image, ax=self.axes)
+        self.colorbar.ax.tick_params(colors=text_color)
+        self.colorbar_label = self.colorbar.ax.set_ylabel("", color=text_color)
+        self.current_point, = self.axes.plot(
+            [], [], marker="o", markersize=7, markerfacecolor="none",
+            markeredgecolor=text_color)
+        self.contour = None
+
+    def form_changed(self):
+        """Called when a form entry changes; the open panel follows the form."""
+        if self.window is not None:
+            self.form_later.schedule()
+
+    def read_form(self):
+        try:
+            record = self.app.read_inputs(check_required=False)
+        except (MissingFieldsError, ValueError) as e:
+            self.base_label.config(text=f"Form: {e}")
+            return
+        self.base = record
+        flat, percent = record["discount"]
+        text = (f"Base: payment ${record['customer_payment']:.2f}, tax rate "
+                f"{record['tax_rate']:g}%, discount {percent:g}%")
+        if flat:
+            text += f" plus ${flat:.2f} flat (kept across the grid)"
+        self.base_label.config(text=text)
+        self.update()
+
+    def grid(self):
+        """Axes and (net, margin) values of the grid for the current base."""
+        discounts = np.linspace(0, self.max_discount_var.get(), GRID_SIZE)
+        tax_rates = np.linspace(0, self.max_tax_var.get(), GRID_SIZE)
+        base = self.base
+        net, margin = price_grid(
+            base["gear_cost"], base["travel_cost"], base["hotel_cost"],
+            base["payroll_cost"], base["other_cost"], base["customer_payment"],
+            base["discount"][0], discounts, tax_rates)
+        return discounts, tax_rates, net, margin
+
+    def update(self):
+        if self.window is None or self.base is None:
+            return
+        with perf_stats.timed("whatif.grid"):
+            discounts, tax_rates, net, margin = self.grid()
+        values = margin if self.metric_var.get() == "margin" else net
+
+        extent = (0, discounts[-1], 0, tax_rates[-1])
+        self.image.set_data(values)
+        self.image.set_extent(extent)
+        # Keep break-even at the middle of the color scale
+        limit = max(float(np.abs(values).max()), 1e-9)
+        self.image.norm.vmin = -limit
+        self.image.norm.vmax = limit
+        self.colorbar_label.set_text(METRICS[self.metric_var.get()])
+
+        # Break-even line; net and margin are zero in the same places
+        if self.contour is not None:
+            self.contour.remove()
+            self.contour = None
+        if net.min() < 0 < net.max():
+            self.contour = self.axes.contour(
+                discounts, tax_rates, net, levels=[0], colors="black",
+                linewidths=1.5)
+
+        self.current_point.set_data(
+            [self.base["discount"][1]], [self.base["tax_rate"]])
+        self.axes.set_xlim(extent[0], extent[1])
+        self.axes.set_ylim(extent[2], extent[3])
+        self.canvas.draw_idle()
+
+    def close(self):
+        self.form_later.cancel()
+        self.canvas.get_tk_widget().destroy()
+        self.figure.clear()
+        self.window.destroy()
+        self.window = None
+        self.contour = None
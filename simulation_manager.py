@@ -0,0 +1,196 @@
+import tkinter as tk
+from collections import OrderedDict
+from background_tasks import BackgroundTask
+from field_schema import FIELDS
+from monte_carlo import UNCERTAIN_FIELDS, simulate_task, simulation_key
+
+# Results kept for inputs simulated before
+CACHE_SIZE = 32
+
+HISTOGRAM_WIDTH = 300
+HISTOGRAM_HEIGHT = 70
+LOSS_COLOR = "#E57373"
+PROFIT_COLOR = "#81C784"
+
+NO_RANGES_TEXT = "Enter a min and max to simulate the quote on Calculate."
+
+FIELD_LABELS = {field.attr: field.name.replace(" ($)", "")
+                for field in FIELDS if field.attr in UNCERTAIN_FIELDS}
+
+
+def parse_range(low_text, high_text, most_likely, name):
+    """(min, max) from the range entries, or None when both are blank.
+
+    A blank end defaults to the most likely cost from the form.
+    """
+    low_text, high_text = low_text.strip(), high_text.strip()
+    if not low_text and not high_text:
+        return None
+    try:
+        low = float(low_text) if low_text else most_likely
+        high = float(high_text) if high_text else most_likely
+    except ValueError:
+        raise ValueError(f"Invalid number in the {name} range") from None
+    if not low <= most_likely <= high:
+        raise ValueError(
+            f"The {name} range must include the form value (${most_likely:.2f})")
+    return low, high
+
+
+class SimulationManager:
+    """Cost-uncertainty simulation shown under the results.
+
+    Travel, hotel and payroll can be given a min/max around the form
+    value. On Calculate, quotes with a range are simulated on a worker
+    thread and the margin distribution, P(loss) and P5/P50/P95 net profit
+    are shown. Results are cached by their inputs.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.cache = OrderedDict()
+        self.task = None
+        self.task_key = None
+        self.range_entries = {}
+
+    def setup_simulation_frame(self, parent):
+        frame = tk.Frame(parent, relief="ridge", bd=1, padx=15, pady=10)
+        frame.pack(fill=tk.X, pady=(15, 0))
+        self.app.theme_manager.register(frame, "result_frame")
+
+        title = tk.Label(frame, text="Cost uncertainty (optional)",
+                         font=("Helvetica", 11, "bold"))
+        title.grid(row=0, column=0, columnspan=4, sticky="w")
+        self.app.theme_manager.register(title, "result")
+
+        for column, text in ((1, "Min ($)"), (2, "Max ($)")):
+            heading = tk.Label(frame, text=text, font=("Helvetica", 9))
+            heading.grid(row=1, column=column, sticky="w")
+            self.app.theme_manager.register(heading, "result")
+
+        for row, attr in enumerate(UNCERTAIN_FIELDS, 2):
+            label = tk.Label(frame, text=FIELD_LABELS[attr], font=("Helvetica", 10))
+            label.grid(row=row, column=0, sticky="w", padx=(0, 10))
+            self.app.theme_manager.register(label, "result")
+            entries = []
+            for column in (1, 2):
+                entry = tk.Entry(frame, width=10, font=("Helvetica", 10),
+                                 relief="solid", bd=1)
+                entry.grid(row=row, column=column, sticky="w", padx=(0, 5), pady=2)
+                self.app.theme_manager.register(entry, "entry")
+                entries.append(entry)
+            self.range_entries[attr] = entries
+
+        self.summary_label = tk.Label(
+            frame, font=("Helvetica", 10), anchor="w", justify=tk.LEFT,
+            text=NO_RANGES_TEXT)
+        self.summary_label.grid(row=5, column=0, columnspan=4, sticky="w", pady=(8, 0))
+        self.app.theme_manager.register(self.summary_label, "result")
+
+        # Margin distribution; loss in red, profit in green
+        self.histogram = tk.Canvas(frame, width=HISTOGRAM_WIDTH,
+                                   height=HISTOGRAM_HEIGHT, highlightthickness=0)
+        self.histogram.grid(row=6, column=0, columnspan=4, sticky="w", pady=(5, 0))
+        self.app.theme_manager.register(self.histogram, "panel")
+
+    def read_ranges(self, record):
+        ranges = {}
+        for attr, (low_entry, high_entry) in self.range_entries.items():
+            value_range = parse_range(low_entry.get(), high_entry.get(),
+                                      record[attr], FIELD_LABELS[attr])
+            if value_range is not None:
+                ranges[attr] = value_range
+        return ranges
+
+    def simulate(self, record):
+        """Simulate `record` if any range is set. Called after Calculate."""
+        if self.task is not None:
+            # Superseded by these inputs
+            self.task.cancel()
+            self.task = None
+        try:
+            ranges = self.read_ranges(record)
+        except ValueError as e:
+            self.clear(str(e))
+            return
+        if not ranges:
+            self.clear()
+            return
+
+        key = simulation_key(record, ranges)
+        self.task_key = key
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.show(self.cache[key])
+            return
+
+        self.task = BackgroundTask(
+            self.app.root,
+            simulate_task,
+            args=(record, ranges),
+            on_progress=lambda done, total: self.on_progress(key, done, total),
+            on_done=lambda result: self.on_done(key, result),
+            on_error=lambda error: self.on_error(key, error),
+        ).start()
+        self.summary_label.config(text="Simulating...")
+
+    def on_progress(self, key, done, total):
+        if key == self.task_key:
+            self.summary_label.config(text=f"Simulating... {done * 100 // total}%")
+
+    def on_done(self, key, result):
+        self.cache[key] = result
+        while len(self.cache) > CACHE_SIZE:
+            self.cache.popitem(last=False)
+        if key == self.task_key:
+            self.task = None
+            self.show(result)
+
+    def on_error(self, key, error):
+        if key == self.task_key:
+            self.task = None
+            self.summary_label.config(text=f"Simulation failed: {str(error)}")
+
+    def show(self, result):
+        self.summary_label.config(
+            text=f"P(loss): {result['p_loss'] * 100:.1f}%    "
+                 f"Mean margin: {result['margin_mean']:.1f}%\n"
+                 f"Net profit P5 ${result['net_p5']:.2f}   "
+                 f"P50 ${result['net_p50']:.2f}   P95 ${result['net_p95']:.2f}\n"
+                 f"({result['draws']:,} draws)")
+        self.draw_histogram(result["margin_counts"], result["margin_edges"])
+
+    def draw_histogram(self, counts, edges):
+        self.histogram.delete("all")
+        tallest = max(counts) or 1
+        width = HISTOGRAM_WIDTH / len(counts)
+        for index, count in enumerate(counts):
+            height = count / tallest * (HISTOGRAM_HEIGHT - 14)
+            x = index * width
+            # A bin is red when it lies below zero margin
+            color = LOSS_COLOR if edges[index + 1] <= 0 else PROFIT_COLOR
+            self.histogram.create_rectangle(
+                x, HISTOGRAM_HEIGHT - 12 - height, x + width - 1,
+                HISTOGRAM_HEIGHT - 12, fill=color, outline="")
+        text_color = self.app.theme_manager.get_theme_color("fg_result")
+        self.histogram.create_text(
+            0, HISTOGRAM_HEIGHT, anchor="sw", text=f"{edges[0]:.1f}%",
+            font=("Helvetica", 8), fill=text_color)
+        self.histogram.create_text(
+            HISTOGRAM_WIDTH, HISTOGRAM_HEIGHT, anchor="se",
+            text=f"{edges[-1]:.1f}%", font=("Helvetica", 8), fill=text_color)
+
+    def clear(self, message=NO_RANGES_TEXT):
+        self.task_key = None
+        self.summary_label.config(text=message)
+        self.histogram.delete("all")
+
+    def reset(self):
+        """Empty the ranges along with the form."""
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+        for entries in self.range_entries.values():
+            for entry in entries:
+                entry.delete(0, tk.END)
+        self.clear()
@@ -0,0 +1,92 @@
+"""Solve the customer payment for every quote in a CSV.
+
+The input uses the same columns that the Save button writes; the
+Customer Payment column may be empty. The output repeats each row with
+a Required Payment column, left empty where the target can't be met and
+0.00 where any positive payment meets it.
+
+    python solve_quotes.py quotes.csv --target 30% --output solved.csv
+"""
+import argparse
+import csv
+import sys
+import time
+import numpy as np
+from field_schema import FIELDS
+from quote_engine import parse_target, solve_payment
+from quote_import import IMPORT_CHUNK_SIZE, chunked, read_quote_rows
+
+# Form fields that feed the solver, in solve_payment's argument order
+SOLVER_ATTRS = ["gear_cost", "travel_cost", "hotel_cost", "payroll_cost",
+                "other_cost", "tax_rate"]
+
+
+def solve_chunk(rows, kind, target):
+    """Required payments for a chunk of raw quote rows, None where unsolved."""
+    values = []
+    parsed = []
+    for row in rows:
+        try:
+            record = {
+                field.attr: field.parse(row.get(field.csv_header) or "",
+                                        check_required=False)
+                for field in FIELDS
+            }
+        except ValueError:
+            parsed.append(False)
+            continue
+        parsed.append(True)
+        values.append([record[attr] for attr in SOLVER_ATTRS] + list(record["discount"]))
+
+    payments = []
+    if values:
+        columns = np.array(values, dtype=np.float64).T
+        payments = solve_payment(
+            *columns, to_cents=True, **{f"target_{kind}": target}).tolist()
+
+    # NaN (no payment reaches the target) becomes None, like a bad row
+    payments = iter(payments)
+    return [payment if payment == payment else None
+            for payment in (next(payments) if ok else None for ok in parsed)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="CSV file of quotes")
+    parser.add_argument("--target", required=True,
+                        help='target margin ("30%%") or net profit ("$500")')
+    parser.add_argument("--output", required=True, help="CSV file to write")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    try:
+        kind, target = parse_target(args.target)
+    except ValueError as e:
+        parser.error(str(e))
+
+    start = time.perf_counter()
+    solved = unsolved = 0
+    with open(args.output, "w", newline="", encoding="utf-8") as output:
+        writer = None
+        for rows in chunked(read_quote_rows(args.input), args.chunk_size):
+            if writer is None:
+                writer = csv.DictWriter(
+                    output, fieldnames=list(rows[0]) + ["Required Payment"])
+                writer.writeheader()
+            for row, payment in zip(rows, solve_chunk(rows, kind, target)):
+                if payment is None:
+                    unsolved += 1
+                    row["Required Payment"] = ""
+                else:
+                    solved += 1
+                    row["Required Payment"] = f"{payment:.2f}"
+            writer.writerows(rows)
+
+    print(f"Solved {solved} quotes in {time.perf_counter() - start:.2f} s")
+    if unsolved:
+        print(f"{unsolved} quotes could not be parsed or can't reach the target")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
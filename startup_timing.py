@@ -0,0 +1,83 @@
+"""Startup timing report.
+
+Set PROFIT_CALC_STARTUP_TIMING=1 to print time-to-first-frame, the cost of
+each top-level import and of the timed startup phases to stderr. When the
+variable is not set nothing is patched and every call here is a no-op.
+"""
+import builtins
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+ENV_VAR = "PROFIT_CALC_STARTUP_TIMING"
+
+START = time.perf_counter()
+enabled = os.environ.get(ENV_VAR, "") not in ("", "0")
+import_times = []  # (module name, seconds), outermost imports only
+phase_times = []  # (phase name, seconds)
+
+_original_import = builtins.__import__
+_depth = 0
+_reported = False
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    global _depth
+    if level or name in sys.modules:
+        return _original_import(name, globals, locals, fromlist, level)
+
+    _depth += 1
+    start = time.perf_counter()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        _depth -= 1
+        if _depth == 0:
+            import_times.append((name, time.perf_counter() - start))
+
+
+def start():
+    """Begin timing imports, if enabled."""
+    if enabled:
+        builtins.__import__ = _timed_import
+
+
+@contextmanager
+def phase(name):
+    """Time a named phase, such as building a tab or a lazy import."""
+    if not enabled:
+        yield
+        return
+    begin = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - begin
+        phase_times.append((name, seconds))
+        if _reported:
+            # Lazy work done after the first frame is reported as it happens
+            print(f"  {name:<30} {seconds * 1000:8.1f} ms", file=sys.stderr)
+
+
+def report_first_frame(root):
+    """Print the report once the first frame of `root` has been drawn."""
+    if not enabled:
+        return
+    # after(0) runs once mainloop is up; after_idle then waits for the redraw
+    root.after(0, lambda: root.after_idle(_print_report))
+
+
+def _print_report():
+    global _reported
+    builtins.__import__ = _original_import
+    _reported = True
+    total = time.perf_counter() - START
+
+    lines = [f"Time to first frame: {total * 1000:.0f} ms", "Imports:"]
+    for name, seconds in sorted(import_times, key=lambda t: t[1], reverse=True):
+        lines.append(f"  {name:<30} {seconds * 1000:8.1f} ms")
+    lines.append("Phases:")
+    for name, seconds in phase_times:
+        lines.append(f"  {name:<30} {seconds * 1000:8.1f} ms")
+    print("\n".join(lines), file=sys.stderr)
@@ -1,5 +1,13 @@
-import tkinter as tk
-import matplotlib.pyplot as plt
+from tkinter import ttk
+
+PLACEHOLDER_COLOR = "#999999"
+
+# Roles a widget can be registered with
+ROLES = (
+    "root", "container", "header", "title", "panel", "label", "result",
+    "result_frame", "entry", "button_primary", "button_secondary",
+    "button_tertiary", "checkbutton", "toggle", "status", "listbox",
+)
 
 
 class ThemeManager:
@@ -25,6 +33,10 @@ class ThemeManager:
                 "insert": "#333333",
                 "toggle_bg": "#cccccc",
                 "toggle_active": "#4CAF50",
+                "bg_tree": "white",
+                "fg_tree": "black",
+                "bg_tree_selected": "#f0f0f0",
+                "fg_tree_selected": "black",
             },
             "dark": {
                 "bg_main": "#121212",
@@ -44,123 +56,108 @@ class ThemeManager:
                 "insert": "#ffffff",
                 "toggle_bg": "#555555",
                 "toggle_active": "#ffffff",
+                "bg_tree": "#121212",
+                "fg_tree": "white",
+                "bg_tree_selected": "#333333",
+                "fg_tree_selected": "white",
             },
         }
 
+        # Widgets registered per role, see register()
+        self.registry = {role: {} for role in ROLES}
+        self.role_options = {
+            name: self.build_role_options(colors)
+            for name, colors in self.themes.items()
+        }
+
+    @staticmethod
+    def build_role_options(colors):
+        """Precompute the config options each role gets in a theme."""
+        def button(bg):
+            return {"bg": bg, "fg": colors["fg_button"],
+                    "activebackground": bg,
+                    "activeforeground": colors["fg_button"]}
+
+        return {
+            "root": {"bg": colors["bg_main"]},
+            "container": {"bg": colors["bg_main"]},
+            "header": {"bg": colors["bg_header"]},
+            "title": {"bg": colors["bg_header"], "fg": colors["title_color"]},
+            "panel": {"bg": colors["bg_form"]},
+            "label": {"bg": colors["bg_form"], "fg": colors["fg_label"]},
+            "result": {"bg": colors["bg_form"], "fg": colors["fg_result"]},
+            "result_frame": {"bg": colors["bg_form"],
+                             "highlightbackground": colors["border"]},
+            # The text color of entries is set separately to keep placeholders grey
+            "entry": {"bg": colors["bg_entry"],
+                      "insertbackground": colors["insert"],
+                      "highlightbackground": colors["border"],
+                      "highlightcolor": colors["border"]},
+            "button_primary": button(colors["bg_button_primary"]),
+            "button_secondary": button(colors["bg_button_secondary"]),
+            "button_tertiary": button(colors["bg_button_tertiary"]),
+            "checkbutton": {"bg": colors["bg_form"], "fg": colors["fg_label"],
+                            "selectcolor": colors["bg_entry"],
+                            "activebackground": colors["bg_form"],
+                            "activeforeground": colors["fg_label"]},
+            "toggle": {"bg": colors["toggle_bg"],
+                       "activebackground": colors["toggle_active"]},
+            "status": {"bg": colors["bg_main"], "fg": colors["fg_label"]},
+            "listbox": {"bg": colors["bg_entry"], "fg": colors["fg_entry"],
+                        "selectbackground": colors["bg_button_tertiary"],
+                        "selectforeground": colors["fg_button"],
+                        "highlightbackground": colors["border"]},
+            "treeview": {"background": colors["bg_tree"],
+                         "foreground": colors["fg_tree"],
+                         "fieldbackground": colors["bg_tree"]},
+            "treeview_selected": {"background": [("selected", colors["bg_tree_selected"])],
+                                  "foreground": [("selected", colors["fg_tree_selected"])]},
+        }
+
+    def register(self, widget, role):
+        """Theme `widget` as `role` now and on every future theme switch."""
+        self.registry[role][widget] = None
+        if widget.winfo_toplevel() is not widget:
+            # Bindings on a toplevel also see its children being destroyed
+            widget.bind("<Destroy>",
+                        lambda event: self.unregister(widget), add="+")
+        self.apply(widget, role, self.current_options())
+        return widget
+
+    def unregister(self, widget):
+        for widgets in self.registry.values():
+            widgets.pop(widget, None)
+
+    def current_options(self):
+        return self.role_options["dark" if self.dark_mode else "light"]
+
+    def apply(self, widget, role, options):
+        widget.config(**options[role])
+        if role == "entry":
+            # Placeholder text stays grey
+            if widget.cget("fg") != PLACEHOLDER_COLOR:
+                widget.config(fg=self.get_theme_color("fg_entry"))
+
     def get_theme_color(self, key):
         theme = "dark" if self.dark_mode else "light"
         return self.themes[theme][key]
 
     def update_theme(self):
-        theme = "dark" if self.dark_mode else "light"
-        colors = self.themes[theme]
-
-        # Update root
-        self.app.root.config(bg=colors["bg_main"])
-
-        # Update header
-        self.app.header_frame.config(bg=colors["bg_header"])
-        self.app.header_label.config(
-            bg=colors["bg_header"], fg=colors["title_color"])
-
-        # Update toggle button
-        self.update_toggle_button()
-
-        # Update form container
-        self.app.form_container.config(bg=colors["bg_main"])
-        self.app.form_frame.config(bg=colors["bg_form"])
-
-        # Update form elements
-        for widget in self.app.form_frame.winfo_children():
-            if isinstance(widget, tk.Label):
-                widget.config(bg=colors["bg_form"], fg=colors["fg_label"])
-            elif isinstance(widget, tk.Frame):
-                widget.config(bg=colors["bg_form"])
-                for child in widget.winfo_children():
-                    if isinstance(child, tk.Label):
-                        child.config(bg=colors["bg_form"],
-                                     fg=colors["fg_label"])
-                    elif isinstance(child, tk.Entry):
-                        child.config(
-                            bg=colors["bg_entry"],
-                            fg=(colors["fg_entry"] if child.cget(
-                                "fg") != "#999999" else "#999999"),
-                            insertbackground=colors["insert"],
-                            highlightbackground=colors["border"],
-                            highlightcolor=colors["border"],
-                        )
-
-        # Update buttons
-        self.app.calculate_button.config(
-            bg=colors["bg_button_primary"],
-            fg=colors["fg_button"],
-            activebackground=colors["bg_button_primary"],
-            activeforeground=colors["fg_button"],
-        )
-        self.app.reset_button.config(
-            bg=colors["bg_button_secondary"],
-            fg=colors["fg_button"],
-            activebackground=colors["bg_button_secondary"],
-            activeforeground=colors["fg_button"],
-        )
-        self.app.save_button.config(
-            bg=colors["bg_button_tertiary"],
-            fg=colors["fg_button"],
-            activebackground=colors["bg_button_tertiary"],
-            activeforeground=colors["fg_button"],
-        )
-
-        # Update results container
-        self.app.results_container.config(bg=colors["bg_main"])
-        self.app.results_frame.config(bg=colors["bg_form"])
-
-        # Update result widgets
-        for widget in self.app.results_frame.winfo_children():
-            if isinstance(widget, tk.Label):
-                widget.config(bg=colors["bg_form"], fg=colors["fg_label"])
-            elif isinstance(widget, tk.Frame):
-                widget.config(bg=colors["bg_form"])
-                for child in widget.winfo_children():
-                    if isinstance(child, tk.Label):
-                        child.config(bg=colors["bg_form"],
-                                     fg=colors["fg_result"])
-
-        # Update result frame
-        self.app.result_frame.config(
-            bg=colors["bg_form"], highlightbackground=colors["border"])
-
-        # Update status bar
-        self.app.status_bar.config(bg=colors["bg_main"], fg=colors["fg_label"])
-
-        # Update history tab
-        if hasattr(self.app, "history_tab"):
-            for widget in self.app.history_tab.winfo_children():
-                if isinstance(widget, tk.Frame):
-                    widget.config(bg=colors["bg_form"])
-                    for child in widget.winfo_children():
-                        if isinstance(child, tk.Label):
-                            child.config(
-                                bg=colors["bg_form"], fg=colors["fg_label"])
-                        elif isinstance(child, tk.Frame):
-                            child.config(bg=colors["bg_form"])
-                            for btn in child.winfo_children():
-                                if isinstance(btn, tk.Button):
-                                    btn.config(
-                                        bg=colors["bg_button_tertiary"],
-                                        fg=colors["fg_button"],
-                                        activebackground=colors["bg_button_tertiary"],
-                                        activeforeground=colors["fg_button"],
-                                    )
-
-        # Update matplotlib style for charts
-        plt.style.use("default" if theme == "light" else "dark_background")
+        """Apply the current theme to every registered widget in one pass."""
+        options = self.current_options()
+        for role, widgets in self.registry.items():
+            for widget in widgets:
+                self.apply(widget, role, options)
+
+        # ttk widgets share one style, configured once per switch
+        style = ttk.Style()
+        style.configure("Custom.Treeview", **options["treeview"])
+        style.map("Custom.Treeview", **options["treeview_selected"])
+
+        # Rebuild charts for the new theme
+        self.app.chart_manager.rebuild_charts()
 
     def toggle_mode(self):
         self.dark_mode = not self.dark_mode
+        self.app.dark_mode = self.dark_mode
         self.update_theme()
-
-    def update_toggle_button(self):
-        toggle_color = self.get_theme_color("toggle_bg")
-        active_color = self.get_theme_color("toggle_active")
-        self.app.toggle_button.config(
-            bg=toggle_color, activebackground=active_color)
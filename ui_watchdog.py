@@ -0,0 +1,147 @@
+"""Opt-in detector for UI-thread stalls.
+
+Set PROFIT_CALC_WATCHDOG=1 to log every stall of the Tk event loop, or
+PROFIT_CALC_WATCHDOG=profile to also log a cProfile summary of each slow
+button callback. Stalls are written to stderr, or appended to the file
+named by PROFIT_CALC_WATCHDOG_LOG.
+
+Two things are measured:
+
+- A heartbeat scheduled with after() every HEARTBEAT_MS records how late
+  it runs. This catches stalls from any source, including idle callbacks.
+- Button commands wrapped with watch() are timed by name, so a stall can
+  be pinned on the callback that caused it. Time spent in a modal dialog
+  opened by the callback does not count: the dialog runs the event loop,
+  so only the longest stretch without a heartbeat is reported.
+
+Anything longer than PROFIT_CALC_WATCHDOG_MS (default 200 ms) is logged.
+Heartbeat lag also goes into perf_stats as "ui.lag" when that is
+recording.
+"""
+import cProfile
+import functools
+import io
+import logging
+import os
+import pstats
+import time
+from collections import deque
+import perf_stats
+
+ENV_VAR = "PROFIT_CALC_WATCHDOG"
+THRESHOLD_ENV_VAR = "PROFIT_CALC_WATCHDOG_MS"
+LOG_ENV_VAR = "PROFIT_CALC_WATCHDOG_LOG"
+
+HEARTBEAT_MS = 100
+DEFAULT_THRESHOLD_MS = 200
+
+# Functions shown in a slow callback's profile summary
+PROFILE_LINES = 15
+
+enabled = False
+profile = False
+threshold = DEFAULT_THRESHOLD_MS / 1000
+stalls = deque(maxlen=100)  # Recent (time, name, seconds)
+_running = []  # Watched callbacks currently on the stack
+
+logger = logging.getLogger("profit_calculator.watchdog")
+
+
+def start(root):
+    """Read the settings and start the heartbeat, if enabled.
+
+    Called after the .env file is loaded, so settings can live there.
+    """
+    global enabled, profile, threshold
+    mode = os.environ.get(ENV_VAR, "")
+    enabled = mode not in ("", "0")
+    if not enabled:
+        return
+    profile = mode == "profile"
+    threshold = float(os.environ.get(THRESHOLD_ENV_VAR, DEFAULT_THRESHOLD_MS)) / 1000
+
+    log_path = os.environ.get(LOG_ENV_VAR)
+    handler = logging.FileHandler(log_path) if log_path else logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    _schedule_heartbeat(root)
+
+
+def _schedule_heartbeat(root):
+    due = time.perf_counter() + HEARTBEAT_MS / 1000
+    root.after(HEARTBEAT_MS, _heartbeat, root, due)
+
+
+class _Call:
+    __slots__ = ("mark", "longest")
+
+    def __init__(self, now):
+        self.mark = now  # Last time the event loop was known to be serviced
+        self.longest = 0.0
+
+    def serviced(self, now):
+        self.longest = max(self.longest, now - self.mark)
+        self.mark = now
+
+
+def _heartbeat(root, due):
+    now = time.perf_counter()
+    lag = max(now - due, 0.0)
+    # Running here means a callback on the stack has a dialog open
+    for call in _running:
+        call.serviced(now)
+    if perf_stats.enabled:
+        perf_stats.get_stats("ui.lag").record(lag)
+    if lag > threshold:
+        record_stall("event loop", lag)
+    _schedule_heartbeat(root)
+
+
+def record_stall(name, seconds, details=""):
+    stalls.append((time.time(), name, seconds))
+    message = f"UI stall: {name} blocked for {seconds * 1000:.0f} ms"
+    if details:
+        message += "\n" + details
+    logger.warning(message)
+
+
+def watch(callback, name=None):
+    """Wrap a Tk callback so that slow calls are logged under `name`.
+
+    The check happens per call, so callbacks can be wrapped while the
+    widgets are built, before start() has read the settings.
+    """
+    name = name or getattr(callback, "__qualname__", repr(callback))
+
+    @functools.wraps(callback)
+    def wrapper(*args, **kwargs):
+        if not enabled:
+            return callback(*args, **kwargs)
+
+        # Only one profiler can be active, so nested calls are not profiled
+        profiler = cProfile.Profile() if profile and not _running else None
+        call = _Call(time.perf_counter())
+        _running.append(call)
+        if profiler:
+            profiler.enable()
+        try:
+            return callback(*args, **kwargs)
+        finally:
+            if profiler:
+                profiler.disable()
+            _running.remove(call)
+            call.serviced(time.perf_counter())
+            if call.longest > threshold:
+                record_stall(name, call.longest,
+                             _profile_summary(profiler) if profiler else "")
+    return wrapper
+
+
+def _profile_summary(profiler):
+    output = io.StringIO()
+    stats = pstats.Stats(profiler, stream=output)
+    stats.sort_stats("cumulative").print_stats(PROFILE_LINES)
+    return output.getvalue().strip()
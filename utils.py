@@ -1,5 +1,67 @@
+import os
+import tempfile
+from contextlib import contextmanager
+
+# The umask can only be read by setting it, which affects every thread, so
+# it is read once here, at import on the main thread, before any workers
+UMASK = os.umask(0)
+os.umask(UMASK)
+
 
 def normalize_field_name(field_name):
     """Normalize the field name to match the entry keys"""
 
     return field_name.lower().replace(" ", "_").replace("($)", "").replace("(%)", "")
+
+
+class Debouncer:
+    """Run a callback once a burst of calls has gone quiet for `delay_ms`."""
+
+    def __init__(self, widget, delay_ms, callback):
+        self.widget = widget
+        self.delay_ms = delay_ms
+        self.callback = callback
+        self.after_id = None
+
+    def schedule(self, *args):
+        self.cancel()
+        self.after_id = self.widget.after(self.delay_ms, self._run, *args)
+
+    def cancel(self):
+        if self.after_id is not None:
+            self.widget.after_cancel(self.after_id)
+            self.after_id = None
+
+    def _run(self, *args):
+        self.after_id = None
+        self.callback(*args)
+
+
+def file_mode(path):
+    """Permission bits for writing `path`: its current mode, if it exists."""
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        return 0o666 & ~UMASK
+
+
+@contextmanager
+def atomic_write(path, mode="w", **kwargs):
+    """Write to a temporary file next to `path` and rename it into place.
+
+    The temporary file is removed if the block raises, so a failed or
+    cancelled write never leaves a partial file at `path`.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(
+        dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with open(fd, mode, **kwargs) as file:
+            yield file
+        # mkstemp() creates the file owner-only; give it the mode a plain
+        # open() would, or keep the mode of the file being replaced
+        os.chmod(temp_path, file_mode(path))
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
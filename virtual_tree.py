@@ -0,0 +1,171 @@
+from tkinter import font, ttk
+
+# Keys whose default Treeview binding would scroll the items
+NAVIGATION_KEYS = ("Up", "Down", "Prior", "Next", "Home", "End")
+
+
+class VirtualTreeview:
+    """Show a large row source through a small, fixed pool of Treeview items.
+
+    Only the visible window of rows (plus a small buffer) exists as Treeview
+    items. Scrolling re-fills the same items with the rows that come into
+    view, so the cost of a scroll or an append does not grow with row count.
+    """
+
+    def __init__(self, tree, scrollbar, get_row, buffer=5):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.get_row = get_row  # Callable: row index -> tuple of values
+        self.buffer = buffer
+        self.row_count = 0
+        self.top = 0
+        self.items = []
+        self.active = False
+
+    def attach(self):
+        """Take over scrolling of the tree and drop any existing items."""
+        self.active = True
+        self.tree.delete(*self.tree.get_children())
+        self.items = []
+        self.tree.configure(yscrollcommand="")
+        self.scrollbar.configure(command=self.yview)
+        self.tree.bind("<Configure>", self._on_configure)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", self._on_mousewheel)
+        self.tree.bind("<Button-5>", self._on_mousewheel)
+        # Tk's own keyboard navigation would scroll the items with see(),
+        # out of step with self.top
+        for key in NAVIGATION_KEYS:
+            self.tree.bind(f"<{key}>", self._on_key)
+        self.refresh()
+        # Once the items are laid out their real row height can be measured
+        self.tree.after_idle(self.refresh)
+
+    def detach(self):
+        """Give scrolling back to the tree itself."""
+        self.active = False
+        for sequence in ("<Configure>", "<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.unbind(sequence)
+        for key in NAVIGATION_KEYS:
+            self.tree.unbind(f"<{key}>")
+        self.tree.delete(*self.tree.get_children())
+        self.items = []
+        self.tree.configure(yscrollcommand=self.scrollbar.set)
+        self.scrollbar.configure(command=self.tree.yview)
+
+    def set_row_count(self, row_count):
+        self.row_count = row_count
+        self.refresh()
+
+    def visible_rows(self):
+        """Rows that fit below the heading without being cut off."""
+        height = self.tree.winfo_height()
+        if height <= 1:
+            # Not mapped yet, fall back to the configured height
+            return int(self.tree.cget("height"))
+        first_y, row_height = self.row_geometry()
+        return max(1, (height - first_y) // row_height)
+
+    def row_geometry(self):
+        """(y of the first row, row height) in pixels.
+
+        Measured from the first item once it is laid out, which accounts
+        for the heading and for themes (or scaling) with their own row
+        height. Until then it is estimated from the style or the font.
+        """
+        if self.items:
+            bbox = self.tree.bbox(self.items[0])
+            if bbox:
+                return bbox[1], bbox[3]
+        style = self.tree.cget("style") or "Treeview"
+        row_height = ttk.Style().lookup(style, "rowheight")
+        if not row_height:
+            row_height = font.nametofont("TkDefaultFont").metrics("linespace")
+        row_height = int(row_height)
+        heading = row_height if "headings" in str(self.tree.cget("show")) else 0
+        return heading, row_height
+
+    def refresh(self):
+        """Re-fill the item pool with the rows of the current window."""
+        if not self.active:
+            return
+
+        visible = self.visible_rows()
+        self.top = max(0, min(self.top, self.row_count - visible))
+        window = min(visible + self.buffer, self.row_count - self.top)
+
+        # Grow or shrink the item pool to the window size
+        while len(self.items) < window:
+            self.items.append(self.tree.insert("", "end"))
+        if len(self.items) > window:
+            self.tree.delete(*self.items[window:])
+            del self.items[window:]
+
+        for offset, iid in enumerate(self.items):
+            self.tree.item(iid, values=self.get_row(self.top + offset))
+        # The first item must stay at the top of the tree; Tk scrolls the
+        # items itself when a part-visible row is clicked
+        self.tree.yview_moveto(0)
+
+        self._update_scrollbar(visible)
+
+    def scroll_to(self, top):
+        self.top = top
+        self.refresh()
+
+    def yview(self, *args):
+        """Scrollbar command: handles 'moveto' and 'scroll' requests."""
+        visible = self.visible_rows()
+        if args[0] == "moveto":
+            top = int(float(args[1]) * self.row_count)
+        elif args[0] == "scroll":
+            step = visible if args[2] == "pages" else 1
+            top = self.top + int(args[1]) * step
+        else:
+            return
+        self.scroll_to(top)
+
+    def _update_scrollbar(self, visible):
+        if self.row_count <= 0:
+            self.scrollbar.set(0, 1)
+            return
+        first = self.top / self.row_count
+        last = min(1.0, (self.top + visible) / self.row_count)
+        self.scrollbar.set(first, last)
+
+    def _on_key(self, event):
+        """Move the focus row by keyboard, scrolling the window with it."""
+        if not self.row_count:
+            return "break"
+        focus = self.tree.focus()
+        visible = self.visible_rows()
+        if event.keysym == "Home":
+            row = 0
+        elif event.keysym == "End":
+            row = self.row_count - 1
+        elif focus not in self.items:
+            # Nothing focused yet: start at the first row shown
+            row = self.top
+        else:
+            row = self.top + self.items.index(focus)
+            row += {"Up": -1, "Down": 1, "Prior": -visible, "Next": visible}[event.keysym]
+        row = max(0, min(row, self.row_count - 1))
+
+        if row < self.top:
+            self.scroll_to(row)
+        elif row >= self.top + visible:
+            self.scroll_to(row - visible + 1)
+        iid = self.items[row - self.top]
+        self.tree.focus(iid)
+        self.tree.selection_set(iid)
+        return "break"
+
+    def _on_configure(self, event):
+        self.refresh()
+
+    def _on_mousewheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self.scroll_to(self.top - 3)
+        else:
+            self.scroll_to(self.top + 3)
+        return "break"